@@ -0,0 +1,64 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+pytest-benchmark versions of the ``run.py`` timings.
+
+These only measure wall time, but integrate with pytest-benchmark's
+storage and comparison (``--benchmark-autosave``,
+``--benchmark-compare``). Use ``run.py`` for memory measurements.
+
+Usage:
+    STIX_BENCHMARK_SIZES=10,100,1000 pytest benchmarks/bench_package.py
+"""
+
+# stdlib
+import os
+
+# external
+import pytest
+from mixbox.vendor.six import BytesIO
+
+# internal
+from stix.core import STIXPackage
+
+import packages
+
+SIZES = [
+    int(x) for x in
+    os.environ.get("STIX_BENCHMARK_SIZES", "10,100,1000").split(",")
+]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: str(size))
+def package(request):
+    return packages.generate(request.param)
+
+
+@pytest.fixture(scope="module")
+def xml(package):
+    return package.to_xml()
+
+
+def test_from_xml(benchmark, xml):
+    benchmark(lambda: STIXPackage.from_xml(BytesIO(xml)))
+
+
+def test_to_xml(benchmark, package):
+    benchmark(package.to_xml)
+
+
+def test_to_dict(benchmark, package):
+    benchmark(package.to_dict)
+
+
+def test_from_dict(benchmark, package):
+    benchmark(STIXPackage.from_dict, package.to_dict())
+
+
+def test_walk(benchmark, package):
+    benchmark(lambda: sum(1 for _ in package.walk()))
+
+
+def test_find(benchmark, package):
+    benchmark(package.find, packages.MISSING_ID)
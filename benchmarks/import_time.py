@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Tracks the cost of ``import stix.core`` as reported by ``python -X importtime``.
+
+Each run happens in a fresh interpreter so that module caching does not hide
+the cost. The cumulative import time of the requested module is reported in
+milliseconds, along with the slowest imports it pulled in.
+
+Usage:
+    python benchmarks/import_time.py [--module stix.core] [--runs 10]
+"""
+
+# stdlib
+import argparse
+import os
+import subprocess
+import sys
+
+
+def _importtime(module):
+    """Returns a list of ``(cumulative usecs, module name)`` tuples for a
+    single ``import module`` in a new interpreter.
+
+    """
+    args = [sys.executable, "-X", "importtime", "-c", "import %s" % module]
+    proc = subprocess.Popen(args, stderr=subprocess.PIPE)
+    _, err = proc.communicate()
+
+    if proc.returncode:
+        raise RuntimeError(err.decode("utf-8", "replace"))
+
+    timings = []
+    for line in err.decode("utf-8").splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        try:
+            timings.append((int(cumulative), name.strip()))
+        except ValueError:
+            continue  # header row
+
+    return timings
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if len(values) % 2:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="stix.core")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10,
+                        help="Number of slowest imports to report")
+    args = parser.parse_args()
+
+    # Make sure we measure the checkout this script lives in.
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ["PYTHONPATH"] = os.pathsep.join(
+        x for x in (root, os.environ.get("PYTHONPATH")) if x
+    )
+
+    totals = []
+    last = None
+
+    for _ in range(args.runs):
+        last = _importtime(args.module)
+        totals.extend(usecs for usecs, name in last if name == args.module)
+
+    print("import %s: median %.1f ms over %d runs" %
+          (args.module, _median(totals) / 1000.0, args.runs))
+
+    print("slowest imports (last run):")
+    for usecs, name in sorted(last, reverse=True)[:args.top]:
+        print("  %8.1f ms  %s" % (usecs / 1000.0, name))
+
+
+if __name__ == "__main__":
+    main()
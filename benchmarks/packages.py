@@ -0,0 +1,29 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Synthetic STIX packages for the benchmarks.
+
+Packages are built by :func:`stix.testing.generate`, so they are
+deterministic for a given size and seed and timings are comparable between
+runs and checkouts. A package of `size` contains `size` Indicators and
+``size // 10`` TTPs (at least one). See :mod:`stix.testing` for the rest of
+its contents.
+"""
+
+# internal
+from stix import testing
+
+#: Package sizes (numbers of Indicators) to benchmark, from smallest to
+#: largest.
+SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+
+#: An id which is not in any generated package, so finding it walks the
+#: whole package.
+MISSING_ID = "example:missing-1"
+
+
+def generate(size, seed=0):
+    """Returns a synthetic :class:`STIXPackage` with `size` Indicators."""
+    return testing.generate(n_indicators=size, n_ttps=max(1, size // 10),
+                            seed=seed)
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+"""
+Measures the wall time, peak RSS and allocations of common STIXPackage operations.
+
+Each operation is run on synthetic packages (see ``packages.py``) of each
+requested size, in a fresh interpreter so that memory measurements are not
+affected by earlier runs. For each operation and size the following are
+reported:
+
+* ``time``: The best wall time of ``--repeat`` runs, in seconds.
+* ``peak_rss``: The peak resident set size of the process, in MB.
+* ``rss_growth``: How much the operation raised the peak RSS above what
+  setting it up (e.g., generating the package) needed, in MB.
+* ``alloc_peak``: The peak memory allocated by Python during the operation,
+  in MB, as traced by ``tracemalloc``.
+* ``alloc_blocks``: The number of memory blocks allocated by the operation
+  which were still alive at its end (including its result).
+
+Memory is measured in a separate run from timings, since tracing slows
+Python down. Results can be saved with ``--json`` and compared against an
+earlier run with ``--compare`` to find regressions.
+
+Usage:
+    python benchmarks/run.py [--sizes 10,100,1000] [--cases from_xml,walk]
+                             [--repeat 3] [--json out.json]
+                             [--compare baseline.json] [--threshold 0.1]
+"""
+
+# stdlib
+import argparse
+import gc
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+#: The operations which can be measured, in the order they are reported.
+CASES = ("from_xml", "to_xml", "to_dict", "from_dict", "walk", "find")
+
+#: The measurements compared by --compare. Larger values are worse.
+METRICS = ("time", "peak_rss", "alloc_peak", "alloc_blocks")
+
+_MB = 1024.0 * 1024.0
+
+
+def _setup(case, size, xml_path):
+    """Returns the input of `case` for packages of `size`."""
+    import packages
+
+    if case == "from_xml":
+        return xml_path
+
+    package = packages.generate(size)
+
+    if case == "from_dict":
+        return package.to_dict()
+
+    return package
+
+
+def _operation(case):
+    """Returns a function which performs `case` on its input."""
+    from stix.core import STIXPackage
+    import packages
+
+    def walk(package):
+        for _ in package.walk():
+            pass
+
+    operations = {
+        "from_xml": STIXPackage.from_xml,
+        "to_xml": lambda package: package.to_xml(),
+        "to_dict": lambda package: package.to_dict(),
+        "from_dict": STIXPackage.from_dict,
+        "walk": walk,
+        "find": lambda package: package.find(packages.MISSING_ID),
+    }
+
+    return operations[case]
+
+
+def _maxrss():
+    """Returns the peak RSS of this process in bytes, or ``None`` if it is
+    not available.
+
+    """
+    # ru_maxrss survives exec() on Linux, so it would include the peak RSS
+    # of the parent process. VmHWM does not.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+
+    if resource is None:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes and macOS reports bytes.
+    if sys.platform == "darwin":
+        return maxrss
+
+    return maxrss * 1024
+
+
+def _measure(case, size, repeat, xml_path):
+    """Measures `case` in this process and returns a result dictionary."""
+    operation = _operation(case)
+    arg = _setup(case, size, xml_path)
+    gc.collect()
+
+    setup_rss = _maxrss()
+    times = []
+
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        result = operation(arg)
+        times.append(timeit.default_timer() - start)
+        del result
+
+    peak_rss = _maxrss()
+    measured = {"case": case, "size": size, "time": min(times)}
+
+    if peak_rss is not None:
+        measured["peak_rss"] = peak_rss / _MB
+        measured["rss_growth"] = (peak_rss - setup_rss) / _MB
+
+    if tracemalloc is not None:
+        gc.collect()
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+
+        result = operation(arg)
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        measured["alloc_peak"] = peak / _MB
+        measured["alloc_blocks"] = sys.getallocatedblocks() - blocks
+        del result
+
+    return measured
+
+
+def _run_child(case, size, repeat, xml_path):
+    """Measures `case` in a new interpreter and returns its result."""
+    args = [sys.executable, os.path.abspath(__file__), "--child", case,
+            str(size), str(repeat), xml_path or ""]
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+
+    if proc.returncode:
+        raise RuntimeError(err.decode("utf-8", "replace"))
+
+    return json.loads(out.decode("utf-8").splitlines()[-1])
+
+
+def _write_xml(directory, size):
+    import packages
+
+    path = os.path.join(directory, "package-%d.xml" % size)
+
+    with open(path, "wb") as f:
+        f.write(packages.generate(size).to_xml())
+
+    return path
+
+
+def _format(value, metric):
+    if value is None:
+        return "-"
+
+    if metric == "alloc_blocks":
+        return "%d" % value
+
+    if metric == "time":
+        return "%.4f" % value
+
+    return "%.1f" % value
+
+
+def _print(results):
+    columns = ("time", "peak_rss", "rss_growth", "alloc_peak", "alloc_blocks")
+    print("%-10s %8s" % ("case", "size") +
+          "".join(" %12s" % c for c in columns))
+
+    for result in results:
+        print("%-10s %8d" % (result["case"], result["size"]) +
+              "".join(" %12s" % _format(result.get(c), c) for c in columns))
+
+
+def _compare(results, baseline, threshold):
+    """Prints the measurements which are worse than those of `baseline` by
+    more than `threshold`, and returns their number.
+
+    """
+    previous = dict(
+        ((r["case"], r["size"]), r) for r in baseline["results"]
+    )
+    regressions = 0
+
+    for result in results:
+        old = previous.get((result["case"], result["size"]))
+
+        if old is None:
+            continue
+
+        for metric in METRICS:
+            new_value, old_value = result.get(metric), old.get(metric)
+
+            if not new_value or not old_value:
+                continue
+
+            change = (new_value - old_value) / float(old_value)
+
+            if change > threshold:
+                regressions += 1
+                print("REGRESSION %s size=%d %s: %s -> %s (%+.0f%%)" % (
+                    result["case"], result["size"], metric,
+                    _format(old_value, metric), _format(new_value, metric),
+                    change * 100
+                ))
+
+    return regressions
+
+
+def _environment():
+    import lxml.etree
+    import stix
+    import cybox
+
+    return {
+        "python": sys.version.split()[0],
+        "stix": stix.__version__,
+        "cybox": cybox.__version__,
+        "lxml": ".".join(str(x) for x in lxml.etree.LXML_VERSION),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,100,1000",
+                        help="Comma-separated numbers of Indicators")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help="Comma-separated operations to measure")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change reported as a regression")
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        case, size, repeat, xml_path = args.child
+        print(json.dumps(_measure(case, int(size), int(repeat), xml_path)))
+        return 0
+
+    # Make sure we measure the checkout this script lives in.
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.environ["PYTHONPATH"] = os.pathsep.join(
+        x for x in (here, os.path.dirname(here),
+                    os.environ.get("PYTHONPATH")) if x
+    )
+    sys.path[:0] = [here, os.path.dirname(here)]
+
+    sizes = [int(x) for x in args.sizes.split(",")]
+    cases = [x for x in args.cases.split(",") if x]
+
+    for case in cases:
+        if case not in CASES:
+            parser.error("unknown case %r" % case)
+
+    directory = tempfile.mkdtemp()
+    results = []
+
+    try:
+        for size in sizes:
+            xml_path = None
+
+            if "from_xml" in cases:
+                xml_path = _write_xml(directory, size)
+
+            for case in cases:
+                results.append(_run_child(case, size, args.repeat, xml_path))
+    finally:
+        shutil.rmtree(directory)
+
+    _print(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": _environment(), "results": results},
+                      f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        if _compare(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,46 @@
 from .base import (Entity, EntityList, TypedCollection, TypedList,  # noqa
                    BaseCoreComponent)
 
+import importlib
+
 from mixbox.vendor.six import string_types, iteritems
 
 #: Mapping of xsi:types to implementation/extension classes
 _EXTENSION_MAP = {}
 
+#: Mapping of xsi:types to the modules which implement them. These modules
+#: are only imported the first time one of their xsi:types is looked up.
+_EXTENSION_MODULES = {
+    "genericStructuredCOA:GenericStructuredCOAType": "stix.extensions.structured_coa.generic_structured_coa",
+    "genericTM:GenericTestMechanismType": "stix.extensions.test_mechanism.generic_test_mechanism",
+    "simpleMarking:SimpleMarkingStructureType": "stix.extensions.marking.simple_marking",
+    "snortTM:SnortTestMechanismType": "stix.extensions.test_mechanism.snort_test_mechanism",
+    "stix-ciqidentity:CIQIdentity3.0InstanceType": "stix.extensions.identity.ciq_identity_3_0",
+    "stix-maec:MAEC4.1InstanceType": "stix.extensions.malware.maec_4_1_malware",
+    "stix-openioc:OpenIOC2010TestMechanismType": "stix.extensions.test_mechanism.open_ioc_2010_test_mechanism",
+    "tlpMarking:TLPMarkingStructureType": "stix.extensions.marking.tlp",
+    "TOUMarking:TermsOfUseMarkingStructureType": "stix.extensions.marking.terms_of_use_marking",
+    "yaraTM:YaraTestMechanismType": "stix.extensions.test_mechanism.yara_test_mechanism",
+}
+
+
+def _load_extension(xsi_type):
+    """Imports the module registered for `xsi_type` in ``_EXTENSION_MODULES``
+    and returns the class it registered, or ``None`` if `xsi_type` has no
+    registered module.
+
+    Importing the module causes its extension classes to be added to the
+    ``_EXTENSION_MAP`` via the :func:`register_extension` decorator.
+
+    """
+    modname = _EXTENSION_MODULES.get(xsi_type)
+
+    if modname is None:
+        return None
+
+    importlib.import_module(modname)
+    return _EXTENSION_MAP.get(xsi_type)
+
 
 def _lookup_unprefixed(typename):
     """Attempts to resolve a class for the input XML type `typename`.
@@ -30,6 +65,10 @@ def _lookup_unprefixed(typename):
         if typename in xsi_type:
             return klass
 
+    for xsi_type in _EXTENSION_MODULES:
+        if typename in xsi_type and _load_extension(xsi_type):
+            return _EXTENSION_MAP[xsi_type]
+
     error = "Unregistered extension type: %s" % typename
     raise ValueError(error)
 
@@ -47,11 +86,14 @@ def _lookup_extension(xsi_type):
         ValueError: If no class has been registered for the `xsi_type`.
 
     """
-    import stix.extensions.malware.maec_4_1_malware
-    
     if xsi_type in _EXTENSION_MAP:
         return _EXTENSION_MAP[xsi_type]
 
+    klass = _load_extension(xsi_type)
+
+    if klass is not None:
+        return klass
+
     raise ValueError("Unregistered xsi:type %s" % xsi_type)
 
 
@@ -13,20 +13,312 @@ from mixbox import entities
 from mixbox import fields
 from mixbox import binding_utils
 from mixbox import namespaces
-from mixbox.vendor.six import StringIO, iteritems, itervalues, text_type, binary_type
+from mixbox.datautils import resolve_class
+from mixbox.vendor.six import (StringIO, iteritems, itervalues, text_type,
+                               binary_type, string_types)
 
 # internal
+from . import instrumentation
 from . import utils
 
 def _override(*args, **kwargs):
     raise NotImplementedError()
 
 
+class _CompactFields(collections.MutableMapping):
+    """A ``TypedField: value`` mapping for the ``_fields`` of entities which
+    use compact storage.
+
+    Values are stored in ``__slots__`` generated from the ``TypedField``
+    declarations of an :class:`Entity` class (see :func:`_compact_fields`),
+    so an instance needs a few bytes per field rather than a hash table.
+
+    """
+    __slots__ = ()
+
+    # Maps each TypedField of the entity class to its slot descriptor.
+    _slots = {}
+
+    # The entity class whose fields are stored.
+    _entity_class = None
+
+    def __getitem__(self, field):
+        try:
+            return self._slots[field].__get__(self)
+        except AttributeError:
+            raise KeyError(field)
+
+    def __setitem__(self, field, value):
+        self._slots[field].__set__(self, value)
+
+    def __delitem__(self, field):
+        try:
+            self._slots[field].__delete__(self)
+        except AttributeError:
+            raise KeyError(field)
+
+    def __contains__(self, field):
+        slot = self._slots.get(field)
+
+        if slot is None:
+            return False
+
+        try:
+            slot.__get__(self)
+        except AttributeError:
+            return False
+
+        return True
+
+    def get(self, field, default=None):
+        slot = self._slots.get(field)
+
+        if slot is None:
+            return default
+
+        try:
+            return slot.__get__(self)
+        except AttributeError:
+            return default
+
+    def __iter__(self):
+        for field, slot in iteritems(self._slots):
+            try:
+                slot.__get__(self)
+            except AttributeError:
+                continue
+
+            yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        state = dict(
+            (attr, self[field])
+            for attr, field in self._entity_class.typed_fields_with_attrnames()
+            if field in self
+        )
+        return (_new_compact_fields, (self._entity_class,), state)
+
+    def __setstate__(self, state):
+        for attr, value in iteritems(state):
+            self[getattr(self._entity_class, attr)] = value
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _compact_fields(cls):
+    """Returns the :class:`_CompactFields` subclass which stores the field
+    values of the :class:`Entity` class `cls`, creating it on first use.
+
+    """
+    try:
+        return vars(cls)["_compact_fields_class"]
+    except KeyError:
+        pass
+
+    # Slot names are prefixed so they cannot hide the mapping methods.
+    names = [(field, "_v_" + attr)
+             for attr, field in cls.typed_fields_with_attrnames()]
+    fields_class = type(
+        "%sFields" % cls.__name__,
+        (_CompactFields,),
+        {"__slots__": tuple(name for _, name in names), "_entity_class": cls}
+    )
+    fields_class._slots = dict(
+        (field, vars(fields_class)[name]) for field, name in names
+    )
+
+    cls._compact_fields_class = fields_class
+    return fields_class
+
+
+def _new_compact_fields(cls):
+    return _compact_fields(cls)()
+
+
+#: Classes which occur many times in typical STIX content, and use compact
+#: storage after :func:`set_compact_storage` is called with no `classes`.
+COMPACT_CLASSES = (
+    "stix.common.StructuredText",
+    "stix.common.VocabString",
+    "stix.common.Confidence",
+    "stix.common.kill_chains.KillChainPhaseReference",
+    "stix.common.related.RelatedTTP",
+    "stix.indicator.sightings.Sighting",
+)
+
+
+def set_compact_storage(enabled=True, classes=None):
+    """Enables or disables compact storage of field values for instances of
+    `classes` (and their subclasses) created afterwards.
+
+    By default, an :class:`Entity` stores its field values in a
+    dictionary. With compact storage they are stored in slots generated
+    from the class ``TypedField`` declarations instead. This more than
+    halves the memory used by each instance, but makes setting and reading
+    field values about twice as slow. Both kinds of instances behave the
+    same way, and can be mixed.
+
+    Args:
+        enabled: Whether to use compact storage.
+        classes: :class:`Entity` classes or their dotted names. Defaults to
+            :data:`COMPACT_CLASSES`.
+
+    """
+    for cls in (classes or COMPACT_CLASSES):
+        if isinstance(cls, string_types):
+            cls = resolve_class(cls)
+
+        cls._compact_storage = enabled
+
+
+#: The namespaces to export a document with: the namespace dictionary passed
+#: to the bindings, and the namespace (and schemaLocation) declarations of
+#: the root element.
+XmlNamespaces = collections.namedtuple(
+    "XmlNamespaces", ("ns_dict", "namespace_def")
+)
+
+# Cache of class => frozenset of (prefix, namespace) pairs found on the
+# class and its bases. The prefix is None for classes which do not have one.
+_CLASS_NAMESPACES = {}
+
+# Cache of the XmlNamespaces finalized for each combination of collected
+# namespaces and to_xml() options.
+_XML_NAMESPACES = {}
+_MAX_XML_NAMESPACES = 256
+
+
+def _class_namespaces(cls):
+    """Returns the ``(prefix, namespace)`` pairs which
+    ``NamespaceCollector`` finds on `cls` and its base classes: their
+    ``_namespace`` and, if known, its prefix from ``_XSI_NS`` or
+    ``_XSI_TYPE``.
+
+    """
+    try:
+        return _CLASS_NAMESPACES[cls]
+    except KeyError:
+        pass
+
+    pairs = set()
+
+    for klass in cls.__mro__:
+        ns = getattr(klass, "_namespace", None)
+
+        if not ns:
+            continue
+
+        prefix = getattr(klass, "_XSI_NS", None)
+
+        if not prefix:
+            typeinfo = (getattr(klass, "_XSI_TYPE", None) or "").split(":")
+            prefix = typeinfo[0] if len(typeinfo) == 2 else None
+
+        pairs.add((prefix, ns))
+
+    _CLASS_NAMESPACES[cls] = pairs = frozenset(pairs)
+    return pairs
+
+
+def _frozen(mapping):
+    return frozenset(iteritems(mapping)) if mapping else None
+
+
+class _NamespaceCollector(entities.NamespaceCollector):
+    """A ``NamespaceCollector`` which looks up the namespaces of each class
+    once (see :func:`_class_namespaces`), and can describe what it collected
+    as a cache key.
+
+    """
+    def collect(self, entity):
+        self._collected_classes.add(entity.__class__)
+
+        if hasattr(entity, "__input_namespaces__"):
+            self._input_namespaces.update(entity.__input_namespaces__)
+
+        if hasattr(entity, "__input_schemalocations__"):
+            self._input_schemalocs.update(entity.__input_schemalocations__)
+
+    def _pairs(self):
+        pairs = set()
+
+        for cls in self._collected_classes:
+            pairs.update(_class_namespaces(cls))
+
+        return pairs
+
+    def _parse_collected_classes(self):
+        prefixes = {}
+        uris = set()
+
+        for prefix, ns in self._pairs():
+            uris.add(ns)
+
+            if prefix:
+                prefixes[prefix] = ns
+
+        nsset = namespaces.make_namespace_subset_from_uris(uris)
+
+        # As NamespaceCollector does, only use class prefixes for namespaces
+        # which have no preferred prefix.
+        for prefix, ns in iteritems(prefixes):
+            if nsset.preferred_prefix_for_namespace(ns):
+                continue
+
+            nsset.set_preferred_prefix_for_namespace(
+                ns_uri=ns,
+                prefix=prefix,
+                add_if_not_exist=True
+            )
+
+        self._collected_namespaces = nsset
+
+    def key(self, ns_dict, schemaloc_dict):
+        """Returns a key which identifies the result of ``finalize()`` for
+        the collected namespaces.
+
+        """
+        return (
+            frozenset(self._pairs()),
+            _frozen(self._input_namespaces),
+            _frozen(self._input_schemalocs),
+            _frozen(ns_dict),
+            _frozen(schemaloc_dict),
+            idgen.get_id_namespace(),
+            idgen.get_id_namespace_alias(),
+        )
+
+
+def clear_namespace_cache():
+    """Discards the namespaces cached by :meth:`Entity.to_xml`, e.g. after
+    registering namespaces or changing their prefixes.
+
+    """
+    _CLASS_NAMESPACES.clear()
+    _XML_NAMESPACES.clear()
+
+
 class Entity(entities.Entity):
     """Base class for all classes in the STIX API."""
     _namespace = None
     _XSI_TYPE = None
 
+    # Store field values in slots rather than a dict (see
+    # set_compact_storage()).
+    _compact_storage = False
+
+    def __init__(self, *args, **kwargs):
+        super(Entity, self).__init__(*args, **kwargs)
+
+        if self._compact_storage:
+            values = _compact_fields(type(self))()
+            values.update(self._fields)
+            self._fields = values
+
     def _set_var(self, klass, try_cast=True, arg=None, **kwargs):
         """Sets an instance property value.
 
@@ -93,7 +385,7 @@ class Entity(entities.Entity):
 
     def to_xml(self, include_namespaces=True, include_schemalocs=False,
                ns_dict=None, schemaloc_dict=None, pretty=True,
-               auto_namespace=True, encoding='utf-8'):
+               auto_namespace=True, encoding='utf-8', namespaces=None):
         """Serializes a :class:`Entity` instance to an XML string.
 
         The default character encoding is ``utf-8`` and can be set via the
@@ -121,25 +413,122 @@ class Entity(entities.Entity):
             encoding: The output character encoding. Default is ``utf-8``. If
                 `encoding` is set to ``None``, a string (unicode in Python 2,
                 str in Python 3) is returned.
+            namespaces: An :class:`XmlNamespaces` returned by
+                :meth:`xml_namespaces` (e.g., for another object of the same
+                shape) to export with. The namespaces of this object are not
+                discovered, so they must all be part of `namespaces`. All
+                other namespace arguments are ignored.
+
+        Note:
+            The namespaces discovered for an object are finalized once for
+            each combination of namespaces and arguments, and reused by
+            later calls.
 
         Returns:
             An XML string for this
             :class:`Entity` instance. Default character encoding is ``utf-8``.
 
         """
-
-        from mixbox.entities import NamespaceCollector
-
         if (not auto_namespace) and (not ns_dict):
             raise Exception(
                 "Auto-namespacing was disabled but ns_dict was empty "
                 "or missing."
             )
 
-        ns_info = NamespaceCollector()
+        with instrumentation.operation("to_xml"):
+            return self._to_xml(include_namespaces, include_schemalocs,
+                                ns_dict, schemaloc_dict, pretty,
+                                auto_namespace, encoding, namespaces)
+
+    def xml_namespaces(self, include_namespaces=True,
+                       include_schemalocs=False, ns_dict=None,
+                       schemaloc_dict=None, pretty=True, auto_namespace=True):
+        """Returns the :class:`XmlNamespaces` which :meth:`to_xml` would
+        export this object with, given the same arguments.
+
+        These can be passed to :meth:`to_xml` to export other objects which
+        use the same namespaces (e.g., a batch of packages of the same shape)
+        without discovering their namespaces.
+
+        """
+        ns_info = _NamespaceCollector()
+        self.to_obj(ns_info=ns_info if auto_namespace else None)
+
+        return self._namespaces(ns_info, include_namespaces,
+                                include_schemalocs, ns_dict, schemaloc_dict,
+                                pretty, auto_namespace)
+
+    def _to_xml(self, include_namespaces, include_schemalocs, ns_dict,
+                schemaloc_dict, pretty, auto_namespace, encoding,
+                namespaces=None):
+        if namespaces is not None:
+            with instrumentation.timer("to_xml.to_obj"):
+                obj = self.to_obj()
+
+            obj_ns_dict, namespace_def = namespaces
+        else:
+            ns_info = _NamespaceCollector()
+
+            with instrumentation.timer("to_xml.to_obj"):
+                obj = self.to_obj(ns_info=ns_info if auto_namespace else None)
+
+            with instrumentation.timer("to_xml.namespaces"):
+                obj_ns_dict, namespace_def = self._namespaces(
+                    ns_info, include_namespaces, include_schemalocs, ns_dict,
+                    schemaloc_dict, pretty, auto_namespace
+                )
+
+        with instrumentation.timer("to_xml.export"):
+            with binding_utils.save_encoding(encoding):
+                sio = StringIO()
+                obj.export(
+                    sio.write,                    # output buffer
+                    0,                            # output level
+                    obj_ns_dict,                  # namespace dictionary
+                    pretty_print=pretty,          # pretty printing
+                    namespacedef_=namespace_def   # namespace/schemaloc def
+                )
+
+        # Ensure that the StringIO buffer is unicode
+        s = text_type(sio.getvalue())
+
+        if encoding:
+            return s.encode(encoding)
+
+        return s
+
+    @staticmethod
+    def _namespaces(ns_info, include_namespaces, include_schemalocs, ns_dict,
+                    schemaloc_dict, pretty, auto_namespace):
+        """Returns the :class:`XmlNamespaces` to export a document with.
 
-        obj = self.to_obj(ns_info=ns_info if auto_namespace else None)
+        Results are cached by the namespaces `ns_info` collected and the
+        arguments, as finalizing them is a large part of the cost of
+        exporting small documents.
 
+        """
+        key = ns_info.key(ns_dict, schemaloc_dict) + (
+            include_namespaces, include_schemalocs, pretty, auto_namespace
+        )
+        cached = _XML_NAMESPACES.get(key)
+
+        if cached is not None:
+            return XmlNamespaces(dict(cached.ns_dict), cached.namespace_def)
+
+        result = Entity._finalize_namespaces(
+            ns_info, include_namespaces, include_schemalocs, ns_dict,
+            schemaloc_dict, pretty, auto_namespace
+        )
+
+        if len(_XML_NAMESPACES) >= _MAX_XML_NAMESPACES:
+            _XML_NAMESPACES.clear()
+
+        _XML_NAMESPACES[key] = result
+        return XmlNamespaces(dict(result.ns_dict), result.namespace_def)
+
+    @staticmethod
+    def _finalize_namespaces(ns_info, include_namespaces, include_schemalocs,
+                             ns_dict, schemaloc_dict, pretty, auto_namespace):
         ns_info.finalize(ns_dict=ns_dict, schemaloc_dict=schemaloc_dict)
 
         if auto_namespace:
@@ -161,23 +550,7 @@ class Entity(entities.Entity):
                 schemaloc = ns_info.get_schema_location_string(delim)
                 namespace_def += (delim + schemaloc)
 
-        with binding_utils.save_encoding(encoding):
-            sio = StringIO()
-            obj.export(
-                sio.write,                    # output buffer
-                0,                            # output level
-                obj_ns_dict,                  # namespace dictionary
-                pretty_print=pretty,          # pretty printing
-                namespacedef_=namespace_def   # namespace/schemaloc def string
-            )
-
-        # Ensure that the StringIO buffer is unicode
-        s = text_type(sio.getvalue())
-
-        if encoding:
-            return s.encode(encoding)
-
-        return s
+        return XmlNamespaces(obj_ns_dict, namespace_def)
 
     def walk(self):
         return utils.walk.iterwalk(self)
@@ -363,7 +736,7 @@ class BaseCoreComponent(Entity):
     descriptions = fields.TypedField("Description", type_="stix.common.StructuredTextList", )
     short_descriptions = fields.TypedField("Short_Description", type_="stix.common.StructuredTextList")
     version = fields.TypedField("version", preset_hook=_validate_version)
-    timestamp = fields.DateTimeField("timestamp")
+    timestamp = utils.dates.DateTimeField("timestamp")
     handling = fields.TypedField("Handling", type_="stix.data_marking.Marking")
 
 
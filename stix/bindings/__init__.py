@@ -2,6 +2,9 @@
 # See LICENSE.txt for complete terms.
 
 import collections
+import contextlib
+import importlib
+import threading
 
 from lxml import etree as etree_
 import mixbox.xml
@@ -39,6 +42,34 @@ def get_type_info(node):
 #: A mapping of namespace/type information to binding classes.
 _BINDING_EXTENSION_MAP = {}
 
+#: A mapping of namespace/type information to the binding modules which
+#: implement them. These modules are only imported the first time one of their
+#: types is looked up.
+_BINDING_EXTENSION_MODULES = {
+    TypeInfo(ns="http://stix.mitre.org/Campaign-1", typename="CampaignType"): "stix.bindings.campaign",
+    TypeInfo(ns="http://stix.mitre.org/CourseOfAction-1", typename="CourseOfActionType"): "stix.bindings.course_of_action",
+    TypeInfo(ns="http://stix.mitre.org/ExploitTarget-1", typename="ExploitTargetType"): "stix.bindings.exploit_target",
+    TypeInfo(ns="http://stix.mitre.org/Incident-1", typename="IncidentType"): "stix.bindings.incident",
+    TypeInfo(ns="http://stix.mitre.org/Indicator-2", typename="IndicatorType"): "stix.bindings.indicator",
+    TypeInfo(ns="http://stix.mitre.org/Report-1", typename="ReportType"): "stix.bindings.report",
+    TypeInfo(ns="http://stix.mitre.org/TTP-1", typename="TTPType"): "stix.bindings.ttp",
+    TypeInfo(ns="http://stix.mitre.org/ThreatActor-1", typename="ThreatActorType"): "stix.bindings.threat_actor",
+    TypeInfo(ns="http://data-marking.mitre.org/extensions/MarkingStructure#Simple-1", typename="SimpleMarkingStructureType"): "stix.bindings.extensions.marking.simple_marking",
+    TypeInfo(ns="http://data-marking.mitre.org/extensions/MarkingStructure#TLP-1", typename="TLPMarkingStructureType"): "stix.bindings.extensions.marking.tlp",
+    TypeInfo(ns="http://data-marking.mitre.org/extensions/MarkingStructure#Terms_Of_Use-1", typename="TermsOfUseMarkingStructureType"): "stix.bindings.extensions.marking.terms_of_use_marking",
+    TypeInfo(ns="http://stix.mitre.org/extensions/AP#CAPEC2.7-1", typename="CAPEC2.7InstanceType"): "stix.bindings.extensions.attack_pattern.capec_2_7",
+    TypeInfo(ns="http://stix.mitre.org/extensions/Address#CIQAddress3.0-1", typename="CIQAddress3.0InstanceType"): "stix.bindings.extensions.address.ciq_address_3_0",
+    TypeInfo(ns="http://stix.mitre.org/extensions/Identity#CIQIdentity3.0-1", typename="CIQIdentity3.0InstanceType"): "stix.bindings.extensions.identity.ciq_identity_3_0",
+    TypeInfo(ns="http://stix.mitre.org/extensions/Malware#MAEC4.1-1", typename="MAEC4.1InstanceType"): "stix.bindings.extensions.malware.maec_4_1",
+    TypeInfo(ns="http://stix.mitre.org/extensions/StructuredCOA#Generic-1", typename="GenericStructuredCOAType"): "stix.bindings.extensions.structured_coa.generic",
+    TypeInfo(ns="http://stix.mitre.org/extensions/TestMechanism#Generic-1", typename="GenericTestMechanismType"): "stix.bindings.extensions.test_mechanism.generic",
+    TypeInfo(ns="http://stix.mitre.org/extensions/TestMechanism#OVAL5.10-1", typename="OVAL5.10TestMechanismType"): "stix.bindings.extensions.test_mechanism.oval_5_10",
+    TypeInfo(ns="http://stix.mitre.org/extensions/TestMechanism#OpenIOC2010-1", typename="OpenIOC2010TestMechanismType"): "stix.bindings.extensions.test_mechanism.open_ioc_2010",
+    TypeInfo(ns="http://stix.mitre.org/extensions/TestMechanism#Snort-1", typename="SnortTestMechanismType"): "stix.bindings.extensions.test_mechanism.snort",
+    TypeInfo(ns="http://stix.mitre.org/extensions/TestMechanism#YARA-1", typename="YaraTestMechanismType"): "stix.bindings.extensions.test_mechanism.yara",
+    TypeInfo(ns="http://stix.mitre.org/extensions/Vulnerability#CVRF-1", typename="CVRF1.1InstanceType"): "stix.bindings.extensions.vulnerability.cvrf_1_1",
+}
+
 
 def add_extension(cls):
     """Adds the binding class `cls` to the ``_EXTENSION_MAP``.
@@ -86,6 +117,10 @@ def lookup_extension(typeinfo, default=None):
     if typeinfo in _BINDING_EXTENSION_MAP:
         return _BINDING_EXTENSION_MAP[typeinfo]
 
+    if typeinfo in _BINDING_EXTENSION_MODULES:
+        importlib.import_module(_BINDING_EXTENSION_MODULES[typeinfo])
+        return _BINDING_EXTENSION_MAP[typeinfo]
+
     fmt = "No class implemented or registered for XML type '{%s}%s'"
     error = fmt % (typeinfo.ns, typeinfo.typename)
     raise NotImplementedError(error)
@@ -98,12 +133,47 @@ def has_xsi_type(node):
     return mixbox.xml.TAG_XSI_TYPE in node.attrib
 
 
+# Per-thread parsing settings. ``passthrough`` is ``True`` if opaque
+# extension payloads are kept as the lxml elements found in the input
+# document rather than being built into binding objects.
+_state = threading.local()
+
+
+@contextlib.contextmanager
+def passthrough(enabled=True):
+    """Enables or disables passthrough parsing of opaque extension payloads
+    (e.g., MAEC Packages) for the duration of the ``with`` block, in the
+    current thread.
+
+    Payloads which are passed through are written back out as-is during
+    serialization.
+
+    """
+    previous = is_passthrough()
+    _state.passthrough = enabled
+
+    try:
+        yield
+    finally:
+        _state.passthrough = previous
+
+
+def is_passthrough():
+    """Returns ``True`` if opaque extension payloads should be kept as lxml
+    elements during parsing in the current thread.
+
+    """
+    return getattr(_state, "passthrough", False)
+
+
 __all__ = [
     'TypeInfo',
     'add_extension',
     'etree_',
     'get_type_info',
     'has_xsi_type',
+    'is_passthrough',
     'lookup_extension',
+    'passthrough',
     'register_extension',
 ]
@@ -427,7 +427,6 @@ class CourseOfActionType(stix_common_binding.CourseOfActionBaseType):
             obj_.build(child_)
             self.set_Parameter_Observables(obj_)
         elif nodeName_ == 'Structured_COA':
-            from .extensions.structured_coa import generic
             obj_ = lookup_extension(child_).factory()
             obj_.build(child_)
             self.set_Structured_COA(obj_)
@@ -335,11 +335,6 @@ class MarkingSpecificationType(GeneratedsSuper):
             Controlled_Structure_ = self.gds_validate_string(Controlled_Structure_, node, 'Controlled_Structure')
             self.Controlled_Structure = Controlled_Structure_
         elif nodeName_ == 'Marking_Structure':
-
-            from .extensions.marking import simple_marking
-            from .extensions.marking import tlp
-            from .extensions.marking import terms_of_use_marking
-
             # Look for xsi:type. If not there, build an instance of
             # MarkingStructureType
             obj_ = lookup_extension(child_, MarkingStructureType).factory()
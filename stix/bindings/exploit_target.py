@@ -950,7 +950,6 @@ class ExploitTargetType(stix_common_binding.ExploitTargetBaseType):
             obj_.build(child_)
             self.add_Short_Description(obj_)
         elif nodeName_ == 'Vulnerability':
-            import stix.bindings.extensions.vulnerability.cvrf_1_1 as cvrf_1_1_binding
             obj_ = lookup_extension(child_, VulnerabilityType).factory()
             obj_.build(child_)
             self.Vulnerability.append(obj_)
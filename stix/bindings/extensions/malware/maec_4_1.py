@@ -12,7 +12,7 @@ import sys
 
 from mixbox.binding_utils import *
 
-from stix.bindings import register_extension
+from stix.bindings import register_extension, is_passthrough
 import stix.bindings.ttp as ttp_binding
 
 try:
@@ -105,7 +105,7 @@ class MAEC4_1InstanceType(ttp_binding.MalwareInstanceType):
         super(MAEC4_1InstanceType, self).buildAttributes(node, attrs, already_processed)
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'MAEC':
-            if maec_installed:
+            if maec_installed and not is_passthrough():
                 obj_ = PackageType.factory()
                 obj_.build(child_)
                 self.set_MAEC(obj_)
@@ -269,7 +269,6 @@ class AffectedAssetType(GeneratedsSuper):
             obj_.build(child_)
             self.set_Location_Class(obj_)
         elif nodeName_ == 'Location':
-            from .extensions.address import ciq_address_3_0
             obj_ = lookup_extension(child_).factory()
             obj_.build(child_)
             self.set_Location(obj_)
@@ -2522,7 +2521,6 @@ class IncidentType(stix_common_binding.IncidentBaseType):
             obj_.build(child_)
             self.Coordinator.append(obj_)
         elif nodeName_ == 'Victim':
-            import stix.bindings.extensions.identity.ciq_identity_3_0 as ciq_identity_binding
             obj_ = lookup_extension(child_, stix_common_binding.IdentityType).factory()
             obj_.build(child_)
             self.Victim.append(obj_)
@@ -672,7 +672,6 @@ class TestMechanismsType(GeneratedsSuper):
         pass
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'Test_Mechanism':
-            from .extensions.test_mechanism import (generic, oval_5_10, open_ioc_2010, snort, yara)
             obj_ = lookup_extension(child_).factory()
             obj_.build(child_)
             self.Test_Mechanism.append(obj_)
@@ -616,7 +616,6 @@ class InformationSourceType(GeneratedsSuper):
             obj_.build(child_)
             self.add_Description(obj_)
         elif nodeName_ == 'Identity':
-            from .extensions.identity import ciq_identity_3_0
             obj_ = lookup_extension(child_, IdentityType).factory()
             obj_.build(child_)
             self.set_Identity(obj_)
@@ -2029,7 +2028,6 @@ class RelatedIdentityType(GenericRelationshipType):
         super(RelatedIdentityType, self).buildAttributes(node, attrs, already_processed)
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'Identity':
-            from .extensions.identity import ciq_identity_3_0
             obj_ = lookup_extension(child_, IdentityType).factory()
             obj_.build(child_)
             self.set_Identity(obj_)
@@ -457,7 +457,6 @@ class ThreatActorType(stix_common_binding.ThreatActorBaseType):
             obj_.build(child_)
             self.add_Short_Description(obj_)
         elif nodeName_ == 'Identity':
-            from .extensions.identity import ciq_identity_3_0
             obj_ = lookup_extension(child_, stix_common_binding.IdentityType).factory()
             obj_.build(child_)
             self.set_Identity(obj_)
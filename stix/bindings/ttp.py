@@ -775,7 +775,6 @@ class MalwareType(GeneratedsSuper):
         pass
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'Malware_Instance':
-            from .extensions.malware import maec_4_1
             obj_ = lookup_extension(child_, MalwareInstanceType).factory()
             obj_.build(child_)
             self.Malware_Instance.append(obj_)
@@ -842,7 +841,6 @@ class AttackPatternsType(GeneratedsSuper):
         pass
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'Attack_Pattern':
-            from .extensions.attack_pattern import capec_2_7
             obj_ = lookup_extension(child_, AttackPatternType).factory()
             obj_.build(child_)
             self.Attack_Pattern.append(obj_)
@@ -990,7 +988,6 @@ class PersonasType(GeneratedsSuper):
         pass
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'Persona':
-            from .extensions.identity import ciq_identity_3_0
             obj_ = lookup_extension(child_, stix_common_binding.IdentityType).factory()
             obj_.build(child_)
             self.Persona.append(obj_)
@@ -1162,7 +1159,6 @@ class VictimTargetingType(GeneratedsSuper):
         pass
     def buildChildren(self, child_, node, nodeName_, fromsubclass_=False):
         if nodeName_ == 'Identity':
-            from .extensions.identity import ciq_identity_3_0
             obj_ = lookup_extension(child_, stix_common_binding.IdentityType).factory()
             obj_.build(child_)
             self.set_Identity(obj_)
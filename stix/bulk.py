@@ -0,0 +1,174 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Serialization of many packages at once.
+
+Example:
+    >>> result = to_xml_many(packages, out_dir="out", workers=4)
+    >>> for failure in result.failures:
+    ...     print(failure.index, failure.error)
+
+"""
+
+# stdlib
+import collections
+import itertools
+import os
+import re
+from multiprocessing.pool import ThreadPool
+
+# external
+from mixbox import binding_utils
+from mixbox.vendor import six
+
+#: A package which could not be serialized or written.
+#:
+#: Attributes:
+#:     index: The position of the package in the input.
+#:     package: The package.
+#:     error: The exception which was raised.
+Failure = collections.namedtuple("Failure", ("index", "package", "error"))
+
+# Characters which are replaced in file names made from ids.
+_UNSAFE_CHARS = re.compile(r"[^\w.-]")
+
+# The number of packages taken from the input per worker thread at a time.
+_CHUNK_PER_WORKER = 16
+
+
+class BulkResult(object):
+    """The outcome of :func:`to_xml_many`.
+
+    Attributes:
+        written: The number of packages which were written.
+        failures: A list of :data:`Failure` tuples, in input order.
+
+    """
+    def __init__(self):
+        self.written = 0
+        self.failures = []
+
+    def __bool__(self):
+        return not self.failures
+
+    __nonzero__ = __bool__
+
+
+def default_filename(index, package):
+    """Returns the file name of `package` in :func:`to_xml_many` output
+    directories: its id with any characters other than letters, digits,
+    ``.``, ``-`` and ``_`` replaced with ``-``, or its index if it has no id.
+
+    """
+    id_ = getattr(package, "id_", None)
+
+    if not id_:
+        return "package-%d.xml" % index
+
+    return _UNSAFE_CHARS.sub("-", id_) + ".xml"
+
+
+class _DirectoryWriter(object):
+    def __init__(self, out_dir, filename):
+        self.out_dir = out_dir
+        self.filename = filename
+
+    def __call__(self, index, package, data):
+        if isinstance(data, six.text_type):
+            data = data.encode("utf-8")
+
+        path = os.path.join(self.out_dir, self.filename(index, package))
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def to_xml_many(packages, out_dir=None, writer=None, workers=1,
+                encoding="utf-8", filename=default_filename, **kwargs):
+    """Serializes each of `packages` with ``to_xml()`` and writes it to
+    `out_dir` or passes it to `writer`.
+
+    The packages share the namespace declarations finalized for packages of
+    the same shape (see :meth:`stix.base.Entity.to_xml`) and one output
+    encoding setting. A package which cannot be serialized or written is
+    reported in the result, and does not stop the others from being
+    written.
+
+    Args:
+        packages: An iterable of :class:`stix.core.STIXPackage` (or other
+            :class:`stix.base.Entity`) instances, such as a generator.
+        out_dir: A directory to write each package to, as a file named by
+            `filename`.
+        writer: A function called with the index of each package, the package
+            and its XML. It is called from the worker threads if `workers` is
+            more than ``1``, so must be thread-safe.
+        workers: The number of threads which serialize and write packages.
+            Threads are used because API objects cannot be pickled to other
+            processes. Serialization holds the GIL, so most of the gain
+            comes from overlapping writes. At most ``16 * workers`` packages
+            are taken from `packages` at a time, so a generator is not
+            drained ahead of the writes.
+        encoding: The output character encoding. If ``None``, `writer` is
+            passed strings rather than bytes (files are still written as
+            UTF-8).
+        filename: A function which returns the file name of a package in
+            `out_dir`, given its index and the package. Defaults to
+            :func:`default_filename`.
+        **kwargs: Passed to ``to_xml()`` (e.g., ``include_schemalocs`` or
+            ``namespaces``).
+
+    Returns:
+        A :class:`BulkResult`.
+
+    Raises:
+        ValueError: If neither or both of `out_dir` and `writer` are given.
+
+    """
+    if (out_dir is None) == (writer is None):
+        raise ValueError("Exactly one of out_dir and writer is required")
+
+    if out_dir is not None:
+        writer = _DirectoryWriter(out_dir, filename)
+
+    def export(item):
+        index, package = item
+
+        try:
+            writer(index, package, package.to_xml(encoding=encoding, **kwargs))
+        except Exception as ex:
+            return Failure(index, package, ex)
+
+    result = BulkResult()
+
+    def tally(failure):
+        if failure is None:
+            result.written += 1
+        else:
+            result.failures.append(failure)
+
+    with binding_utils.save_encoding(encoding):
+        if workers > 1:
+            items = enumerate(packages)
+            size = workers * _CHUNK_PER_WORKER
+            pool = ThreadPool(workers)
+
+            try:
+                while True:
+                    chunk = list(itertools.islice(items, size))
+
+                    if not chunk:
+                        break
+
+                    for failure in pool.imap_unordered(export, chunk):
+                        tally(failure)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            for item in enumerate(packages):
+                tally(export(item))
+
+    result.failures.sort(key=lambda x: x.index)
+    return result
+
+
+__all__ = ["BulkResult", "Failure", "default_filename", "to_xml_many"]
@@ -4,7 +4,7 @@
 from __future__ import absolute_import
 from sys import version_info
 
-from mixbox.fields import TypedField, CDATAField
+from mixbox.fields import TypedField
 
 from .structured_text import StructuredText, StructuredTextList  # noqa
 from .vocabs import VocabString   # noqa
@@ -38,7 +38,7 @@ class EncodedCDATA(stix.Entity):
     _binding = common_binding
     _binding_class = _binding.EncodedCDATAType
 
-    value = CDATAField("valueOf_", key_name="value")
+    value = utils.CDATAField("valueOf_", key_name="value")
     encoded = TypedField("encoded")
 
     def __init__(self, value=None, encoded=None):
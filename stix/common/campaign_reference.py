@@ -7,6 +7,7 @@ from mixbox import fields
 # internal
 import stix
 import stix.bindings.stix_common as common_binding
+from stix.utils import dates
 
 # relative
 from .names import Names
@@ -18,7 +19,7 @@ class CampaignRef(stix.Entity):
     _binding_class = common_binding.CampaignReferenceType
 
     idref = fields.TypedField("idref")
-    timestamp = fields.DateTimeField("timestamp")
+    timestamp = dates.DateTimeField("timestamp")
     names = fields.TypedField("Names", Names)
 
     def __init__(self, idref=None, timestamp=None):
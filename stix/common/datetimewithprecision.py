@@ -29,7 +29,7 @@ class DateTimeWithPrecision(stix.Entity):
     _binding_class = _binding.DateTimeWithPrecisionType
     _namespace = 'http://stix.mitre.org/common-1'
 
-    value = fields.DateTimeField("valueOf_", key_name="value")
+    value = utils.dates.DateTimeField("valueOf_", key_name="value")
     precision = fields.TypedField("precision", preset_hook=validate_precision)
 
     def __init__(self, value=None, precision='second'):
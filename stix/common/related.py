@@ -18,7 +18,7 @@ import stix.bindings.stix_core as core_binding
 import stix.bindings.report as report_binding
 
 # deprecation warnings
-from stix.utils import deprecated
+from stix.utils import dates, deprecated
 
 # relative
 from .vocabs import VocabField
@@ -63,7 +63,7 @@ class RelatedPackageRef(GenericRelationship):
     _binding_class = common_binding.RelatedPackageRefType
 
     idref = fields.IdrefField("idref")
-    timestamp = fields.DateTimeField("timestamp")
+    timestamp = dates.DateTimeField("timestamp")
 
     def __init__(self, idref=None, timestamp=None, confidence=None,
                  information_source=None, relationship=None):
@@ -22,7 +22,7 @@ class Statement(stix.Entity):
     _binding_class = common_binding.StatementType
 
     # Fields
-    timestamp = fields.DateTimeField("timestamp")
+    timestamp = utils.dates.DateTimeField("timestamp")
     timestamp_precision = fields.TypedField("timestamp_precision", preset_hook=validate_precision)
     value = VocabField("Value", VocabString)
     descriptions = fields.TypedField("Description", StructuredTextList)
@@ -17,6 +17,103 @@ from mixbox.vendor.six import text_type
 DEFAULT_ORDINALITY = 1
 
 
+def _ordinality_key(ordinality):
+    """Returns the key used to index a StructuredText `ordinality` value.
+
+    Ordinalities parsed from XML are strings, so everything is normalized
+    to an ``int``.
+
+    """
+    if ordinality is None:
+        return None
+
+    return int(ordinality)
+
+
+# Incremented whenever the ordinality of a StructuredText is changed.
+# StructuredTextList indexes record the value they were built at, so that
+# they are only checked against their items after something has changed.
+# Items always have an ordinality once they are in a list, so giving one to
+# a new StructuredText is not counted.
+_generation = 0
+
+
+def _ordinality_changing(instance, value):
+    global _generation
+    ordinality = instance.ordinality
+
+    if ordinality is not None and ordinality != value:
+        _generation += 1
+
+
+class _Index(object):
+    """Maps the ordinalities and ids of the items of a
+    :class:`StructuredTextList` to the items which have them.
+
+    The index does not follow changes made to the items. It keeps the
+    ordinality each item had when it was indexed, so that it can be checked
+    against the items (see :meth:`matches`). Ids are not checked, so
+    lookups by id must check the ids of the items found.
+
+    """
+    def __init__(self, items):
+        self.generation = _generation
+        self.ordinalities = []
+        self.by_ordinality = {}
+        self.by_id = {}
+
+        # The sorted ordinality keys. This is None when it needs to be
+        # rebuilt.
+        self.keys = []
+
+        for item in items:
+            self.append(item)
+
+    def append(self, item):
+        ordinality, id_ = item.ordinality, item.id_
+        key = _ordinality_key(ordinality)
+        self.ordinalities.append(ordinality)
+        self.by_id.setdefault(id_, []).append(item)
+
+        bucket = self.by_ordinality.get(key)
+
+        if bucket is not None:
+            bucket.append(item)
+            return
+
+        self.by_ordinality[key] = [item]
+        keys = self.keys
+
+        if key is None or keys is None:
+            return
+        elif not keys or key > keys[-1]:
+            keys.append(key)  # The common case of adding to the end.
+        else:
+            self.keys = None
+
+    def sorted_keys(self):
+        if self.keys is None:
+            keys = (k for k in self.by_ordinality if k is not None)
+            self.keys = sorted(keys)
+
+        return self.keys
+
+    def next_ordinality(self):
+        keys = self.sorted_keys()
+
+        if not keys:
+            return 1
+
+        return keys[-1] + 1
+
+    def matches(self, items):
+        """Returns ``True`` if `items` still have the ordinalities they had
+        when they were indexed.
+
+        """
+        return self.ordinalities == [x.ordinality for x in items]
+
+
 class StructuredText(stix.Entity):
     """Used for storing descriptive text elements.
 
@@ -32,7 +129,10 @@ class StructuredText(stix.Entity):
     _namespace = 'http://stix.mitre.org/common-1'
 
     id_ = fields.IdField("id")
-    ordinality = fields.TypedField("ordinality")
+    ordinality = fields.TypedField(
+        "ordinality",
+        preset_hook=_ordinality_changing
+    )
     value = fields.TypedField("valueOf_", key_name="value")
     structuring_format = fields.TypedField("structuring_format")
 
@@ -108,6 +208,10 @@ def _unset_default(text):
 class StructuredTextList(stix.TypedCollection, collections.Sequence):
     """A sequence type used to store StructureText objects.
 
+    Lookups by ordinality or id and sorted iteration go through an index of
+    the items, which is built when it is first needed. It is rebuilt if the
+    ``ordinality`` of a contained item has been changed since.
+
     Args:
         *args: A variable-length argument list which can contain single
             :class:`.StructuredText` objects or sequences of objects.
@@ -116,10 +220,41 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
     _treat_none_as_empty_list = True
     _contained_type = StructuredText
     _try_cast = True
+    _walk_skip = ("_index",)
+
+    # Lists shorter than this are indexed on each lookup rather than keeping
+    # an index around.
+    _INDEX_MIN_LENGTH = 16
+
+    _index = None
 
     def __init__(self, *args):
         stix.TypedCollection.__init__(self, *args)
 
+    def __getstate__(self):
+        state = dict(vars(self))
+        state.pop("_index", None)
+        return state
+
+    def _lookup(self):
+        """Returns the :class:`_Index` of the collection."""
+        if len(self._inner) < self._INDEX_MIN_LENGTH:
+            return _Index(self._inner)
+
+        index = self._index
+
+        if index is None or index.generation == _generation:
+            pass
+        elif index.matches(self._inner):
+            index.generation = _generation
+        else:
+            index = None
+
+        if index is None:
+            index = self._index = _Index(self._inner)
+
+        return index
+
     def _initialize_inner(self, *args):
         # Check if it was initialized with args=None
         if not any(args):
@@ -136,6 +271,11 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         ``None`` if not found.
 
         """
+        for text in self._lookup().by_id.get(id, ()):
+            if text.id_ == id:
+                return text
+
+        # The id may have been set after the item was indexed.
         for text in self._inner:
             if text.id_ == id:
                 return text
@@ -152,13 +292,19 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         for idx, item in enumerate(self.sorted, 1):
             item.ordinality = idx
 
+        self._index = None
+
     @property
     def sorted(self):
         """Returns a copy of the collection of internal
         :class:`.StructuredText` objects, sorted by their ``ordinality``.
 
         """
-        return sorted(self._inner, key=lambda x: int(x.ordinality))
+        index = self._lookup()
+        by_ordinality = index.by_ordinality
+        items = [x for key in index.sorted_keys() for x in by_ordinality[key]]
+        items.extend(by_ordinality.get(None, ()))
+        return items
 
     @property
     def ordinalities(self):
@@ -173,12 +319,7 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
         """Returns the "+1" of the highest ordinality in the collection.
 
         """
-        ords = self.ordinalities
-
-        if not ords:
-            return 1
-
-        return ords[-1] + 1
+        return self._lookup().next_ordinality()
 
     def __iter__(self):
         """Returns an iterator for the collection sorted by ordinality.
@@ -199,10 +340,10 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
 
         """
         o = int(key)
+        items = self._lookup().by_ordinality.get(o)
 
-        for item in self._inner:
-            if item.ordinality == o:
-                return item
+        if items:
+            return items[0]
 
         error = "No item found with an ordinality of {0}".format(o)
         raise KeyError(error)
@@ -219,6 +360,7 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
 
         """
         self._inner.remove(self[key])
+        self._index = None
 
     def __reversed__(self):
         """Yields the :class:`StructuredText` collection in descending order
@@ -243,18 +385,26 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
             value: A :class:`.StructuredText` object.
 
         """
+        index = self._lookup()
+
         if not self._is_valid(value):
             value = self._fix_value(value)
 
         if value.ordinality is None:
-            value.ordinality = self.next_ordinality
+            value.ordinality = index.next_ordinality()
 
         # Remove the existing item if there is one.
-        with utils.ignored(KeyError):
-            del self[value.ordinality]
+        existing = index.by_ordinality.get(_ordinality_key(value.ordinality))
+
+        if existing:
+            self._inner.remove(existing[0])
+            self._index = index = None
 
         self._inner.append(value)
 
+        if index is not None and index is self._index:
+            index.append(value)
+
     def update(self, iterable):
         """Adds each item of `iterable` to the collection.
 
@@ -282,16 +432,21 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
             [2,3,6] since 6 is not contiguous with [1,2].
 
         """
+        by_ordinality = self._lookup().by_ordinality
         to_shift = []
 
-        for o in itertools.count(ordinality):
-            try:
-                to_shift.append(self[o])
-            except KeyError:
+        for o in itertools.count(int(ordinality)):
+            items = by_ordinality.get(o)
+
+            if not items:
                 break
 
+            to_shift.append(items[0])
+
         for text in to_shift:
-            text.ordinality += 1
+            text.ordinality = int(text.ordinality) + 1
+
+        self._index = None
 
     def insert(self, value):
         """Inserts `value` into the collection.
@@ -315,6 +470,7 @@ class StructuredTextList(stix.TypedCollection, collections.Sequence):
 
         """
         self._inner.remove(value)
+        self._index = None
 
     def to_obj(self, ns_info=None):
         """Returns a binding object list for the StructuredTextList.
@@ -13,15 +13,6 @@ import stix
 # deprecations
 from stix.utils.deprecated import IdrefDeprecatedList
 
-# component imports
-from stix.campaign import Campaign
-from stix.coa import CourseOfAction
-from stix.exploit_target import ExploitTarget
-from stix.indicator import Indicator
-from stix.incident import Incident
-from stix.report import Report
-from stix.threat_actor import ThreatActor
-
 # binding imports
 from stix.bindings import stix_core as stix_core_binding
 from stix.bindings import stix_common as stix_common_binding
@@ -34,9 +25,9 @@ class Campaigns(stix.EntityList):
 
     campaign = fields.TypedField(
         name="Campaign",
-        type_=Campaign,
+        type_="stix.campaign.Campaign",
         multiple=True,
-        listfunc=partial(IdrefDeprecatedList, type=Campaign)
+        listfunc=partial(IdrefDeprecatedList, type="stix.campaign.Campaign")
     )
 
 
@@ -47,9 +38,9 @@ class CoursesOfAction(stix.EntityList):
 
     course_of_action = fields.TypedField(
         name="Course_Of_Action",
-        type_=CourseOfAction,
+        type_="stix.coa.CourseOfAction",
         multiple=True,
-        listfunc=partial(IdrefDeprecatedList, type=CourseOfAction)
+        listfunc=partial(IdrefDeprecatedList, type="stix.coa.CourseOfAction")
     )
 
 
@@ -60,9 +51,9 @@ class ExploitTargets(stix.EntityList):
 
     exploit_target = fields.TypedField(
         name="Exploit_Target",
-        type_=ExploitTarget,
+        type_="stix.exploit_target.ExploitTarget",
         multiple=True,
-        listfunc=partial(IdrefDeprecatedList, type=ExploitTarget)
+        listfunc=partial(IdrefDeprecatedList, type="stix.exploit_target.ExploitTarget")
     )
 
 
@@ -73,24 +64,96 @@ class Incidents(stix.EntityList):
 
     incident = fields.TypedField(
         name="Incident",
-        type_=Incident,
+        type_="stix.incident.Incident",
         multiple=True,
-        listfunc=partial(IdrefDeprecatedList, type=Incident)
+        listfunc=partial(IdrefDeprecatedList, type="stix.incident.Incident")
     )
 
 
+class _IndicatorList(IdrefDeprecatedList):
+    """An IdrefDeprecatedList which counts the modifications made to it, so
+    indexes built over its contents can tell when they are out of date.
+
+    """
+    def __init__(self, *args, **kwargs):
+        self.version = 0
+        super(_IndicatorList, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super(_IndicatorList, self).__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super(_IndicatorList, self).__delitem__(key)
+        self.version += 1
+
+    def insert(self, idx, value):
+        super(_IndicatorList, self).insert(idx, value)
+        self.version += 1
+
+
 class Indicators(stix.EntityList):
     _binding = stix_core_binding
     _namespace = 'http://stix.mitre.org/stix-1'
     _binding_class = _binding.IndicatorsType
+    _walk_skip = ("_valid_time_cache",)
 
     indicator = fields.TypedField(
         name="Indicator",
-        type_=Indicator,
+        type_="stix.indicator.Indicator",
         multiple=True,
-        listfunc=partial(IdrefDeprecatedList, type=Indicator)
+        listfunc=partial(_IndicatorList, type="stix.indicator.Indicator")
     )
 
+    def valid_time_index(self, rebuild=False):
+        """Returns a :class:`.ValidTimeIndex` over the Indicators in this
+        collection.
+
+        The index is cached until Indicators are added to or removed from
+        the collection.
+
+        Note:
+            Changes made to the ``valid_time_positions`` of Indicators which
+            are already in the collection are not detected. Pass
+            ``rebuild=True`` after making such changes.
+
+        """
+        from stix.indicator.valid_time import ValidTimeIndex
+
+        indicators = self.indicator
+        version = getattr(indicators, "version", None)
+        cache = getattr(self, "_valid_time_cache", None)
+
+        if rebuild or not cache or cache[0] is not indicators or \
+                cache[1] != version:
+            cache = (indicators, version, ValidTimeIndex(indicators))
+            self._valid_time_cache = cache
+
+        return cache[2]
+
+    def valid_at(self, t):
+        """Returns a list of the Indicators which are valid at the time `t`.
+
+        Indicators without ``valid_time_positions`` are valid at any time.
+
+        Args:
+            t: A timestamp. This can be a string, datetime.date, or
+                datetime.datetime value. Naive values are assumed to be UTC.
+
+        """
+        return self.valid_time_index().valid_at(t)
+
+    def valid_during(self, start=None, end=None):
+        """Returns a list of the Indicators whose validity overlaps the
+        window between `start` and `end` (inclusive).
+
+        Args:
+            start: A timestamp. If ``None``, the window has no start.
+            end: A timestamp. If ``None``, the window has no end.
+
+        """
+        return self.valid_time_index().overlapping(start, end)
+
 
 class ThreatActors(stix.EntityList):
     _binding = stix_core_binding
@@ -99,9 +162,9 @@ class ThreatActors(stix.EntityList):
 
     threat_actor = fields.TypedField(
         name="Threat_Actor",
-        type_=ThreatActor,
+        type_="stix.threat_actor.ThreatActor",
         multiple=True,
-        listfunc=partial(IdrefDeprecatedList, type=ThreatActor)
+        listfunc=partial(IdrefDeprecatedList, type="stix.threat_actor.ThreatActor")
     )
 
 
@@ -112,12 +175,24 @@ class Reports(stix.EntityList):
 
     report = fields.TypedField(
         name="Report",
-        type_=Report,
+        type_="stix.report.Report",
         multiple=True,
-        listfunc=partial(IdrefDeprecatedList, type=Report)
+        listfunc=partial(IdrefDeprecatedList, type="stix.report.Report")
     )
 
 
 # Namespace flattening
 from .stix_package import STIXPackage  # noqa
-from .stix_header import STIXHeader  # noqa
\ No newline at end of file
+from .stix_header import STIXHeader  # noqa
+
+# Component classes are importable from here, but are only imported on first
+# use so that ``import stix.core`` does not load every component.
+stix.utils.lazy_attributes(__name__, {
+    "Campaign": "stix.campaign.Campaign",
+    "CourseOfAction": "stix.coa.CourseOfAction",
+    "ExploitTarget": "stix.exploit_target.ExploitTarget",
+    "Indicator": "stix.indicator.Indicator",
+    "Incident": "stix.incident.Incident",
+    "Report": "stix.report.Report",
+    "ThreatActor": "stix.threat_actor.ThreatActor",
+})
\ No newline at end of file
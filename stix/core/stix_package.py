@@ -16,16 +16,6 @@ from .. import utils
 from ..utils import parser
 from ..utils import deprecated
 
-# component imports
-from ..campaign import Campaign
-from ..coa import CourseOfAction
-from ..exploit_target import ExploitTarget
-from ..indicator import Indicator
-from ..incident import Incident
-from ..threat_actor import ThreatActor
-from ..ttp import TTP
-from ..report import Report
-
 # relationship imports
 from ..common.related import RelatedPackages
 
@@ -72,7 +62,7 @@ class STIXPackage(stix.Entity):
     id_ = fields.IdField("id")
     idref = fields.IdrefField("idref", preset_hook=deprecated.field)
     version = fields.TypedField("version")
-    timestamp = fields.DateTimeField("timestamp", preset_hook=deprecated.field)
+    timestamp = utils.dates.DateTimeField("timestamp", preset_hook=deprecated.field)
     stix_header = fields.TypedField("STIX_Header", STIXHeader)
     campaigns = fields.TypedField("Campaigns", Campaigns)
     courses_of_action = fields.TypedField("Courses_Of_Action", CoursesOfAction)
@@ -209,6 +199,18 @@ class STIXPackage(stix.Entity):
             self.add_observable(entity)
             return
 
+        # Component packages are imported here rather than at module level
+        # so that ``import stix.core`` does not load every component and its
+        # bindings up front.
+        from ..campaign import Campaign
+        from ..coa import CourseOfAction
+        from ..exploit_target import ExploitTarget
+        from ..indicator import Indicator
+        from ..incident import Incident
+        from ..threat_actor import ThreatActor
+        from ..ttp import TTP
+        from ..report import Report
+
         tlo_adds = {
             Campaign: self.add_campaign,
             CourseOfAction: self.add_course_of_action,
@@ -230,20 +232,61 @@ class STIXPackage(stix.Entity):
             raise TypeError(error)
 
     @classmethod
-    def from_xml(cls, xml_file, encoding=None):
+    def from_xml(cls, xml_file, encoding=None, passthrough=False, cache=None,
+                 retain_source=True):
         """Parses the `xml_file` file-like object and returns a
         :class:`STIXPackage` instance.
 
         Args:
             xml_file: A file, file-like object, etree._Element, or
-                etree._ElementTree instance.
+                etree._ElementTree instance. It may also be an ``mmap`` or
+                ``memoryview`` (see :func:`stix.utils.parser.map_file`).
             encoding: The character encoding of the `xml_file` input. If
                 ``None``, an attempt will be made to determine the input
                 character encoding. Default is ``None``.
+            passthrough: If ``True``, opaque extension payloads (e.g., MAEC
+                Packages) are not parsed and are written back out as-is by
+                :meth:`to_xml`. Default is ``False``.
+            cache: An optional :class:`stix.utils.cache.DiskCache`. If the
+                `xml_file` document has been parsed into the cache before,
+                the cached package is returned without parsing it again.
+            retain_source: If ``False``, the returned package does not keep
+                any part of the parsed lxml document alive, and records
+                source line numbers by id in ``__source_lines__`` instead.
+                See :meth:`stix.utils.parser.EntityParser.parse_xml`.
 
         Returns:
             An instance of :class:`STIXPackage`.
 
         """
         entity_parser = parser.EntityParser()
-        return entity_parser.parse_xml(xml_file, encoding=encoding)
+
+        if cache is not None:
+            return cache.parse(
+                xml_file,
+                entity_parser.parse_xml,
+                encoding=encoding,
+                passthrough=passthrough,
+                retain_source=retain_source
+            )
+
+        return entity_parser.parse_xml(
+            xml_file,
+            encoding=encoding,
+            passthrough=passthrough,
+            retain_source=retain_source
+        )
+
+
+# Component classes are importable from here, but are only imported on first
+# use so that ``import stix.core`` does not load every component.
+utils.lazy_attributes(__name__, {
+    "Campaign": "stix.campaign.Campaign",
+    "CourseOfAction": "stix.coa.CourseOfAction",
+    "ExploitTarget": "stix.exploit_target.ExploitTarget",
+    "Indicator": "stix.indicator.Indicator",
+    "Incident": "stix.incident.Incident",
+    "Report": "stix.report.Report",
+    "ThreatActor": "stix.threat_actor.ThreatActor",
+    "TTP": "stix.ttp.TTP",
+})
@@ -11,7 +11,6 @@ from mixbox import fields
 # stix
 import stix
 from stix import utils
-from stix.ttp import TTP
 from stix.common.kill_chains import KillChains
 from stix.bindings import stix_core as core_binding
 
@@ -26,10 +25,10 @@ class TTPs(stix.EntityList):
 
     ttps = fields.TypedField(
         name="TTP",
-        type_=TTP,
+        type_="stix.ttp.TTP",
         multiple=True,
         key_name="ttps",
-        listfunc=partial(IdrefDeprecatedList, type=TTP)
+        listfunc=partial(IdrefDeprecatedList, type="stix.ttp.TTP")
     )
 
     kill_chains = fields.TypedField("Kill_Chains", KillChains)
@@ -40,3 +39,7 @@ class TTPs(stix.EntityList):
 
     def add_ttp(self, ttp):
         self.append(ttp)
+
+
+# TTP is importable from here, but is only imported on first use.
+utils.lazy_attributes(__name__, {"TTP": "stix.ttp.TTP"})
@@ -153,13 +153,16 @@ class MAECInstance(MalwareInstance):
 
         return_obj = cls()
 
-        if _MAEC_INSTALLED:
+        # The MAEC content is left as an lxml element if it was parsed in
+        # passthrough mode.
+        if _MAEC_INSTALLED and not mixbox.xml.is_element(obj.MAEC):
             obj.MAEC = maecPackage.from_obj(obj.MAEC)
-        else:
-            obj.MAEC = obj.MAEC
 
         return_obj = super(MAECInstance, cls).from_obj(obj)
 
+        if mixbox.xml.is_element(return_obj.maec):
+            return_obj.maec = utils.parser.detach(return_obj.maec)
+
         return return_obj
 
     def to_obj(self, ns_info=None):
@@ -10,6 +10,7 @@ from mixbox.vendor.six import BytesIO, iteritems
 # internal
 import stix
 from stix.indicator.test_mechanism import _BaseTestMechanism
+from stix.utils import parser
 import stix.bindings.extensions.test_mechanism.open_ioc_2010 as open_ioc_tm_binding
 
 
@@ -72,7 +73,7 @@ class OpenIOCTestMechanism(_BaseTestMechanism):
             return None
         
         return_obj = super(OpenIOCTestMechanism, cls).from_obj(obj)
-        return_obj.ioc = obj.ioc
+        return_obj.ioc = parser.detach(obj.ioc)
         return return_obj
     
     def to_obj(self, return_obj=None, ns_info=None):
@@ -0,0 +1,527 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Relationship graphs of STIX content.
+
+:func:`build` collects the relationships expressed through the ``Related*``
+types in :mod:`stix.common.related` (e.g., ``Indicator.indicated_ttps``,
+``Incident.leveraged_ttps`` or ``TTP.exploit_targets``) into a
+:class:`Graph`.
+
+Every STIX id becomes an integer node id. Edges are stored as parallel
+arrays of integers rather than as Python objects, and are indexed by source
+and by target node so that neighbor lookups do not scan the edge list.
+
+Example:
+    >>> graph = stix.graph.build(package)
+    >>> node = graph.node("example:indicator-1")
+    >>> graph.ids(graph.neighbors(node, edge_type="indicated_ttps"))
+    ['example:ttp-1']
+    >>> graph.ids(graph.shortest_path(node, "example:threatactor-1"))
+    ['example:indicator-1', 'example:ttp-1', 'example:threatactor-1']
+
+"""
+
+# stdlib
+from array import array
+from collections import deque
+
+# external
+from cybox.core import Observable
+from mixbox import entities
+from mixbox.vendor.six import integer_types, text_type
+
+# internal
+from stix.common.related import (
+    _BaseRelated, GenericRelationshipList, RelatedPackageRef
+)
+from stix.utils.introspection import FieldSelector
+
+#: Valid ``direction`` values for :class:`Graph` queries.
+DIRECTIONS = ("out", "in", "both")
+
+# The array typecode of node ids, edge ids and codes.
+_TYPECODE = "l"
+
+# No value (e.g., an edge without a Relationship).
+_NONE = -1
+
+# Packages whose content may be a relationship target, but does not contain
+# any STIX relationships.
+_FOREIGN = ("cybox", "maec")
+
+# Cache of class => _is_stix(class).
+_STIX_CLASSES = {}
+
+
+class _Codes(object):
+    """Assigns consecutive integer codes to hashable values."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        try:
+            return self._codes[value]
+        except KeyError:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            return code
+
+    def get(self, value, default=None):
+        return self._codes.get(value, default)
+
+
+def _is_stix(cls):
+    """Returns ``True`` if `cls` is a STIX entity class.
+
+    Some STIX types (e.g., CompositeIndicatorExpression) are mixbox
+    entities rather than :class:`stix.Entity` subclasses, so CybOX and MAEC
+    entities are told apart by their package instead.
+
+    """
+    try:
+        return _STIX_CLASSES[cls]
+    except KeyError:
+        is_stix = _STIX_CLASSES[cls] = (
+            issubclass(cls, entities.Entity) and
+            cls.__module__.split(".", 1)[0] not in _FOREIGN
+        )
+        return is_stix
+
+
+def _classify(cls):
+    """Returns ``True`` if instances of `cls` may be graph nodes or
+    relationships, ``False`` if they cannot be or contain any, and ``None``
+    if that depends on their fields. See :class:`.FieldSelector`.
+
+    """
+    if issubclass(cls, Observable):
+        return True
+    elif not _is_stix(cls):
+        return False
+    elif issubclass(cls, (_BaseRelated, RelatedPackageRef,
+                          GenericRelationshipList)):
+        return True
+    elif hasattr(cls, "id_"):
+        return True
+
+    return None
+
+
+# The fields of each class which may hold graph nodes or relationships.
+_SELECTOR = FieldSelector(_classify)
+
+
+def _index(keys, count):
+    """Returns ``(offsets, order)`` arrays which index the positions of
+    `keys` by key value, via a counting sort.
+
+    The positions of key ``k`` are ``order[offsets[k]:offsets[k + 1]]``.
+
+    """
+    offsets = array(_TYPECODE, [0]) * (count + 1)
+
+    for key in keys:
+        offsets[key + 1] += 1
+
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    order = array(_TYPECODE, [0]) * len(keys)
+    fill = array(_TYPECODE, offsets[:-1])
+
+    for position, key in enumerate(keys):
+        order[fill[key]] = position
+        fill[key] += 1
+
+    return offsets, order
+
+
+class Graph(object):
+    """A directed multigraph of STIX relationships.
+
+    Nodes are integer ids assigned to STIX ids in the order they are found.
+    Edges are integer ids into the parallel :attr:`sources`,
+    :attr:`targets`, :attr:`edge_types`, :attr:`relationships` and
+    :attr:`confidences` arrays. Edge type, Relationship and Confidence
+    values are stored as integer codes into the :attr:`edge_type_names`,
+    :attr:`relationship_names` and :attr:`confidence_names` lists. A code of
+    ``-1`` means that the edge has no Relationship or Confidence value.
+
+    The edge type of an edge is the name of the property which holds the
+    relationship, such as ``indicated_ttps`` or ``related_indicators``.
+
+    Graph queries accept either integer node ids or STIX id strings and
+    return integer node ids. Use :meth:`ids` to translate them back into
+    STIX ids.
+
+    Do not create Graph objects directly. Use :func:`build` instead.
+
+    """
+
+    def __init__(self, nodes, edge_types, relationships, confidences,
+                 sources, targets, types, relationship_codes,
+                 confidence_codes):
+        self.nodes = nodes.values
+        self.edge_type_names = edge_types.values
+        self.relationship_names = relationships.values
+        self.confidence_names = confidences.values
+        self.sources = sources
+        self.targets = targets
+        self.edge_types = types
+        self.relationships = relationship_codes
+        self.confidences = confidence_codes
+
+        self._nodes = nodes
+        self._edge_types = edge_types
+        self._out_offsets, self._out_edges = _index(sources, len(nodes))
+        self._in_offsets, self._in_edges = _index(targets, len(nodes))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, id_):
+        return self._nodes.get(id_) is not None
+
+    @property
+    def edge_count(self):
+        """The number of edges in the graph."""
+        return len(self.sources)
+
+    def node(self, id_):
+        """Returns the integer node id of the STIX id `id_`.
+
+        Raises:
+            KeyError: If `id_` is not in the graph.
+
+        """
+        node = self._nodes.get(id_)
+
+        if node is None:
+            raise KeyError(id_)
+
+        return node
+
+    def ids(self, nodes):
+        """Returns a list of the STIX ids of the integer node ids `nodes`.
+
+        ``None`` is returned if `nodes` is ``None``.
+
+        """
+        if nodes is None:
+            return None
+
+        return [self.nodes[node] for node in nodes]
+
+    def edge(self, edge):
+        """Returns a ``(source, target, edge_type, relationship, confidence)``
+        tuple describing the edge with the integer id `edge`. The source and
+        target are STIX ids.
+
+        """
+        def name(names, code):
+            return None if code == _NONE else names[code]
+
+        return (
+            self.nodes[self.sources[edge]],
+            self.nodes[self.targets[edge]],
+            self.edge_type_names[self.edge_types[edge]],
+            name(self.relationship_names, self.relationships[edge]),
+            name(self.confidence_names, self.confidences[edge]),
+        )
+
+    def _resolve(self, node):
+        if isinstance(node, integer_types):
+            if not 0 <= node < len(self.nodes):
+                raise KeyError(node)
+            return node
+
+        return self.node(node)
+
+    def _edge_type_code(self, edge_type):
+        if edge_type is None or isinstance(edge_type, integer_types):
+            return edge_type
+
+        # An unknown edge type matches no edges.
+        return self._edge_types.get(edge_type, _NONE)
+
+    def _adjacent(self, node, code, direction):
+        """Yields the nodes adjacent to the integer `node`."""
+        if direction not in DIRECTIONS:
+            error = "direction must be one of {0}. Received '{1}'"
+            raise ValueError(error.format(DIRECTIONS, direction))
+
+        types = self.edge_types
+        indexes = []
+
+        if direction in ("out", "both"):
+            indexes.append((self._out_offsets, self._out_edges, self.targets))
+        if direction in ("in", "both"):
+            indexes.append((self._in_offsets, self._in_edges, self.sources))
+
+        for offsets, edges, ends in indexes:
+            for i in range(offsets[node], offsets[node + 1]):
+                edge = edges[i]
+
+                if code is None or types[edge] == code:
+                    yield ends[edge]
+
+    def out_degree(self, node):
+        """Returns the number of edges whose source is `node`."""
+        node = self._resolve(node)
+        return self._out_offsets[node + 1] - self._out_offsets[node]
+
+    def in_degree(self, node):
+        """Returns the number of edges whose target is `node`."""
+        node = self._resolve(node)
+        return self._in_offsets[node + 1] - self._in_offsets[node]
+
+    def neighbors(self, node, edge_type=None, direction="out"):
+        """Returns a list of the nodes adjacent to `node`, without
+        duplicates.
+
+        Args:
+            node: An integer node id or STIX id.
+            edge_type: If set, only follow edges of this type. This may be
+                an edge type name or code.
+            direction: Follow edges out of (``"out"``), into (``"in"``) or
+                in either direction from (``"both"``) `node`.
+
+        Raises:
+            KeyError: If `node` is not in the graph.
+            ValueError: If `direction` is not valid.
+
+        """
+        node = self._resolve(node)
+        code = self._edge_type_code(edge_type)
+        seen, result = set(), []
+
+        for adjacent in self._adjacent(node, code, direction):
+            if adjacent not in seen:
+                seen.add(adjacent)
+                result.append(adjacent)
+
+        return result
+
+    def k_hop(self, node, k, edge_type=None, direction="out"):
+        """Returns a dictionary mapping each node reachable from `node` in
+        at most `k` hops to its distance from `node`. `node` itself is
+        not included.
+
+        See :meth:`neighbors` for a description of the `edge_type` and
+        `direction` arguments.
+
+        """
+        node = self._resolve(node)
+        code = self._edge_type_code(edge_type)
+        distances = {node: 0}
+        frontier = [node]
+
+        for distance in range(1, k + 1):
+            if not frontier:
+                break
+
+            next_frontier = []
+
+            for current in frontier:
+                for adjacent in self._adjacent(current, code, direction):
+                    if adjacent not in distances:
+                        distances[adjacent] = distance
+                        next_frontier.append(adjacent)
+
+            frontier = next_frontier
+
+        del distances[node]
+        return distances
+
+    def shortest_path(self, source, target, edge_type=None, direction="out"):
+        """Returns the list of nodes on a shortest path from `source` to
+        `target`, including both ends, or ``None`` if `target` cannot be
+        reached from `source`.
+
+        See :meth:`neighbors` for a description of the `edge_type` and
+        `direction` arguments.
+
+        """
+        source = self._resolve(source)
+        target = self._resolve(target)
+        code = self._edge_type_code(edge_type)
+
+        if source == target:
+            return [source]
+
+        parents = {source: None}
+        queue = deque([source])
+
+        while queue:
+            current = queue.popleft()
+
+            for adjacent in self._adjacent(current, code, direction):
+                if adjacent in parents:
+                    continue
+
+                parents[adjacent] = current
+
+                if adjacent == target:
+                    path = [target]
+
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+
+                    path.reverse()
+                    return path
+
+                queue.append(adjacent)
+
+        return None
+
+
+class _Builder(object):
+    def __init__(self):
+        self.nodes = _Codes()
+        self.edge_types = _Codes()
+        self.relationships = _Codes()
+        self.confidences = _Codes()
+        self.sources = array(_TYPECODE)
+        self.targets = array(_TYPECODE)
+        self.types = array(_TYPECODE)
+        self.relationship_codes = array(_TYPECODE)
+        self.confidence_codes = array(_TYPECODE)
+        self._visited = set()
+
+    def _add_edge(self, source, target, edge_type, relationship, confidence):
+        if relationship is not None and relationship.value is not None:
+            relationship = self.relationships.code(
+                text_type(relationship.value)
+            )
+        else:
+            relationship = _NONE
+
+        if confidence is not None and confidence.value is not None:
+            confidence = self.confidences.code(text_type(confidence.value))
+        else:
+            confidence = _NONE
+
+        self.sources.append(source)
+        self.targets.append(self.nodes.code(target))
+        self.types.append(self.edge_types.code(edge_type))
+        self.relationship_codes.append(relationship)
+        self.confidence_codes.append(confidence)
+
+    def _related(self, related, source, edge_type):
+        if isinstance(related, RelatedPackageRef):
+            item, target = None, related.idref
+        else:
+            item = related.item
+            target = (
+                getattr(item, "id_", None) or getattr(item, "idref", None)
+            )
+
+        if source is not None and target:
+            self._add_edge(
+                source, target, edge_type,
+                related.relationship, related.confidence
+            )
+
+        if item is not None:
+            self.add(item)
+
+    def add(self, entity, source=None, edge_type=None):
+        """Adds the nodes and relationships found in `entity`.
+
+        Args:
+            entity: A STIX or CybOX entity.
+            source: The node id of the nearest identified ancestor of
+                `entity`.
+            edge_type: The edge type of relationships found in `entity`.
+
+        """
+        id_ = getattr(entity, "id_", None)
+
+        if id_:
+            source = self.nodes.code(id_)
+
+            # The same content may be found several times (e.g., once in a
+            # top-level collection and once inline in a relationship).
+            if source in self._visited:
+                return
+
+            self._visited.add(source)
+
+        if not _is_stix(type(entity)):
+            return
+
+        relationships = isinstance(entity, GenericRelationshipList)
+        values = entity._fields
+
+        for field, attr in _SELECTOR.fields(type(entity)):
+            value = values.get(field)
+
+            if value is None:
+                continue
+
+            # The items of GenericRelationshipLists are named after the
+            # property which holds the list.
+            name = edge_type if relationships else attr
+
+            if isinstance(value, entities.Entity):
+                # Most entity lists are empty, so look at their items here
+                # rather than recursing into each one.
+                inner = _SELECTOR.list_field(type(value))
+
+                if inner is not None:
+                    value = value._fields.get(inner, ())
+                else:
+                    value = (value,)
+
+            for item in value:
+                if isinstance(item, (_BaseRelated, RelatedPackageRef)):
+                    self._related(item, source, name)
+                else:
+                    self.add(item, source, name)
+
+    def build(self):
+        return Graph(
+            nodes=self.nodes,
+            edge_types=self.edge_types,
+            relationships=self.relationships,
+            confidences=self.confidences,
+            sources=self.sources,
+            targets=self.targets,
+            types=self.types,
+            relationship_codes=self.relationship_codes,
+            confidence_codes=self.confidence_codes,
+        )
+
+
+def build(package_or_corpus):
+    """Builds a :class:`Graph` of the relationships found in
+    `package_or_corpus`.
+
+    Every object with an id becomes a node, as does every id referenced
+    through a relationship. Referenced ids do not need to be present in
+    `package_or_corpus`, so idrefs to content in other packages are
+    edges to nodes without further relationships until that content is
+    added to the corpus.
+
+    Args:
+        package_or_corpus: A :class:`.STIXPackage` (or any other STIX
+            entity), or an iterable collection of them.
+
+    Returns:
+        A :class:`Graph`.
+
+    """
+    builder = _Builder()
+
+    if isinstance(package_or_corpus, entities.Entity):
+        package_or_corpus = (package_or_corpus,)
+
+    for entity in package_or_corpus:
+        builder.add(entity)
+
+    return builder.build()
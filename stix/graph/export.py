@@ -0,0 +1,453 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Streaming export of STIX relationship graphs.
+
+The functions in this module read STIX XML documents with an incremental
+parser and write their nodes and relationships as they are found, so the
+document is never parsed into a :class:`.STIXPackage` and memory use does
+not grow with the size of the document (apart from a set of the ids seen
+so far).
+
+The nodes and edges are the same as those of :func:`stix.graph.build`.
+Nodes are identified STIX constructs, along with any ids referenced
+through a relationship. Edges are the relationships expressed through
+the ``Related*`` types in :mod:`stix.common.related`, and are typed by the
+name of the property which holds them (e.g., ``indicated_ttps``).
+
+Example:
+    >>> with open("graph.graphml", "w") as f:
+    ...     write_graphml("stix-package.xml", f)
+
+    >>> with open("edges.csv", "w") as edges, open("nodes.csv", "w") as nodes:
+    ...     write_csv("stix-package.xml", edges, nodes=nodes)
+
+"""
+
+# stdlib
+import collections
+import csv
+import json
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+# external
+from lxml import etree
+
+# internal
+from stix.common.related import (
+    _BaseRelated, GenericRelationshipList, RelatedPackageRef,
+    RelatedPackageRefs
+)
+from . import _is_stix
+
+#: A node found in a STIX document. Nodes which are only known through
+#: references have no `title` or `timestamp`.
+Node = collections.namedtuple("Node", ("id", "type", "title", "timestamp"))
+
+#: A relationship found in a STIX document. `relationship` and `confidence`
+#: are ``None`` if the relationship does not have them.
+Edge = collections.namedtuple(
+    "Edge", ("source", "target", "type", "relationship", "confidence")
+)
+
+#: The columns of CSV node lists.
+NODE_COLUMNS = Node._fields
+
+#: The columns of CSV edge lists.
+EDGE_COLUMNS = Edge._fields
+
+_COMMON = "{http://stix.mitre.org/common-1}"
+_CONFIDENCE = _COMMON + "Confidence"
+_VALUE = _COMMON + "Value"
+_RELATIONSHIP = _COMMON + "Relationship"
+_INFORMATION_SOURCE = _COMMON + "Information_Source"
+
+# Identified CybOX and MAEC content may be a relationship target, but does
+# not contain any STIX relationships.
+_FOREIGN = ("{http://cybox.mitre.org/", "{http://maec.mitre.org/")
+
+# The (holders, related, refs) tag dictionaries, built by _tags().
+_TAGS = None
+
+_GRAPHML_KEYS = (
+    ("node", "type"),
+    ("node", "title"),
+    ("node", "timestamp"),
+    ("edge", "type"),
+    ("edge", "relationship"),
+    ("edge", "confidence"),
+)
+
+
+def _classes():
+    """Yields the STIX entity classes which may be found in a STIXPackage.
+
+    The classes are found by following field types rather than by looking
+    for Entity subclasses, since STIX component modules are only imported
+    when they are first needed.
+
+    """
+    from stix.core import STIXPackage
+
+    seen = set([STIXPackage])
+    queue = [STIXPackage]
+
+    while queue:
+        cls = queue.pop()
+        yield cls
+
+        for field in cls.typed_fields():
+            type_ = field.type_
+
+            if (isinstance(type_, type) and type_ not in seen and
+                    _is_stix(type_)):
+                seen.add(type_)
+                queue.append(type_)
+
+
+def _tags():
+    """Returns ``(holders, related, refs)`` dictionaries which map the XML
+    tags of relationship elements to the name of the property which holds
+    them.
+
+    * `holders` contains the tags of GenericRelationshipList (and
+      RelatedPackageRefs) elements.
+    * `related` contains the tags of _BaseRelated elements.
+    * `refs` contains the tags of RelatedPackageRef elements.
+
+    """
+    global _TAGS
+
+    if _TAGS is not None:
+        return _TAGS
+
+    holders, related, refs = {}, {}, {}
+
+    for cls in _classes():
+        namespace = getattr(cls, "_namespace", None)
+
+        if not namespace:
+            continue
+
+        for attr, field in cls.typed_fields_with_attrnames():
+            type_ = field.type_
+
+            if not isinstance(type_, type):
+                continue
+
+            tag = "{%s}%s" % (namespace, field.name)
+
+            if issubclass(type_, (GenericRelationshipList, RelatedPackageRefs)):
+                holders[tag] = attr
+            elif issubclass(type_, _BaseRelated):
+                related[tag] = attr
+            elif issubclass(type_, RelatedPackageRef):
+                refs[tag] = attr
+
+    _TAGS = (holders, related, refs)
+    return _TAGS
+
+
+def _localname(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(elem):
+    return elem.text.strip() if elem.text else None
+
+
+class _Relationship(object):
+    __slots__ = ("depth", "source", "type", "target", "target_type",
+                 "relationship", "confidence")
+
+    def __init__(self, depth, source, type_, target=None):
+        self.depth = depth
+        self.source = source
+        self.type = type_
+        self.target = target
+        self.target_type = None
+        self.relationship = None
+        self.confidence = None
+
+
+def iterparse(xml_file):
+    """Parses the STIX XML document `xml_file` incrementally, yielding its
+    nodes and relationships as they are found.
+
+    Nodes are yielded once each, after the end of their XML element. Nodes
+    which are only known through references are yielded at the end of the
+    document. Content which is found again with an id that has already been
+    seen (e.g., an inline copy of a top-level Indicator) is skipped.
+
+    Args:
+        xml_file: A filename or file-like object containing a STIX XML
+            document. A memory map from :func:`stix.utils.parser.map_file`
+            may be used, after seeking to the byte offset of a document.
+
+    Yields:
+        :class:`Node` and :class:`Edge` tuples.
+
+    """
+    holders, related, refs = _tags()
+    seen, referenced = set(), {}
+
+    tags = []           # The tags of the open elements.
+    nodes = []          # [depth, id, type, title, timestamp] lists.
+    relationships = []  # _Relationship objects.
+    depth, skip = 0, None
+
+    events = etree.iterparse(
+        xml_file,
+        events=("start", "end"),
+        huge_tree=True,
+        remove_comments=True,
+        resolve_entities=False
+    )
+
+    for event, elem in events:
+        if event == "start":
+            depth += 1
+
+            if skip is not None:
+                continue
+
+            tag = elem.tag
+            tags.append(tag)
+            id_ = elem.get("id")
+
+            # The first other child of a relationship element is its item.
+            current = relationships[-1] if relationships else None
+
+            if (current is not None and current.depth == depth - 1 and
+                    current.target is None and
+                    tag not in (_CONFIDENCE, _RELATIONSHIP,
+                                _INFORMATION_SOURCE)):
+                current.target = id_ or elem.get("idref")
+                current.target_type = _localname(tag)
+
+            if id_ and not tag.startswith(_FOREIGN):
+                if id_ in seen:
+                    skip = depth
+                    continue
+
+                seen.add(id_)
+                nodes.append(
+                    [depth, id_, _localname(tag), None, elem.get("timestamp")]
+                )
+
+            if tag in related or tag in refs:
+                parent = tags[-2] if len(tags) > 1 else None
+                name = holders.get(parent) or related.get(tag) or refs[tag]
+                source = nodes[-1][1] if nodes else None
+                target = elem.get("idref") if tag in refs else None
+                relationships.append(
+                    _Relationship(depth, source, name, target)
+                )
+
+            continue
+
+        # An "end" event.
+        if skip is not None:
+            if depth == skip:
+                skip = None
+                tags.pop()
+
+            depth -= 1
+            elem.clear()
+            continue
+
+        tag = tags.pop()
+        current = relationships[-1] if relationships else None
+
+        if current is not None:
+            if current.depth == depth:
+                relationships.pop()
+
+                if current.source and current.target:
+                    if current.target not in seen:
+                        referenced.setdefault(
+                            current.target, current.target_type
+                        )
+
+                    yield Edge(current.source, current.target, current.type,
+                               current.relationship, current.confidence)
+
+            elif depth == current.depth + 1 and tag == _RELATIONSHIP:
+                current.relationship = _text(elem)
+            elif (depth == current.depth + 2 and tag == _VALUE and
+                    tags[-1] == _CONFIDENCE):
+                current.confidence = _text(elem)
+
+        if nodes:
+            node = nodes[-1]
+
+            if node[0] == depth:
+                nodes.pop()
+                yield Node(*node[1:])
+            elif node[0] == depth - 1 and _localname(tag) == "Title":
+                node[3] = _text(elem)
+
+        depth -= 1
+
+        # Free the parsed content, which is no longer needed.
+        elem.clear()
+
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    for id_, type_ in referenced.items():
+        if id_ not in seen:
+            yield Node(id_, type_, None, None)
+
+
+def write_csv(xml_file, f, nodes=None):
+    """Writes the relationships found in the STIX XML document `xml_file` to
+    the file-like object `f` as a CSV edge list, with a header row.
+
+    Args:
+        xml_file: A filename or file-like object containing a STIX XML
+            document.
+        f: A file-like object to write the edge list to. See
+            :data:`EDGE_COLUMNS` for its columns.
+        nodes: An optional file-like object to write a CSV node list to.
+            See :data:`NODE_COLUMNS` for its columns.
+
+    Returns:
+        A ``(nodes, edges)`` tuple of the number of nodes and edges found.
+
+    """
+    edge_writer = csv.writer(f)
+    edge_writer.writerow(EDGE_COLUMNS)
+    node_writer = None
+
+    if nodes is not None:
+        node_writer = csv.writer(nodes)
+        node_writer.writerow(NODE_COLUMNS)
+
+    node_count = edge_count = 0
+
+    for item in iterparse(xml_file):
+        if isinstance(item, Edge):
+            edge_writer.writerow(item)
+            edge_count += 1
+        else:
+            if node_writer is not None:
+                node_writer.writerow(item)
+            node_count += 1
+
+    return node_count, edge_count
+
+
+def _graphml_data(key, value):
+    if value is None:
+        return ""
+
+    return '<data key="%s">%s</data>' % (key, escape(value))
+
+
+def write_graphml(xml_file, f):
+    """Writes the nodes and relationships found in the STIX XML document
+    `xml_file` to the file-like object `f` as a directed GraphML graph.
+
+    Args:
+        xml_file: A filename or file-like object containing a STIX XML
+            document.
+        f: A file-like object which accepts text.
+
+    Returns:
+        A ``(nodes, edges)`` tuple of the number of nodes and edges written.
+
+    """
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+
+    for domain, name in _GRAPHML_KEYS:
+        f.write(
+            '<key id="%s_%s" for="%s" attr.name="%s" attr.type="string"/>\n'
+            % (domain, name, domain, name)
+        )
+
+    f.write('<graph edgedefault="directed">\n')
+    node_count = edge_count = 0
+
+    for item in iterparse(xml_file):
+        if isinstance(item, Edge):
+            f.write('<edge source=%s target=%s>%s%s%s</edge>\n' % (
+                quoteattr(item.source),
+                quoteattr(item.target),
+                _graphml_data("edge_type", item.type),
+                _graphml_data("edge_relationship", item.relationship),
+                _graphml_data("edge_confidence", item.confidence),
+            ))
+            edge_count += 1
+        else:
+            f.write('<node id=%s>%s%s%s</node>\n' % (
+                quoteattr(item.id),
+                _graphml_data("node_type", item.type),
+                _graphml_data("node_title", item.title),
+                _graphml_data("node_timestamp", item.timestamp),
+            ))
+            node_count += 1
+
+    f.write('</graph>\n</graphml>\n')
+    return node_count, edge_count
+
+
+def write_json(xml_file, f):
+    """Writes the nodes and relationships found in the STIX XML document
+    `xml_file` to the file-like object `f` in the JSON Graph Format
+    (http://jsongraphformat.info).
+
+    Edges are buffered in a temporary file until all nodes have been
+    written, since JSON Graph Format lists all nodes before any edges.
+
+    Args:
+        xml_file: A filename or file-like object containing a STIX XML
+            document.
+        f: A file-like object which accepts text.
+
+    Returns:
+        A ``(nodes, edges)`` tuple of the number of nodes and edges written.
+
+    """
+    node_count = edge_count = 0
+    f.write('{"graph": {"directed": true, "nodes": [')
+
+    with tempfile.TemporaryFile(mode="w+") as edges:
+        for item in iterparse(xml_file):
+            if isinstance(item, Edge):
+                edge = {
+                    "source": item.source,
+                    "target": item.target,
+                    "relation": item.type,
+                    "metadata": {
+                        "relationship": item.relationship,
+                        "confidence": item.confidence,
+                    },
+                }
+
+                edges.write("," if edge_count else "")
+                edges.write(json.dumps(edge, sort_keys=True))
+                edge_count += 1
+            else:
+                node = {
+                    "id": item.id,
+                    "label": item.title,
+                    "metadata": {
+                        "type": item.type,
+                        "timestamp": item.timestamp,
+                    },
+                }
+
+                f.write("," if node_count else "")
+                f.write(json.dumps(node, sort_keys=True))
+                node_count += 1
+
+        f.write('], "edges": [')
+        edges.seek(0)
+
+        for chunk in iter(lambda: edges.read(65536), ""):
+            f.write(chunk)
+
+    f.write("]}}")
+    return node_count, edge_count
@@ -0,0 +1,230 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Flattening of Indicators into tables of indicator atoms.
+
+An *atom* is a single observable value found in an Indicator, such as one
+IP address or one file hash. :func:`flatten` yields batches of atoms as
+dictionaries which map each column name in :data:`COLUMNS` to a list of
+values, so each batch can be handed to a column-oriented writer as-is.
+
+Example:
+    >>> import pyarrow
+    >>> for batch in flatten(package):
+    ...     record_batch = pyarrow.RecordBatch.from_pydict(batch)
+
+    >>> with open("iocs.csv", "w") as f:
+    ...     write_csv(package, f)
+
+"""
+
+# stdlib
+import csv
+
+# external
+from mixbox.vendor.six import text_type
+
+# internal
+from stix.utils import dates
+from stix.utils.introspection import is_true, object_atoms, tlp_color
+
+#: The columns of a flattened indicator table.
+#:
+#: * ``indicator_id``: The id of the Indicator.
+#: * ``type``: The property key of the value, such as
+#:   ``AddressObjectType:address_value``. See :mod:`stix.indicator.matcher`.
+#: * ``value``: The observable value.
+#: * ``condition``: The pattern condition of the value, such as ``Equals``.
+#: * ``confidence``: The value of the Indicator Confidence.
+#: * ``tlp``: The TLP color which applies to the Indicator.
+#: * ``valid_from``: The start of a valid time window.
+#: * ``valid_until``: The end of a valid time window.
+COLUMNS = (
+    "indicator_id",
+    "type",
+    "value",
+    "condition",
+    "confidence",
+    "tlp",
+    "valid_from",
+    "valid_until",
+)
+
+
+def _confidence(indicator):
+    confidence = indicator.confidence
+
+    if confidence is None or confidence.value is None:
+        return None
+
+    return text_type(confidence.value)
+
+
+def _windows(indicator):
+    positions = indicator.valid_time_positions
+
+    if not positions:
+        return [(None, None)]
+
+    windows = []
+
+    for position in positions:
+        start, end = position.start_time, position.end_time
+        windows.append((
+            dates.serialize_value(start.value) if start else None,
+            dates.serialize_value(end.value) if end else None,
+        ))
+
+    return windows
+
+
+class _Flattener(object):
+    def __init__(self, observables=()):
+        self._observables = {}
+        self._indicators = {}
+        self._seen = set()
+
+        for observable in observables:
+            if observable.id_:
+                self._observables[observable.id_] = observable
+
+    def register(self, indicators):
+        for indicator in indicators:
+            if indicator.id_:
+                self._indicators[indicator.id_] = indicator
+
+    def _observable_atoms(self, observable, seen):
+        if observable.idref and not (observable.object_ or
+                                     observable.observable_composition):
+            resolved = self._observables.get(observable.idref)
+
+            if resolved is None or observable.idref in seen:
+                return
+
+            seen = seen | set([observable.idref])
+            observable = resolved
+
+        # Negated observables describe values which are *not* indicators.
+        if is_true(observable.negate):
+            return
+
+        if observable.id_:
+            self._observables.setdefault(observable.id_, observable)
+
+        if observable.object_ is not None:
+            for atom in object_atoms(observable.object_):
+                yield atom
+        elif observable.observable_composition is not None:
+            composition = observable.observable_composition
+
+            for child in composition.observables:
+                for atom in self._observable_atoms(child, seen):
+                    yield atom
+
+    def rows(self, indicator, tlp):
+        """Yields table rows for `indicator` and any Indicators found in its
+        composite indicator expression.
+
+        """
+        if indicator.idref and indicator.observable is None:
+            indicator = self._indicators.get(indicator.idref, indicator)
+
+        if id(indicator) in self._seen or is_true(indicator.negate):
+            return
+
+        self._seen.add(id(indicator))
+        tlp = tlp_color(indicator.handling) or tlp
+
+        if indicator.observable is not None:
+            confidence = _confidence(indicator)
+            windows = _windows(indicator)
+            atoms = self._observable_atoms(indicator.observable, frozenset())
+
+            for type_, value, condition in atoms:
+                for start, end in windows:
+                    yield (indicator.id_, type_, value, condition,
+                           confidence, tlp, start, end)
+
+        for child in indicator.composite_indicator_expression or ():
+            for row in self.rows(child, tlp):
+                yield row
+
+
+def _new_batch():
+    return dict((column, []) for column in COLUMNS)
+
+
+def flatten(indicators, batch_size=10000):
+    """Flattens the observable values of `indicators` into batches of table
+    columns.
+
+    Observable compositions and composite indicator expressions are
+    decomposed into their individual values. Negated Observables and
+    Indicators are left out. An Indicator with several valid time windows
+    produces one row per value and window.
+
+    Args:
+        indicators: A :class:`.STIXPackage` or an iterable collection of
+            :class:`.Indicator` objects. If a STIXPackage is given, its
+            Observables are used to resolve Observable idrefs and its
+            STIX Header handling provides a default TLP color.
+        batch_size: The maximum number of rows in each batch.
+
+    Yields:
+        Dictionaries which map each column name in :data:`COLUMNS` to a
+        list of values.
+
+    """
+    observables, tlp = (), None
+
+    if hasattr(indicators, "indicators"):
+        package = indicators
+        indicators = package.indicators or ()
+
+        if package.observables:
+            observables = package.observables.observables
+        if package.stix_header:
+            tlp = tlp_color(package.stix_header.handling)
+
+    indicators = list(indicators)
+    flattener = _Flattener(observables)
+    flattener.register(indicators)
+
+    batch, count = _new_batch(), 0
+    columns = [batch[column] for column in COLUMNS]
+
+    for indicator in indicators:
+        for row in flattener.rows(indicator, tlp):
+            for column, value in zip(columns, row):
+                column.append(value)
+
+            count += 1
+
+            if count == batch_size:
+                yield batch
+                batch, count = _new_batch(), 0
+                columns = [batch[column] for column in COLUMNS]
+
+    if count:
+        yield batch
+
+
+def write_csv(indicators, f, batch_size=10000):
+    """Writes the flattened `indicators` to the file-like object `f` as CSV,
+    with a header row.
+
+    See :func:`flatten` for a description of the arguments.
+
+    Returns:
+        The number of rows written, not including the header.
+
+    """
+    writer = csv.writer(f)
+    writer.writerow(COLUMNS)
+    count = 0
+
+    for batch in flatten(indicators, batch_size=batch_size):
+        rows = list(zip(*(batch[column] for column in COLUMNS)))
+        writer.writerows(rows)
+        count += len(rows)
+
+    return count
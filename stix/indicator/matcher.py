@@ -0,0 +1,831 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Matching of events against the observable patterns of Indicators.
+
+:func:`compile` turns a collection of :class:`.Indicator` objects into a
+:class:`Matcher`. Each pattern condition found in the indicators (e.g., an
+``Address_Value`` which ``Equals`` an IP address) is stored in an index for
+the object property it applies to, so an event is checked against all of the
+indicators with a handful of lookups rather than by walking each indicator.
+
+Events are dictionaries which map field names to a value or a list of
+values. By default a field name is the *property key* of an object
+property: the ``xsi:type`` of the object properties, a colon, and the
+dotted dictionary keys leading to the property. For example:
+
+* ``AddressObjectType:address_value``
+* ``DomainNameObjectType:value``
+* ``URIObjectType:value``
+* ``FileObjectType:hashes.simple_hash_value``
+
+The `fields` argument of :func:`compile` maps the field names used by an
+event source onto property keys.
+
+Example:
+    >>> matcher = compile(package.indicators, fields={
+    ...     'src_ip': 'AddressObjectType:address_value',
+    ...     'dst_ip': 'AddressObjectType:address_value',
+    ...     'domain': 'DomainNameObjectType:value',
+    ... })
+    >>> matcher.match({'src_ip': '10.0.0.1', 'domain': 'example.com'})
+    ['example:indicator-1234']
+
+Note:
+    ``Contains`` conditions are matched with an Aho-Corasick automaton. The
+    ``pyahocorasick`` package is used if it is installed. Otherwise a pure
+    Python implementation is used. Likewise, :meth:`Matcher.match_batch`
+    uses NumPy if it is installed.
+
+"""
+
+# stdlib
+import collections
+import operator
+import re
+
+# external
+from mixbox.vendor.six import iteritems, string_types, text_type
+from cybox.common.properties import BaseProperty
+
+# internal
+from stix.utils import dates, is_sequence
+from stix.utils.introspection import is_true, iterproperties
+from .valid_time import valid_windows
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Expression tree node kinds.
+_CONST, _LEAF, _AND, _OR, _NOT = range(5)
+
+_TRUE = (_CONST, True)
+_FALSE = (_CONST, False)
+
+# Conditions which compare numerically.
+_NUMERIC_CONDITIONS = {
+    "GreaterThan": operator.gt,
+    "GreaterThanOrEqual": operator.ge,
+    "LessThan": operator.lt,
+    "LessThanOrEqual": operator.le,
+}
+
+#: An Indicator which :func:`compile` could not compile, and left out of the
+#: :class:`Matcher`.
+#:
+#: Attributes:
+#:     id: The ``id`` (or ``idref``) of the Indicator.
+#:     indicator: The Indicator.
+#:     error: A :class:`ValueError` which describes the problem (e.g., an
+#:         unsupported pattern condition).
+Unsupported = collections.namedtuple("Unsupported", ("id", "indicator", "error"))
+
+
+def _and(nodes):
+    nodes = [n for n in nodes if n is not _TRUE]
+
+    if _FALSE in nodes:
+        return _FALSE
+    elif not nodes:
+        return _TRUE
+    elif len(nodes) == 1:
+        return nodes[0]
+
+    return (_AND, tuple(nodes))
+
+
+def _or(nodes):
+    nodes = [n for n in nodes if n is not _FALSE]
+
+    if _TRUE in nodes:
+        return _TRUE
+    elif not nodes:
+        return _FALSE
+    elif len(nodes) == 1:
+        return nodes[0]
+
+    return (_OR, tuple(nodes))
+
+
+def _not(node):
+    if node is _TRUE:
+        return _FALSE
+    elif node is _FALSE:
+        return _TRUE
+    elif node[0] == _NOT:
+        return node[1]
+
+    return (_NOT, node)
+
+
+def _evaluate(node, hits):
+    """Evaluates the expression tree `node`, given the set of leaf ids which
+    were satisfied by an event.
+
+    """
+    kind = node[0]
+
+    if kind == _LEAF:
+        return node[1] in hits
+    elif kind == _AND:
+        return all(_evaluate(x, hits) for x in node[1])
+    elif kind == _OR:
+        return any(_evaluate(x, hits) for x in node[1])
+    elif kind == _NOT:
+        return not _evaluate(node[1], hits)
+
+    return node[1]
+
+
+def _iterleaves(node):
+    kind = node[0]
+
+    if kind == _LEAF:
+        yield node[1]
+    elif kind in (_AND, _OR):
+        for child in node[1]:
+            for leaf in _iterleaves(child):
+                yield leaf
+    elif kind == _NOT:
+        for leaf in _iterleaves(node[1]):
+            yield leaf
+
+
+class _AhoCorasick(object):
+    """Finds every needle which occurs in a string, in one pass over the
+    string.
+
+    """
+    def __init__(self):
+        self._needles = {}
+        self._automaton = None
+
+    def __len__(self):
+        return len(self._needles)
+
+    def add(self, needle, lid):
+        self._needles.setdefault(needle, []).append(lid)
+        self._automaton = None
+
+    def build(self):
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+
+            for needle, lids in iteritems(self._needles):
+                automaton.add_word(needle, tuple(lids))
+
+            automaton.make_automaton()
+            self._automaton = automaton
+            return
+
+        goto, fail, out = [{}], [0], [[]]
+
+        for needle, lids in iteritems(self._needles):
+            state = 0
+
+            for char in needle:
+                nxt = goto[state].get(char)
+
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+
+                state = nxt
+
+            out[state].extend(lids)
+
+        # Breadth first, so the fail state of a parent is always known. The
+        # children of the root state fail back to the root.
+        queue = collections.deque(goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for char, nxt in iteritems(goto[state]):
+                queue.append(nxt)
+                f = fail[state]
+
+                while f and char not in goto[f]:
+                    f = fail[f]
+
+                fail[nxt] = goto[f].get(char, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._automaton = (goto, fail, out)
+
+    def search(self, text):
+        """Yields the lists of leaf ids for each needle found in `text`."""
+        if self._automaton is None:
+            self.build()
+
+        if ahocorasick is not None:
+            for _, lids in self._automaton.iter(text):
+                yield lids
+            return
+
+        goto, fail, out = self._automaton
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(char, 0)
+
+            if out[state]:
+                yield out[state]
+
+
+class _PropertyIndex(object):
+    """The conditions found for one property key.
+
+    Values given to :meth:`collect` are expected to be lowercased if this
+    index holds case-insensitive conditions.
+
+    """
+    def __init__(self, case_sensitive):
+        self.case_sensitive = case_sensitive
+        self.equals = {}
+        self._equals_array = None
+        self.contains = _AhoCorasick()
+        self.prefixes = {}
+        self.suffixes = {}
+        self.patterns = []
+        self.predicates = []
+
+    @property
+    def equality_only(self):
+        """``True`` if this index only holds ``Equals`` conditions."""
+        return not (
+            self.contains or self.prefixes or self.suffixes or
+            self.patterns or self.predicates
+        )
+
+    def add(self, lid, condition, value):
+        if not self.case_sensitive:
+            value = value.lower()
+
+        if condition == "Equals":
+            self.equals.setdefault(value, []).append(lid)
+            self._equals_array = None
+        elif condition == "Contains" and value:
+            self.contains.add(value, lid)
+        elif condition == "StartsWith" and value:
+            table = self.prefixes.setdefault(len(value), {})
+            table.setdefault(value, []).append(lid)
+        elif condition == "EndsWith" and value:
+            table = self.suffixes.setdefault(len(value), {})
+            table.setdefault(value, []).append(lid)
+        elif condition == "FitsPattern":
+            flags = 0 if self.case_sensitive else re.IGNORECASE
+
+            try:
+                regex = re.compile(value, flags)
+            except re.error as ex:
+                error = "Invalid FitsPattern value '%s': %s" % (value, ex)
+                raise ValueError(error)
+
+            self.patterns.append((regex, lid))
+        else:
+            self.predicates.append((self._predicate(condition, value), lid))
+
+    def equal_rows(self, column, lowercase):
+        """Returns the positions of the values in `column` which may satisfy
+        an ``Equals`` condition of this index.
+
+        Positions of values which are not strings or numbers (e.g., lists)
+        are always returned so the caller can check them one by one.
+
+        """
+        if numpy is not None:
+            values = numpy.asarray(column)
+
+            if values.dtype.kind in "Uiuf" and values.ndim == 1:
+                if values.dtype.kind != "U":
+                    values = values.astype(text_type)
+                if lowercase:
+                    values = numpy.char.lower(values)
+                if self._equals_array is None:
+                    self._equals_array = numpy.array(list(self.equals))
+
+                mask = numpy.isin(values, self._equals_array)
+                return numpy.flatnonzero(mask).tolist()
+
+        equals = self.equals
+        rows = []
+
+        for row, value in enumerate(column):
+            if value is None:
+                continue
+            elif isinstance(value, text_type):
+                pass
+            elif isinstance(value, string_types + (int, float)):
+                value = text_type(value)
+            else:
+                rows.append(row)
+                continue
+
+            if lowercase:
+                value = value.lower()
+            if value in equals:
+                rows.append(row)
+
+        return rows
+
+    @staticmethod
+    def _predicate(condition, value):
+        if condition in ("Contains", "StartsWith", "EndsWith"):
+            return lambda x: True  # An empty needle matches anything.
+        elif condition == "DoesNotEqual":
+            return lambda x: x != value
+        elif condition == "DoesNotContain":
+            return lambda x: value not in x
+        elif condition in _NUMERIC_CONDITIONS:
+            compare = _NUMERIC_CONDITIONS[condition]
+            expected = float(value)
+
+            def predicate(x):
+                try:
+                    return compare(float(x), expected)
+                except ValueError:
+                    return False
+
+            return predicate
+
+        raise ValueError("Unsupported pattern condition: '%s'" % condition)
+
+    def collect(self, value, hits):
+        """Adds the ids of the leaves satisfied by `value` to `hits`."""
+        lids = self.equals.get(value)
+
+        if lids:
+            hits.update(lids)
+
+        if self.contains:
+            for lids in self.contains.search(value):
+                hits.update(lids)
+
+        for length, table in iteritems(self.prefixes):
+            lids = table.get(value[:length])
+
+            if lids:
+                hits.update(lids)
+
+        for length, table in iteritems(self.suffixes):
+            lids = table.get(value[-length:])
+
+            if lids:
+                hits.update(lids)
+
+        for regex, lid in self.patterns:
+            if regex.search(value):
+                hits.add(lid)
+
+        for predicate, lid in self.predicates:
+            if predicate(value):
+                hits.add(lid)
+
+
+class Matcher(object):
+    """Matches events against a set of compiled Indicators.
+
+    Use :func:`compile` to create an instance of this class.
+
+    Args:
+        fields: A mapping of event field names to a property key or a list of
+            property keys. Event fields which are not found in `fields` are
+            treated as property keys.
+
+    Attributes:
+        unsupported: A list of :data:`Unsupported` tuples for the Indicators
+            which could not be compiled, such as those which use a condition
+            or ``apply_condition`` which cannot be matched, or an invalid
+            ``FitsPattern`` regular expression. These Indicators never
+            match.
+
+    """
+    def __init__(self, fields=None):
+        self._fields = {}
+        self._leaves = {}
+        self._leaf_roots = []
+        self._indexes = {}
+        self._field_indexes = {}
+        self._ids = []
+        self._trees = []
+        self._windows = []
+        self._always = []
+        self._observables = {}
+        self._indicators = {}
+        self.unsupported = []
+
+        for name, keys in iteritems(fields or {}):
+            if isinstance(keys, string_types):
+                keys = (keys,)
+
+            self._fields[name] = tuple(keys)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _register(self, indicators, observables=()):
+        """Records the ids of Indicators and Observables found in
+        `indicators` and `observables` so idrefs can be resolved.
+
+        """
+        stack = list(indicators)
+        obs_stack = list(observables)
+
+        while stack:
+            indicator = stack.pop()
+
+            if indicator.id_:
+                self._indicators[indicator.id_] = indicator
+            if indicator.observable is not None:
+                obs_stack.append(indicator.observable)
+            if indicator.composite_indicator_expression:
+                stack.extend(indicator.composite_indicator_expression)
+
+        while obs_stack:
+            observable = obs_stack.pop()
+
+            if observable.id_:
+                self._observables[observable.id_] = observable
+            if observable.observable_composition:
+                obs_stack.extend(observable.observable_composition.observables)
+
+    def _leaf(self, key, condition, value, case_sensitive):
+        signature = (key, condition, value, case_sensitive)
+        lid = self._leaves.get(signature)
+
+        if lid is not None:
+            return (_LEAF, lid)
+
+        lid = len(self._leaf_roots)
+        index = self._indexes.get((key, case_sensitive))
+
+        if index is None:
+            index = _PropertyIndex(case_sensitive)
+            self._indexes[(key, case_sensitive)] = index
+            self._field_indexes.clear()
+
+        index.add(lid, condition, value)
+        self._leaves[signature] = lid
+        self._leaf_roots.append([])
+        return (_LEAF, lid)
+
+    def _property_node(self, key, prop, condition):
+        if isinstance(prop, BaseProperty):
+            values = prop.values
+        else:
+            values = [prop.value] if prop.value is not None else []
+
+        if not values:
+            return _FALSE
+
+        case_sensitive = prop.is_case_sensitive is not False
+        leaves = [
+            self._leaf(key, condition, text_type(v), case_sensitive)
+            for v in values
+        ]
+
+        apply_condition = prop.apply_condition
+
+        if len(leaves) == 1 or apply_condition in (None, "ANY"):
+            return _or(leaves)
+        elif apply_condition == "ALL":
+            return _and(leaves)
+        elif apply_condition == "NONE":
+            return _not(_or(leaves))
+
+        error = "Unsupported apply_condition: '%s'" % apply_condition
+        raise ValueError(error)
+
+    def _object_node(self, obj):
+        properties = obj.properties
+
+        if properties is None:
+            return _FALSE
+
+        prefix = "%s:" % properties._XSI_TYPE
+        found = list(iterproperties(properties))
+        patterns = [(p, x) for p, x in found if x.condition]
+
+        # Object properties which have no pattern conditions are treated as
+        # though their values must be equal to those found in an event.
+        if patterns:
+            nodes = [
+                self._property_node(prefix + path, prop, prop.condition)
+                for path, prop in patterns
+            ]
+        else:
+            nodes = [
+                self._property_node(prefix + path, prop, "Equals")
+                for path, prop in found
+                if isinstance(prop, BaseProperty)
+            ]
+
+        if not nodes:
+            return _FALSE
+
+        return _and(nodes)
+
+    def _observable_node(self, observable, seen):
+        if observable.idref and not (observable.object_ or
+                                     observable.observable_composition):
+            if observable.idref in seen:
+                return _FALSE
+
+            resolved = self._observables.get(observable.idref)
+
+            if resolved is None:
+                return _FALSE
+
+            seen = seen | set([observable.idref])
+            node = self._observable_node(resolved, seen)
+        elif observable.object_ is not None:
+            node = self._object_node(observable.object_)
+        elif observable.observable_composition is not None:
+            composition = observable.observable_composition
+            nodes = [
+                self._observable_node(x, seen)
+                for x in composition.observables
+            ]
+
+            if composition.operator == "AND":
+                node = _and(nodes)
+            else:
+                node = _or(nodes)
+        else:
+            node = _FALSE
+
+        if is_true(observable.negate):
+            return _not(node)
+
+        return node
+
+    def _indicator_node(self, indicator, seen):
+        if indicator.idref and indicator.observable is None and \
+                not indicator.composite_indicator_expression:
+            if indicator.idref in seen:
+                return _FALSE
+
+            resolved = self._indicators.get(indicator.idref)
+
+            if resolved is None:
+                return _FALSE
+
+            seen = seen | set([indicator.idref])
+            return self._indicator_node(resolved, seen)
+
+        nodes = []
+
+        if indicator.observable is not None:
+            nodes.append(self._observable_node(indicator.observable, seen))
+
+        expression = indicator.composite_indicator_expression
+
+        if expression:
+            children = [self._indicator_node(x, seen) for x in expression]
+
+            if expression.operator == "AND":
+                nodes.append(_and(children))
+            else:
+                nodes.append(_or(children))
+
+        if not nodes:
+            return _FALSE
+
+        node = _and(nodes)
+
+        if is_true(indicator.negate):
+            return _not(node)
+
+        return node
+
+    def add(self, indicator):
+        """Compiles `indicator` and adds it to the matcher. If `indicator`
+        cannot be compiled, it is added to :attr:`unsupported` instead.
+
+        Note:
+            Idrefs are only resolved against Indicators and Observables which
+            are already known to the matcher. Use :func:`compile` to add
+            several Indicators which refer to one another.
+
+        """
+        self._register([indicator])
+        self._compile(indicator)
+
+    def _compile(self, indicator):
+        try:
+            tree = self._indicator_node(indicator, frozenset())
+        except ValueError as ex:
+            id_ = indicator.id_ or indicator.idref
+            self.unsupported.append(Unsupported(id_, indicator, ex))
+            return
+
+        pos = len(self._ids)
+
+        self._ids.append(indicator.id_ or indicator.idref)
+        self._trees.append(tree)
+        self._windows.append(valid_windows(indicator))
+
+        for lid in set(_iterleaves(tree)):
+            self._leaf_roots[lid].append(pos)
+
+        if _evaluate(tree, frozenset()):
+            self._always.append(pos)
+
+    def _indexes_for(self, field):
+        """Returns a list of ``(index, lowercase)`` tuples which apply to the
+        event field `field`.
+
+        """
+        try:
+            return self._field_indexes[field]
+        except KeyError:
+            pass
+
+        found = []
+
+        for key in self._fields.get(field, (field,)):
+            for case_sensitive in (True, False):
+                index = self._indexes.get((key, case_sensitive))
+
+                if index is not None:
+                    found.append((index, not case_sensitive))
+
+        self._field_indexes[field] = found
+        return found
+
+    def _hits(self, event):
+        hits = set()
+
+        for field, value in iteritems(event):
+            if value is None:
+                continue
+
+            indexes = self._indexes_for(field)
+
+            if not indexes:
+                continue
+
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                value = (value,)
+
+            for item in value:
+                if not isinstance(item, text_type):
+                    item = text_type(item)
+
+                for index, lowercase in indexes:
+                    index.collect(item.lower() if lowercase else item, hits)
+
+        return hits
+
+    def _is_valid(self, pos, t):
+        windows = self._windows[pos]
+
+        if windows is None:
+            return True
+
+        return any(start <= t <= end for start, end in windows)
+
+    def _matches(self, hits, at=None):
+        if not hits and not self._always:
+            return []
+
+        candidates = set(self._always)
+        leaf_roots = self._leaf_roots
+
+        for lid in hits:
+            candidates.update(leaf_roots[lid])
+
+        if at is not None:
+            t = dates.timestamp(at)
+            candidates = [x for x in candidates if self._is_valid(x, t)]
+
+        trees, ids = self._trees, self._ids
+        return [
+            ids[pos] for pos in sorted(candidates)
+            if _evaluate(trees[pos], hits)
+        ]
+
+    def match(self, event, at=None):
+        """Returns a list of the ids of the Indicators matched by `event`, in
+        the order the Indicators were compiled.
+
+        Args:
+            event: A dictionary which maps field names to a value or a list
+                of values. A field with a list of values satisfies a
+                condition if any of the values satisfies it.
+            at: The time of the event. If given, only Indicators whose
+                ``valid_time_positions`` contain `at` are matched.
+
+        """
+        return self._matches(self._hits(event), at)
+
+    def match_batch(self, columns, at=None):
+        """Matches a batch of events given in columnar form.
+
+        Rows are only checked one at a time if one of their values satisfies
+        an ``Equals`` condition, or if a column is used by a condition which
+        is not ``Equals`` (e.g., ``Contains``). Batches which are only
+        checked against ``Equals`` conditions are filtered with vectorized
+        set membership tests if NumPy is installed.
+
+        Args:
+            columns: A dictionary which maps field names to equal-length
+                sequences of values. Row ``i`` is the event made of the
+                ``i``-th value of each column. ``None`` values are ignored.
+            at: The time of every event in the batch, or a sequence holding
+                the time of each row. See :meth:`match`.
+
+        Returns:
+            A list which contains, for each row, the list of the ids of the
+            Indicators matched by that row.
+
+        Raises:
+            ValueError: If the columns are not all the same length.
+
+        """
+        lengths = set(len(x) for x in columns.values())
+
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length.")
+
+        num_rows = lengths.pop() if lengths else 0
+        results = [[] for _ in range(num_rows)]
+        check_all = bool(self._always)
+        rows = set()
+
+        for field, column in iteritems(columns):
+            if check_all:
+                break
+
+            for index, lowercase in self._indexes_for(field):
+                if not index.equality_only:
+                    check_all = True
+                    break
+
+                rows.update(index.equal_rows(column, lowercase))
+
+        if check_all:
+            rows = range(num_rows)
+
+        per_row = is_sequence(at)
+
+        for row in rows:
+            event = dict((f, c[row]) for f, c in iteritems(columns))
+            results[row] = self.match(event, at[row] if per_row else at)
+
+        return results
+
+
+def compile(indicators, fields=None):
+    """Compiles the observable patterns of `indicators` into a
+    :class:`Matcher`.
+
+    Indicator and Observable idrefs are resolved against the Indicators and
+    Observables found in `indicators`. If `indicators` is a
+    :class:`.STIXPackage`, its Indicators are compiled and the Observables
+    found in the package are also used to resolve idrefs.
+
+    Args:
+        indicators: An iterable collection of :class:`.Indicator` objects or
+            a :class:`.STIXPackage`.
+        fields: A mapping of event field names to a property key or a list of
+            property keys. See :class:`Matcher`.
+
+    Indicators which cannot be compiled are left out of the matcher and
+    listed in its :attr:`Matcher.unsupported` attribute.
+
+    Returns:
+        A :class:`Matcher` instance.
+
+    """
+    matcher = Matcher(fields=fields)
+    observables = ()
+
+    if hasattr(indicators, "indicators"):
+        package = indicators
+        indicators = package.indicators or ()
+
+        if package.observables:
+            observables = package.observables.observables
+
+    indicators = list(indicators)
+    matcher._register(indicators, observables)
+
+    for indicator in indicators:
+        matcher._compile(indicator)
+
+    return matcher
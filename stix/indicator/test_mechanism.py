@@ -1,12 +1,25 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+# stdlib
+import base64
+import collections
+import copy
+import hashlib
+import os
+import re
+import textwrap
+
 # external
+from lxml import etree
 from mixbox import fields, entities
+import mixbox.xml
+from mixbox.vendor import six
 
 # internal
 import stix
 from stix.common import InformationSource, Statement
+from stix.utils.introspection import is_true
 
 # bindings
 import stix.bindings.indicator as indicator_binding
@@ -45,10 +58,6 @@ class _BaseTestMechanism(stix.Entity):
 class TestMechanismFactory(entities.EntityFactory):
     @classmethod
     def entity_class(self, key):
-        import stix.extensions.test_mechanism.snort_test_mechanism  # noqa
-        import stix.extensions.test_mechanism.open_ioc_2010_test_mechanism  # noqa
-        import stix.extensions.test_mechanism.yara_test_mechanism  # noqa
-        import stix.extensions.test_mechanism.generic_test_mechanism  # noqa
         return stix.lookup_extension(key)
 
 
@@ -65,6 +74,327 @@ class TestMechanisms(stix.EntityList):
     )
 
 
+#: A detection rule extracted by :func:`extract_rules`. `key` identifies the
+#: rule for deduplication, and `text` is the normalized rule. OpenIOC rules
+#: are serialized ``ioc`` documents, as UTF-8 encoded bytes.
+Rule = collections.namedtuple("Rule", ("key", "text"))
+
+#: The namespaces of the test mechanisms :func:`extract_rules` can extract
+#: rules from, by kind.
+KINDS = {
+    "snort": "http://stix.mitre.org/extensions/TestMechanism#Snort-1",
+    "yara": "http://stix.mitre.org/extensions/TestMechanism#YARA-1",
+    "openioc": "http://stix.mitre.org/extensions/TestMechanism#OpenIOC2010-1",
+}
+
+_TAG_TEST_MECHANISM = "{http://stix.mitre.org/Indicator-2}Test_Mechanism"
+_TAG_STIX = "{http://stix.mitre.org/stix-1}*"
+_TAG_OPENIOC = "{http://schemas.mandiant.com/2010/ioc}ioc"
+_XSI_TYPE = "{http://www.w3.org/2001/XMLSchema-instance}type"
+
+# Quoted strings and whitespace runs in a Snort rule. Whitespace inside
+# quoted strings (e.g., content matches) is significant.
+_SNORT_TOKEN_RE = re.compile(r'("(?:\\.|[^"\\])*")|(\s+)')
+_SNORT_CONTINUATION_RE = re.compile(r"\\[ \t]*\r?\n")
+_SNORT_OPTION_RE = re.compile(
+    r"(?:^|[;(])\s*(gid|sid|rev)\s*:\s*(\d+)\s*(?=;)"
+)
+
+
+def _decode(text, encoded):
+    """Returns the content of an EncodedCDATA value."""
+    if text is None:
+        return None
+
+    if is_true(encoded):
+        text = base64.b64decode(text).decode("utf-8")
+
+    return text
+
+
+def _snort_rules(text):
+    """Yields the normalized rules in the Snort rule text `text`.
+
+    Each line is a rule, and line continuations are joined. Whitespace runs
+    outside of quoted strings are collapsed to single spaces. Blank lines
+    and comments are skipped.
+
+    """
+    text = _SNORT_CONTINUATION_RE.sub(" ", text)
+
+    for line in text.splitlines():
+        line = _SNORT_TOKEN_RE.sub(
+            lambda m: m.group(1) or " ", line
+        ).strip()
+
+        if line and not line.startswith("#"):
+            yield line
+
+
+def _snort_key(rule):
+    """Returns the ``gid:sid:rev`` key of `rule`, or ``None`` if it does
+    not have a sid.
+
+    """
+    options = dict(_SNORT_OPTION_RE.findall(rule))
+
+    if "sid" not in options:
+        return None
+
+    return "%s:%s:%s" % (
+        options.get("gid", "1"), options["sid"], options.get("rev", "0")
+    )
+
+
+def _yara_rule(text):
+    """Returns the YARA rule text `text` dedented, with normalized line
+    endings and without trailing whitespace.
+
+    """
+    lines = [line.rstrip() for line in text.splitlines()]
+    return textwrap.dedent("\n".join(lines)).strip("\n")
+
+
+def _openioc_document(ioc):
+    """Returns a standalone copy of the OpenIOC ``ioc`` element `ioc`."""
+    ioc = copy.deepcopy(ioc)
+    ioc.tag = _TAG_OPENIOC
+    ioc.tail = None
+    etree.cleanup_namespaces(ioc)
+    return ioc
+
+
+def _digest(text):
+    if isinstance(text, six.text_type):
+        text = text.encode("utf-8")
+
+    return hashlib.sha256(text).hexdigest()
+
+
+def _rules(kind, values):
+    """Yields the :class:`Rule` tuples found in `values`.
+
+    For Snort and YARA, `values` are ``(text, encoded)`` pairs. For OpenIOC,
+    they are ``ioc`` elements.
+
+    """
+    if kind == "openioc":
+        for ioc in values:
+            ioc = _openioc_document(ioc)
+            text = etree.tostring(ioc, encoding="UTF-8", xml_declaration=True)
+            yield Rule(_digest(etree.tostring(ioc, method="c14n")), text)
+
+    elif kind == "snort":
+        for text, encoded in values:
+            for rule in _snort_rules(_decode(text, encoded) or ""):
+                yield Rule(_snort_key(rule) or _digest(rule), rule)
+
+    else:
+        for text, encoded in values:
+            rule = _yara_rule(_decode(text, encoded) or "")
+
+            if rule:
+                yield Rule(_digest(rule), rule)
+
+
+def _entity_values(kind, test_mechanism):
+    if kind == "openioc":
+        if test_mechanism.ioc is not None:
+            yield mixbox.xml.get_etree_root(test_mechanism.ioc)
+
+    elif kind == "snort":
+        for rule in test_mechanism.rules:
+            yield rule.value, rule.encoded
+
+    elif test_mechanism.rule is not None:
+        yield test_mechanism.rule.value, test_mechanism.rule.encoded
+
+
+def _iterentities(kind, entity):
+    from stix.utils.walk import iterwalk
+
+    namespace = KINDS[kind]
+
+    for item in iterwalk(entity):
+        if (isinstance(item, _BaseTestMechanism) and
+                item._namespace == namespace):
+            for value in _entity_values(kind, item):
+                yield value
+
+
+def _is_kind(elem, namespace):
+    xsi_type = elem.get(_XSI_TYPE)
+
+    if not xsi_type or ":" not in xsi_type:
+        return False
+
+    prefix = xsi_type.split(":", 1)[0]
+    return elem.nsmap.get(prefix) == namespace
+
+
+def _element_values(kind, elem):
+    if kind == "openioc":
+        for child in elem:
+            if etree.QName(child).localname == "ioc":
+                yield child
+
+        return
+
+    for child in elem.iterchildren("{%s}Rule" % KINDS[kind]):
+        yield child.text, child.get("encoded")
+
+
+def _iterparse(kind, xml_file):
+    """Yields rule values from the test mechanisms in the STIX XML document
+    `xml_file`, clearing parsed content as it goes.
+
+    """
+    namespace = KINDS[kind]
+
+    events = etree.iterparse(
+        xml_file,
+        tag=(_TAG_TEST_MECHANISM, _TAG_STIX),
+        huge_tree=True,
+        remove_comments=True,
+        resolve_entities=False
+    )
+
+    for _, elem in events:
+        if elem.tag == _TAG_TEST_MECHANISM:
+            if _is_kind(elem, namespace):
+                for value in _element_values(kind, elem):
+                    yield value
+
+            elem.clear()
+            continue
+
+        # Free top-level components (and their containers) once they have
+        # been read.
+        parent = elem.getparent()
+
+        if parent is None:
+            continue
+
+        grandparent = parent.getparent()
+
+        if grandparent is None or grandparent.getparent() is None:
+            elem.clear()
+
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def extract_rules(package_or_stream, kind="snort"):
+    """Yields the unique detection rules of `kind` found in the test
+    mechanisms of a STIX package.
+
+    If `package_or_stream` is not an entity, it is read with an incremental
+    parser and rules are yielded as they are found, without building the
+    package object model.
+
+    Rules are normalized before they are compared:
+
+    * Snort rules are split into one rule per line, with line continuations
+      joined and whitespace outside of quoted strings collapsed. Rules are
+      deduplicated by their ``gid:sid:rev`` (only the first rule with a
+      given sid and rev is kept), or by content if they do not have a sid.
+    * YARA rules are dedented, without trailing whitespace, and
+      deduplicated by content.
+    * OpenIOC ``ioc`` documents are deduplicated by their canonical XML.
+
+    CDATA sections are unwrapped, and Base64 ``encoded`` content is decoded.
+
+    Args:
+        package_or_stream: A :class:`.STIXPackage` (or any other entity),
+            or a filename or file-like object containing a STIX XML
+            document.
+        kind: One of ``"snort"``, ``"yara"`` or ``"openioc"``.
+
+    Yields:
+        :class:`Rule` tuples.
+
+    Raises:
+        ValueError: If `kind` is not known.
+
+    """
+    if kind not in KINDS:
+        error = "Unknown rule kind '{0}'. Expected one of {1}."
+        raise ValueError(error.format(kind, sorted(KINDS)))
+
+    if isinstance(package_or_stream, entities.Entity):
+        values = _iterentities(kind, package_or_stream)
+    else:
+        values = _iterparse(kind, package_or_stream)
+
+    seen = set()
+
+    for rule in _rules(kind, values):
+        if rule.key in seen:
+            continue
+
+        seen.add(rule.key)
+        yield rule
+
+
+def write_rules(package_or_stream, f, kind="snort"):
+    """Writes the unique Snort or YARA rules found in `package_or_stream` to
+    the file-like object `f`, ready to be loaded by a sensor.
+
+    Snort rules are written one per line. YARA rules are separated by blank
+    lines.
+
+    Args:
+        package_or_stream: See :func:`extract_rules`.
+        f: A file-like object which accepts text.
+        kind: ``"snort"`` or ``"yara"``.
+
+    Returns:
+        The number of rules written.
+
+    """
+    if kind == "openioc":
+        raise ValueError("OpenIOC rules are written with write_iocs()")
+
+    separator = "\n" if kind == "snort" else "\n\n"
+    count = 0
+
+    for rule in extract_rules(package_or_stream, kind=kind):
+        f.write(rule.text)
+        f.write(separator)
+        count += 1
+
+    return count
+
+
+def write_iocs(package_or_stream, directory):
+    """Writes the unique OpenIOC documents found in `package_or_stream` to
+    `directory`, one ``.ioc`` file each.
+
+    Files are named after the ``id`` of the ioc, or its content hash if it
+    does not have one.
+
+    Args:
+        package_or_stream: See :func:`extract_rules`.
+        directory: An existing directory.
+
+    Returns:
+        A list of the paths written.
+
+    """
+    paths = []
+
+    for rule in extract_rules(package_or_stream, kind="openioc"):
+        id_ = etree.fromstring(rule.text).get("id") or rule.key
+        name = re.sub(r"[^\w.-]", "_", id_) + ".ioc"
+        path = os.path.join(directory, name)
+
+        with open(path, "wb") as f:
+            f.write(rule.text)
+
+        paths.append(path)
+
+    return paths
+
 
 # Backwards compatibility
 add_extension = stix.add_extension
@@ -1,12 +1,18 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
+import bisect
+
 from mixbox import fields
 
 import stix
 from stix.common import DateTimeWithPrecision
+from stix.utils import dates
 import stix.bindings.indicator as indicator_binding
 from mixbox.entities import Entity
 
+_MIN_TIME = float("-inf")
+_MAX_TIME = float("inf")
+
 class ValidTime(Entity):
     _namespace = "http://stix.mitre.org/Indicator-2"
     _binding = indicator_binding
@@ -20,3 +26,194 @@ class ValidTime(Entity):
         self.start_time = start_time
         self.end_time = end_time
 
+
+def _endpoint(value, default):
+    if isinstance(value, DateTimeWithPrecision):
+        value = value.value
+
+    if value is None:
+        return default
+
+    return dates.timestamp(value)
+
+
+def valid_windows(indicator):
+    """Returns the valid time windows of `indicator` as a list of
+    ``(start, end)`` tuples of Unix timestamps.
+
+    A missing start or end time is treated as an open end of the window.
+    Windows which end before they start are left out.
+
+    Returns:
+        A list of ``(start, end)`` tuples, or ``None`` if `indicator` has no
+        ``valid_time_positions`` and is therefore valid at any time.
+
+    """
+    positions = indicator.valid_time_positions
+
+    if not positions:
+        return None
+
+    windows = []
+
+    for position in positions:
+        start = _endpoint(position.start_time, _MIN_TIME)
+        end = _endpoint(position.end_time, _MAX_TIME)
+
+        if start <= end:
+            windows.append((start, end))
+
+    return windows
+
+
+def _build_tree(intervals):
+    """Builds a centered interval tree node over a list of
+    ``(start, end, position)`` tuples.
+
+    Each node is a ``(center, by_start, by_end, left, right)`` tuple.
+    ``by_start`` and ``by_end`` hold the intervals which contain ``center``
+    ordered by ascending start and descending end. ``left`` and ``right``
+    hold the intervals which end before, or start after, ``center``.
+
+    """
+    if not intervals:
+        return None
+
+    endpoints = sorted(x for start, end, _ in intervals for x in (start, end))
+    center = endpoints[len(endpoints) // 2]
+    here, left, right = [], [], []
+
+    for interval in intervals:
+        if interval[1] < center:
+            left.append(interval)
+        elif interval[0] > center:
+            right.append(interval)
+        else:
+            here.append(interval)
+
+    by_start = sorted((start, pos) for start, _, pos in here)
+    by_end = sorted(((end, pos) for _, end, pos in here), reverse=True)
+
+    return (center, by_start, by_end, _build_tree(left), _build_tree(right))
+
+
+class ValidTimeIndex(object):
+    """An index of Indicators by their ``valid_time_positions``.
+
+    Indicators without any ``valid_time_positions`` are considered valid at
+    all times. Queries return Indicators in the order they were added.
+
+    Args:
+        indicators: An iterable collection of :class:`.Indicator` objects.
+
+    """
+    def __init__(self, indicators=None):
+        self._values = []
+        self._unbounded = []
+        self._intervals = []
+        self._tree = None
+        self._starts = None
+        self._start_positions = None
+
+        for indicator in indicators or ():
+            self.add(indicator)
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, indicator, value=None):
+        """Adds `indicator` to the index.
+
+        Args:
+            indicator: An :class:`.Indicator` object.
+            value: The value returned for `indicator` by queries. If ``None``,
+                `indicator` itself is returned.
+
+        """
+        pos = len(self._values)
+        windows = valid_windows(indicator)
+
+        self._values.append(indicator if value is None else value)
+        self._tree = self._starts = self._start_positions = None
+
+        if windows is None:
+            self._unbounded.append(pos)
+        else:
+            self._intervals.extend((s, e, pos) for s, e in windows)
+
+    def _build(self):
+        if self._starts is not None:
+            return
+
+        self._tree = _build_tree(self._intervals)
+
+        starts = sorted((start, pos) for start, _, pos in self._intervals)
+        self._starts = [start for start, _ in starts]
+        self._start_positions = [pos for _, pos in starts]
+
+    def _stab(self, t, found):
+        node = self._tree
+
+        while node is not None:
+            center, by_start, by_end, left, right = node
+
+            if t < center:
+                for start, pos in by_start:
+                    if start > t:
+                        break
+                    found.add(pos)
+                node = left
+            elif t > center:
+                for end, pos in by_end:
+                    if end < t:
+                        break
+                    found.add(pos)
+                node = right
+            else:
+                found.update(pos for _, pos in by_start)
+                break
+
+    def _results(self, found):
+        values = self._values
+        return [values[pos] for pos in sorted(found)]
+
+    def valid_at(self, t):
+        """Returns the Indicators which are valid at the time `t`.
+
+        Args:
+            t: A timestamp. This can be a string, datetime.date, or
+                datetime.datetime value. Naive values are assumed to be UTC.
+
+        """
+        self._build()
+
+        found = set(self._unbounded)
+        self._stab(dates.timestamp(t), found)
+        return self._results(found)
+
+    def overlapping(self, start=None, end=None):
+        """Returns the Indicators which are valid at any time between `start`
+        and `end` (inclusive).
+
+        Args:
+            start: A timestamp. If ``None``, the window has no start.
+            end: A timestamp. If ``None``, the window has no end.
+
+        """
+        self._build()
+
+        start = _endpoint(start, _MIN_TIME)
+        end = _endpoint(end, _MAX_TIME)
+        found = set(self._unbounded)
+
+        if start > end:
+            return []
+
+        # Windows which contain `start`, plus those which begin after it.
+        self._stab(start, found)
+
+        lo = bisect.bisect_right(self._starts, start)
+        hi = bisect.bisect_right(self._starts, end)
+        found.update(self._start_positions[lo:hi])
+
+        return self._results(found)
@@ -0,0 +1,297 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Timings and counters for parsing and serialization.
+
+Instrumentation is disabled by default. While it is enabled, each callback
+passed to :func:`enable` is called with an :class:`Event` for each
+measurement:
+
+* :meth:`.EntityParser.parse_xml` reports the ``parse_xml`` total and its
+  ``parse_xml.lxml`` (XML parsing), ``parse_xml.validate`` (schema
+  validation, if requested), ``parse_xml.build`` (binding object
+  construction) and ``parse_xml.from_obj`` (API object construction)
+  phases, the number of XML elements parsed (``parse_xml.elements``) and
+  the number of API objects created by class (``entities``).
+* :meth:`.Entity.to_xml` reports the ``to_xml`` total and its
+  ``to_xml.to_obj`` (binding object construction and namespace
+  discovery), ``to_xml.namespaces`` (namespace finalization) and
+  ``to_xml.export`` (writing) phases.
+* :meth:`.Entity.to_obj` and :meth:`.Entity.from_dict` report ``to_obj``
+  and ``from_dict`` totals, and ``from_dict`` reports ``entities`` counts.
+
+Only the outermost operation is reported. For example, the ``to_obj``
+calls made by ``to_xml`` are part of the ``to_xml.to_obj`` phase.
+
+Nothing is measured while instrumentation is disabled, and
+:meth:`.Entity.to_obj` and :meth:`.Entity.from_dict` are only wrapped while
+it is enabled.
+
+Example:
+    >>> with collect() as collector:
+    ...     package = STIXPackage.from_xml("feed.xml")
+    >>> print(collector.report())
+
+    Sending measurements to statsd:
+
+    >>> def to_statsd(event):
+    ...     if event.kind == TIMING:
+    ...         statsd.timing("stix." + event.name, event.value * 1000)
+    ...     else:
+    ...         statsd.incr("stix." + event.name, event.value)
+    >>> enable(to_statsd)
+
+"""
+
+# stdlib
+import collections
+import contextlib
+import threading
+import timeit
+
+#: The :attr:`Event.kind` of durations, in seconds.
+TIMING = "timing"
+
+#: The :attr:`Event.kind` of counters.
+COUNT = "count"
+
+#: A measurement. `labels` is a dictionary which further identifies it,
+#: such as ``{"class": "Indicator"}``.
+Event = collections.namedtuple("Event", ("name", "kind", "value", "labels"))
+
+_callbacks = []
+_state = threading.local()
+
+
+def is_enabled():
+    """Returns ``True`` if instrumentation is enabled."""
+    return bool(_callbacks)
+
+
+def enable(callback):
+    """Enables instrumentation, calling `callback` with each
+    :class:`Event`.
+
+    Several callbacks may be enabled at once.
+
+    """
+    if not _callbacks:
+        _install()
+
+    _callbacks.append(callback)
+
+
+def disable(callback=None):
+    """Stops calling `callback`, or all callbacks if it is ``None``.
+    Instrumentation is disabled once there are no callbacks left.
+
+    """
+    if callback is None:
+        del _callbacks[:]
+    elif callback in _callbacks:
+        _callbacks.remove(callback)
+
+    if not _callbacks:
+        _uninstall()
+
+
+def _emit(name, kind, value, labels):
+    event = Event(name, kind, value, labels)
+
+    for callback in list(_callbacks):
+        callback(event)
+
+
+def count(name, value, **labels):
+    """Reports the counter `name`, if instrumentation is enabled."""
+    if _callbacks:
+        _emit(name, COUNT, value, labels)
+
+
+class _Timer(object):
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = timeit.default_timer()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = timeit.default_timer() - self.start
+        _emit(self.name, TIMING, elapsed, self.labels)
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """Returns a context manager which reports the time taken by its body
+    as `name`, if instrumentation is enabled.
+
+    """
+    if not _callbacks:
+        return _NULL_TIMER
+
+    return _Timer(name, labels)
+
+
+@contextlib.contextmanager
+def operation(name, **labels):
+    """Times an instrumented operation, unless it is part of another one.
+
+    Yields:
+        ``True`` if the operation is timed (i.e., it is the outermost
+        operation and instrumentation is enabled).
+
+    """
+    depth = getattr(_state, "depth", 0)
+    _state.depth = depth + 1
+
+    try:
+        if depth or not _callbacks:
+            yield False
+        else:
+            with _Timer(name, labels):
+                yield True
+    finally:
+        _state.depth = depth
+
+
+def count_entities(operation_name, entity):
+    """Reports the number of API objects of each class in `entity` (and
+    `entity` itself) as ``entities`` counters.
+
+    """
+    if not _callbacks or entity is None:
+        return
+
+    from stix.utils.walk import iterwalk
+
+    # collections.Counter was added in Python 2.7.
+    counts = collections.defaultdict(int)
+    counts[type(entity).__name__] += 1
+
+    for x in iterwalk(entity):
+        counts[type(x).__name__] += 1
+
+    for name, number in sorted(counts.items()):
+        _emit("entities", COUNT, number,
+              {"class": name, "operation": operation_name})
+
+
+def _to_obj(self, *args, **kwargs):
+    from stix.base import Entity
+
+    with operation("to_obj", **{"class": type(self).__name__}):
+        return super(Entity, self).to_obj(*args, **kwargs)
+
+
+def _from_dict(cls, *args, **kwargs):
+    from stix.base import Entity
+
+    with operation("from_dict", **{"class": cls.__name__}) as timed:
+        entity = super(Entity, cls).from_dict(*args, **kwargs)
+
+    if timed:
+        count_entities("from_dict", entity)
+
+    return entity
+
+
+def _install():
+    """Wraps the recursive Entity methods, which would otherwise pay for
+    instrumentation on every call.
+
+    """
+    from stix.base import Entity
+
+    Entity.to_obj = _to_obj
+    Entity.from_dict = classmethod(_from_dict)
+
+
+def _uninstall():
+    from stix.base import Entity
+
+    for name in ("to_obj", "from_dict"):
+        if name in vars(Entity):
+            delattr(Entity, name)
+
+
+class Collector(object):
+    """An in-process callback which sums up events.
+
+    Attributes:
+        timings: A dictionary which maps ``(name, labels)`` keys to
+            ``[calls, seconds]`` lists. `labels` is a sorted tuple of the
+            event label items.
+        counts: A dictionary which maps ``(name, labels)`` keys to totals.
+
+    """
+    def __init__(self):
+        self.timings = collections.defaultdict(lambda: [0, 0.0])
+        self.counts = collections.defaultdict(int)
+
+    def __call__(self, event):
+        key = (event.name, tuple(sorted(event.labels.items())))
+
+        if event.kind == TIMING:
+            timing = self.timings[key]
+            timing[0] += 1
+            timing[1] += event.value
+        else:
+            self.counts[key] += event.value
+
+    def clear(self):
+        self.timings.clear()
+        self.counts.clear()
+
+    def report(self):
+        """Returns a text table of the collected timings and counts."""
+        lines = []
+
+        def label(key):
+            name, labels = key
+
+            if not labels:
+                return name
+
+            return "%s{%s}" % (name, ",".join("%s=%s" % x for x in labels))
+
+        for key, (calls, seconds) in sorted(self.timings.items()):
+            lines.append("%-50s %8d calls %10.4f s" % (label(key), calls,
+                                                       seconds))
+
+        for key, total in sorted(self.counts.items()):
+            lines.append("%-50s %8d" % (label(key), total))
+
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def collect():
+    """Enables instrumentation for the body of the ``with`` statement, and
+    yields the :class:`Collector` which receives the events.
+
+    """
+    collector = Collector()
+    enable(collector)
+
+    try:
+        yield collector
+    finally:
+        disable(collector)
+
+
+__all__ = [
+    "COUNT", "Collector", "Event", "TIMING", "collect", "disable", "enable",
+    "is_enabled",
+]
@@ -0,0 +1,238 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Memory accounting for python-stix object models.
+
+Example:
+    >>> package = STIXPackage.from_xml("feed.xml")
+    >>> report = memory_report(package)
+    >>> print(report)
+    class                                           count          bytes
+    stix.indicator.indicator.Indicator              20000       31054172
+    stix.common.structured_text.StructuredTextList  20000        6720000
+    ...
+
+"""
+
+# stdlib
+import collections
+import gc
+import sys
+import types
+
+# external
+from lxml import etree
+from mixbox.fields import TypedField
+from mixbox.vendor import six
+
+# internal
+from stix.base import _CompactFields
+
+# Estimated sizes of the libxml2 structures behind an lxml tree on a 64-bit
+# platform, which sys.getsizeof() cannot see.
+_XML_NODE_SIZE = 120
+_XML_ATTR_SIZE = 96
+_XML_NS_SIZE = 48
+
+# Objects shared across the whole process rather than owned by the model.
+_SHARED_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, TypedField, type(None), bool,
+)
+
+#: The memory used by one class of objects.
+#:
+#: Attributes:
+#:     name: The fully qualified class name.
+#:     count: The number of instances.
+#:     size: The number of bytes used by the instances and the objects
+#:         they alone hold (e.g. their ``__dict__``, strings and lists), but
+#:         not by other instances in the report.
+ClassUsage = collections.namedtuple("ClassUsage", ("name", "count", "size"))
+
+
+def _class_name(cls):
+    return "%s.%s" % (cls.__module__, cls.__name__)
+
+
+def _is_owner(obj):
+    """Returns ``True`` if `obj` gets its own row in a report rather than
+    being counted as part of the object which refers to it.
+
+    """
+    # Compact field storage is part of its entity.
+    if isinstance(obj, _CompactFields):
+        return False
+
+    return hasattr(obj, "__dict__") or hasattr(type(obj), "__slots__")
+
+
+def _text_size(text):
+    if not text:
+        return 0
+
+    return _XML_NODE_SIZE + len(text)
+
+
+def _tree_size(root):
+    """Returns the number of elements in the lxml tree under `root` and an
+    estimate of the native memory they use.
+
+    """
+    nodes = size = 0
+
+    for node in root.iter():
+        nodes += 1
+        size += _XML_NODE_SIZE + _text_size(node.text) + _text_size(node.tail)
+        size += _XML_NS_SIZE * len(getattr(node, "nsmap", ()))
+
+        for name, value in node.items():
+            size += _XML_ATTR_SIZE + len(name) + _text_size(value)
+
+    return nodes, size
+
+
+class MemoryReport(object):
+    """The memory used by an object model, broken down by class.
+
+    Sizes are measured with :func:`sys.getsizeof`, so they do not include
+    allocator overhead. The size of lxml trees (e.g., the ``__sourcenode__``
+    of binding objects or passthrough extension content) is estimated from
+    the number of elements, attributes and text nodes they hold, and is
+    reported under :attr:`LXML_TREES` with the number of elements as its
+    count.
+
+    Attributes:
+        classes: A dictionary which maps class names to :class:`ClassUsage`.
+        lxml_trees: The number of distinct lxml documents kept alive by the
+            model.
+        lxml_elements: The number of elements in those documents.
+
+    """
+    #: The :attr:`classes` key of the estimated native size of lxml trees.
+    LXML_TREES = "lxml.etree (native)"
+
+    def __init__(self):
+        self.classes = {}
+        self.lxml_trees = 0
+        self.lxml_elements = 0
+
+    def _add(self, name, count, size):
+        usage = self.classes.get(name)
+
+        if usage is None:
+            self.classes[name] = ClassUsage(name, count, size)
+        else:
+            self.classes[name] = usage._replace(count=usage.count + count,
+                                                size=usage.size + size)
+
+    @property
+    def count(self):
+        """The total number of objects in the report."""
+        return sum(x.count for x in six.itervalues(self.classes))
+
+    @property
+    def size(self):
+        """The total number of bytes in the report."""
+        return sum(x.size for x in six.itervalues(self.classes))
+
+    def top(self, n=None):
+        """Returns the :class:`ClassUsage` of the `n` classes which use the
+        most memory (or all of them), largest first.
+
+        """
+        usages = sorted(six.itervalues(self.classes),
+                        key=lambda x: (-x.size, x.name))
+        return usages[:n] if n else usages
+
+    def to_dict(self):
+        return {
+            "classes": dict(
+                (x.name, {"count": x.count, "size": x.size})
+                for x in six.itervalues(self.classes)
+            ),
+            "lxml_trees": self.lxml_trees,
+            "lxml_elements": self.lxml_elements,
+            "size": self.size,
+        }
+
+    def __str__(self):
+        lines = ["%-60s %10s %14s" % ("class", "count", "bytes")]
+
+        for usage in self.top():
+            lines.append("%-60s %10d %14d" % usage)
+
+        lines.append("%-60s %10d %14d" % ("total", self.count, self.size))
+        return "\n".join(lines)
+
+
+def memory_report(obj):
+    """Measures the memory held by `obj` and everything reachable from it.
+
+    `obj` is usually a :class:`stix.core.STIXPackage`, but may be any API
+    object, binding object, or collection of them. Each object is counted
+    once, under the nearest instance of a Python class (i.e., API, binding
+    and cybox objects) which refers to it. For example, the ``__dict__``,
+    ``_fields`` dictionary and string values of an Indicator are counted
+    under ``Indicator``, while its Title ``StructuredText`` gets its own row.
+    Classes, functions, modules and field descriptors are shared by every
+    instance and are not counted.
+
+    Returns:
+        A :class:`MemoryReport`.
+
+    """
+    report = MemoryReport()
+    seen = set()
+    roots = {}  # Holds the roots so lxml keeps returning the same proxy.
+    sizes = collections.defaultdict(lambda: [0, 0])
+    stack = [(obj, None)]
+
+    # The walk allocates many small objects, which would otherwise trigger
+    # (pointless) collections of the model being measured.
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        while stack:
+            item, owner = stack.pop()
+
+            if id(item) in seen or isinstance(item, _SHARED_TYPES):
+                continue
+
+            seen.add(id(item))
+
+            if isinstance(item, etree._Element):
+                tree = item.getroottree()
+                root = tree.getroot()
+                sizes[type(item)][0] += 1
+                sizes[type(item)][1] += sys.getsizeof(item)
+
+                if root is not None and id(root) not in roots:
+                    roots[id(root)] = root
+                    nodes, size = _tree_size(root)
+                    report.lxml_trees += 1
+                    report.lxml_elements += nodes
+                    report._add(report.LXML_TREES, nodes, size)
+
+                continue
+
+            if owner is None or _is_owner(item):
+                owner = type(item)
+                sizes[owner][0] += 1
+
+            sizes[owner][1] += sys.getsizeof(item)
+
+            for referent in gc.get_referents(item):
+                if id(referent) not in seen:
+                    stack.append((referent, owner))
+    finally:
+        if enabled:
+            gc.enable()
+
+    for cls, (count, size) in six.iteritems(sizes):
+        report._add(_class_name(cls), count, size)
+
+    return report
+
+
+__all__ = ["ClassUsage", "MemoryReport", "memory_report"]
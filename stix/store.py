@@ -0,0 +1,547 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""An embedded, SQLite-backed store of STIX components.
+
+:class:`SQLiteStore` ingests the top-level components of STIX Packages
+(Indicators, TTPs, Observables, etc.) and indexes them so that questions
+such as "all IP Watchlist Indicators marked TLP:GREEN since January" do not
+require re-parsing any XML.
+
+Example:
+    >>> store = SQLiteStore("stix.db")
+    >>> store.add(STIXPackage.from_xml("feed.xml"))
+    >>> for indicator in store.query(type="indicator",
+    ...                              vocab={"indicator_types": "IP Watchlist"},
+    ...                              tlp="GREEN",
+    ...                              since="2017-01-01"):
+    ...     print(indicator.title)
+
+"""
+
+# stdlib
+import hashlib
+import json
+import sqlite3
+import zlib
+
+# external
+from cybox.core import Observable
+from mixbox import entities
+from mixbox.datautils import resolve_class
+from mixbox.vendor.six import iteritems, text_type
+
+# internal
+from stix.common.vocabs import VocabString
+from stix.utils import dates, is_cybox, is_sequence
+from stix.utils.introspection import (
+    FieldSelector, TLP_XSI_TYPE, object_atoms, tlp_color
+)
+
+#: The types of component stored by :class:`SQLiteStore`, as ``(type,
+#: STIXPackage attribute, class)`` tuples.
+COMPONENTS = (
+    ("campaign", "campaigns", "stix.campaign.Campaign"),
+    ("course_of_action", "courses_of_action", "stix.coa.CourseOfAction"),
+    ("exploit_target", "exploit_targets", "stix.exploit_target.ExploitTarget"),
+    ("incident", "incidents", "stix.incident.Incident"),
+    ("indicator", "indicators", "stix.indicator.Indicator"),
+    ("observable", "observables", "cybox.core.Observable"),
+    ("report", "reports", "stix.report.Report"),
+    ("threat_actor", "threat_actors", "stix.threat_actor.ThreatActor"),
+    ("ttp", "ttps", "stix.ttp.TTP"),
+)
+
+_CLASSES = dict((type_, cls) for type_, _, cls in COMPONENTS)
+
+# The number of values bound to one statement. Older SQLite versions allow
+# at most 999.
+_MAX_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS components (
+    pk INTEGER PRIMARY KEY,
+    id TEXT,
+    -- The id, or a digest of the content of components without one.
+    key TEXT NOT NULL,
+    -- The timestamp, or -1 for components without one.
+    version REAL NOT NULL,
+    type TEXT NOT NULL,
+    timestamp REAL,
+    title TEXT,
+    package TEXT,
+    data BLOB NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS components_version
+    ON components (key, version);
+CREATE INDEX IF NOT EXISTS components_type
+    ON components (type, timestamp);
+CREATE INDEX IF NOT EXISTS components_timestamp ON components (timestamp);
+CREATE INDEX IF NOT EXISTS components_title ON components (title);
+
+CREATE TABLE IF NOT EXISTS vocabs (
+    component INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vocabs_value ON vocabs (field, value);
+CREATE INDEX IF NOT EXISTS vocabs_component ON vocabs (component);
+
+CREATE TABLE IF NOT EXISTS markings (
+    component INTEGER NOT NULL,
+    color TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS markings_color ON markings (color);
+CREATE INDEX IF NOT EXISTS markings_component ON markings (component);
+
+CREATE TABLE IF NOT EXISTS atoms (
+    component INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS atoms_value ON atoms (value, type);
+CREATE INDEX IF NOT EXISTS atoms_component ON atoms (component);
+"""
+
+
+def _classify(cls):
+    """Returns ``True`` if instances of `cls` are indexed by
+    :class:`_Indexer`, ``False`` if they cannot be or contain any indexed
+    values, and ``None`` if that depends on their fields. See
+    :class:`.FieldSelector`.
+
+    """
+    if issubclass(cls, (VocabString, Observable)):
+        return True
+    elif not issubclass(cls, entities.Entity) or is_cybox(cls):
+        return False
+    elif getattr(cls, "_XSI_TYPE", None) == TLP_XSI_TYPE:
+        return True
+
+    return None
+
+
+# The fields of each class which may contain indexed values.
+_SELECTOR = FieldSelector(_classify)
+
+
+def _serialize(entity):
+    data = json.dumps(entity.to_dict(), separators=(",", ":"), sort_keys=True)
+    return data.encode("utf-8")
+
+
+def _deserialize(type_, data):
+    cls = resolve_class(_CLASSES[type_])
+    data = json.loads(zlib.decompress(bytes(data)).decode("utf-8"))
+    return cls.from_dict(data)
+
+
+def _title(entity):
+    title = getattr(entity, "title", None)
+    return text_type(title) if title is not None else None
+
+
+def _observable_atoms(observable, seen):
+    """Yields ``(type, value)`` tuples for the object property values of
+    `observable`, recursing into observable compositions.
+
+    """
+    if id(observable) in seen:
+        return
+
+    seen.add(id(observable))
+
+    if observable.object_ is not None:
+        for type_, value, _ in object_atoms(observable.object_):
+            yield (type_, value)
+    elif observable.observable_composition is not None:
+        for child in observable.observable_composition.observables:
+            for atom in _observable_atoms(child, seen):
+                yield atom
+
+
+class _Indexer(object):
+    """Collects the vocabulary values, TLP colors and observable atoms found
+    in a component.
+
+    """
+
+    def __init__(self):
+        self.vocabs = set()
+        self.colors = set()
+        self.atoms = set()
+        self._seen = set()
+
+    def add(self, entity, path=""):
+        if isinstance(entity, VocabString):
+            if entity.value is not None:
+                self.vocabs.add((path, text_type(entity.value)))
+            return
+        elif isinstance(entity, Observable):
+            self.atoms.update(_observable_atoms(entity, self._seen))
+            return
+        elif is_cybox(entity) or not isinstance(entity, entities.Entity):
+            return
+
+        if getattr(entity, "_XSI_TYPE", None) == TLP_XSI_TYPE:
+            if entity.color:
+                self.colors.add(entity.color)
+
+        values = entity._fields
+        is_list = isinstance(entity, entities.EntityList)
+
+        for field, attr in _SELECTOR.fields(type(entity)):
+            value = values.get(field)
+
+            if value is None:
+                continue
+
+            # EntityList items share the path of the list.
+            if is_list:
+                child = path
+            else:
+                child = "%s.%s" % (path, attr) if path else attr
+
+            if isinstance(value, entities.Entity):
+                # Most entity lists are empty, so look at their items here
+                # rather than recursing into each one.
+                inner = _SELECTOR.list_field(type(value))
+
+                if inner is None:
+                    self.add(value, child)
+                    continue
+
+                value = value._fields.get(inner, ())
+
+            if is_sequence(value):
+                for item in value:
+                    self.add(item, child)
+
+
+class SQLiteStore(object):
+    """A store of STIX components backed by an SQLite database.
+
+    Each top-level component of an ingested STIXPackage is stored as
+    compressed JSON, along with indexes of its id, type, timestamp, title,
+    controlled vocabulary values, TLP marking colors and observable atoms.
+    Components are only deserialized when query results are consumed.
+
+    A component is identified by its id and timestamp, or by a digest of its
+    content if it does not have an id. Adding a component which is already
+    in the store does nothing, so re-ingesting a feed does not create
+    duplicates, while new versions of a component are kept alongside older
+    ones.
+
+    Args:
+        path: The path of the SQLite database file. The default is an
+            in-memory database.
+        batch_size: The number of components to insert per transaction when
+            adding packages.
+
+    """
+
+    def __init__(self, path=":memory:", batch_size=5000):
+        self.path = path
+        self.batch_size = batch_size
+        # Transactions are begun explicitly (see _insert()).
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA synchronous = NORMAL")
+
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes the database connection."""
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute("SELECT count(*) FROM components").fetchone()[0]
+
+    def _existing(self, keys):
+        """Returns the set of ``(id or digest, timestamp)`` pairs found in
+        the store for the ids or digests `keys`. A missing timestamp is
+        ``-1``.
+
+        """
+        keys = list(keys)
+        found = set()
+
+        for start in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[start:start + _MAX_PARAMS]
+            cursor = self._db.execute(
+                "SELECT key, version FROM components WHERE key IN (%s)"
+                % ", ".join("?" * len(chunk)),
+                chunk
+            )
+            found.update(cursor)
+
+        return found
+
+    def _insert(self, batch):
+        """Inserts the components of `batch` and their index values in one
+        transaction. Components which are already in the store are skipped.
+
+        Args:
+            batch: A list of ``(type, component, package id, package TLP
+                color)`` tuples.
+
+        Returns:
+            The number of components which were inserted.
+
+        """
+        records = []
+
+        for type_, entity, package, tlp in batch:
+            id_ = getattr(entity, "id_", None)
+            timestamp = dates.timestamp(getattr(entity, "timestamp", None))
+            data = _serialize(entity)
+
+            # Components without an id are identified by their content.
+            key = (id_ if id_ is not None else hashlib.sha1(data).hexdigest(),
+                   timestamp if timestamp is not None else -1)
+
+            row = key + (id_, type_, timestamp, _title(entity), package,
+                         sqlite3.Binary(zlib.compress(data, 1)))
+            records.append((key, entity, tlp, row))
+
+        # Take the write lock up front, so that no other connection can add
+        # the same components or take the primary keys assigned below.
+        self._db.execute("BEGIN IMMEDIATE")
+
+        try:
+            seen = self._existing(set(r[0][0] for r in records))
+            pk = self._db.execute(
+                "SELECT ifnull(max(pk), 0) FROM components"
+            ).fetchone()[0]
+            components, vocabs, markings, atoms = [], [], [], []
+
+            for key, entity, tlp, row in records:
+                if key in seen:
+                    continue
+
+                seen.add(key)
+                pk += 1
+                components.append((pk,) + row)
+
+                indexer = _Indexer()
+                indexer.add(entity)
+
+                # Package-level markings apply to components without their
+                # own.
+                if not indexer.colors and tlp:
+                    indexer.colors.add(tlp)
+
+                vocabs.extend((pk, f, v) for f, v in indexer.vocabs)
+                markings.extend((pk, color) for color in indexer.colors)
+                atoms.extend((pk, t, v) for t, v in indexer.atoms)
+
+            self._db.executemany(
+                "INSERT INTO components "
+                "(pk, key, version, id, type, timestamp, title, package, "
+                "data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                components
+            )
+            self._db.executemany("INSERT INTO vocabs VALUES (?, ?, ?)", vocabs)
+            self._db.executemany("INSERT INTO markings VALUES (?, ?)", markings)
+            self._db.executemany("INSERT INTO atoms VALUES (?, ?, ?)", atoms)
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+        self._db.execute("COMMIT")
+        return len(components)
+
+    def _components(self, package):
+        """Yields ``(type, component)`` tuples for the components of
+        `package`. References to components (idrefs) are skipped.
+
+        """
+        for type_, attr, _ in COMPONENTS:
+            collection = getattr(package, attr, None)
+
+            if not collection:
+                continue
+
+            if type_ == "observable":
+                collection = collection.observables
+
+            for component in collection:
+                if component.idref and not component.id_:
+                    continue
+
+                yield type_, component
+
+    def add(self, packages):
+        """Adds the components of `packages` to the store.
+
+        Args:
+            packages: A :class:`.STIXPackage` or an iterable collection of
+                them.
+
+        Returns:
+            The number of components which were added. Components which were
+            already in the store are not counted.
+
+        Raises:
+            Exception: Any error raised while adding a component. Batches
+                which were committed before the error remain in the store.
+
+        """
+        from stix.core import STIXPackage
+
+        if isinstance(packages, STIXPackage):
+            packages = (packages,)
+
+        batch = []
+        added = 0
+
+        for package in packages:
+            header = package.stix_header
+            tlp = tlp_color(header.handling) if header else None
+
+            for type_, component in self._components(package):
+                batch.append((type_, component, package.id_, tlp))
+
+                if len(batch) >= self.batch_size:
+                    added += self._insert(batch)
+                    batch = []
+
+        if batch:
+            added += self._insert(batch)
+
+        return added
+
+    def _where(self, id_=None, type=None, title=None, since=None, until=None,
+               vocab=None, tlp=None, observable=None, observable_type=None):
+        clauses, params = [], []
+
+        if id_ is not None:
+            clauses.append("c.id = ?")
+            params.append(id_)
+        if type is not None:
+            clauses.append("c.type = ?")
+            params.append(type)
+        if title is not None:
+            clauses.append("c.title = ?")
+            params.append(title)
+        if since is not None:
+            clauses.append("c.timestamp >= ?")
+            params.append(dates.timestamp(since))
+        if until is not None:
+            clauses.append("c.timestamp <= ?")
+            params.append(dates.timestamp(until))
+
+        for field, value in sorted(iteritems(vocab or {})):
+            clauses.append(
+                "c.pk IN (SELECT component FROM vocabs "
+                "WHERE field = ? AND value = ?)"
+            )
+            params.extend((field, value))
+
+        if tlp is not None:
+            clauses.append(
+                "c.pk IN (SELECT component FROM markings WHERE color = ?)"
+            )
+            params.append(tlp)
+
+        if observable is not None:
+            sql = "c.pk IN (SELECT component FROM atoms WHERE value = ?"
+            params.append(observable)
+
+            if observable_type is not None:
+                sql += " AND type = ?"
+                params.append(observable_type)
+
+            clauses.append(sql + ")")
+
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def query(self, **criteria):
+        """Returns a generator of the components which match all of the
+        given criteria, ordered by timestamp. Components are deserialized
+        as the generator is consumed.
+
+        Keyword Args:
+            id_: A component id.
+            type: A component type, such as ``"indicator"``. See
+                :data:`COMPONENTS`.
+            title: A component title.
+            since: Only match components with a timestamp at or after this
+                date or timestamp.
+            until: Only match components with a timestamp at or before this
+                date or timestamp.
+            vocab: A dictionary which maps controlled vocabulary property
+                paths (e.g., ``"indicator_types"`` or
+                ``"likely_impact.value"``) to values.
+            tlp: A TLP color, such as ``"GREEN"``. Components without a TLP
+                marking of their own match the TLP color of their package
+                header.
+            observable: An observable value, such as an IP address.
+            observable_type: The property key of `observable`, such as
+                ``"AddressObjectType:address_value"``. See
+                :mod:`stix.indicator.matcher`.
+
+        """
+        where, params = self._where(**criteria)
+        cursor = self._db.execute(
+            "SELECT c.type, c.data FROM components c%s "
+            "ORDER BY c.timestamp, c.pk" % where,
+            params
+        )
+
+        for type_, data in cursor:
+            yield _deserialize(type_, data)
+
+    def ids(self, **criteria):
+        """Returns a list of the ids of the components which match all of the
+        given criteria, without deserializing them. See :meth:`query` for
+        the accepted criteria. Components without an id are not included.
+
+        """
+        where, params = self._where(**criteria)
+        cursor = self._db.execute(
+            "SELECT DISTINCT c.id FROM components c%s" % where, params
+        )
+        return [row[0] for row in cursor if row[0] is not None]
+
+    def count(self, **criteria):
+        """Returns the number of components which match all of the given
+        criteria. See :meth:`query` for the accepted criteria.
+
+        """
+        where, params = self._where(**criteria)
+        cursor = self._db.execute(
+            "SELECT count(*) FROM components c%s" % where, params
+        )
+        return cursor.fetchone()[0]
+
+    def get(self, id_, timestamp=None):
+        """Returns the component with the id `id_`, or ``None`` if it is not
+        in the store.
+
+        If `timestamp` is ``None``, the most recent version of the component
+        is returned.
+
+        """
+        sql = "SELECT type, data FROM components WHERE id = ?"
+        params = [id_]
+
+        if timestamp is not None:
+            sql += " AND timestamp = ?"
+            params.append(dates.timestamp(timestamp))
+
+        sql += " ORDER BY timestamp DESC LIMIT 1"
+        row = self._db.execute(sql, params).fetchone()
+
+        if row is None:
+            return None
+
+        return _deserialize(*row)
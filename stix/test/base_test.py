@@ -0,0 +1,175 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import copy
+import shutil
+import tempfile
+import unittest
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+from mixbox.entities import NamespaceCollector
+from mixbox.vendor.six import BytesIO
+
+from stix import base, profile, testing
+from stix.base import COMPACT_CLASSES, set_compact_storage
+from stix.common import StructuredText, VocabString
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.utils import cache
+
+
+class CompactStorageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = testing.generate(n_indicators=10, n_ttps=3, seed=2)
+
+    def tearDown(self):
+        set_compact_storage(False)
+
+    def test_storage(self):
+        self.assertTrue(isinstance(StructuredText("a")._fields, dict))
+
+        set_compact_storage()
+        text = StructuredText("a")
+
+        self.assertFalse(isinstance(text._fields, dict))
+        self.assertTrue(isinstance(Indicator()._fields, dict))
+        self.assertEqual("a", text.value)
+        self.assertEqual({"value": "a"}, text._fields and
+                         dict((k.key_name, v) for k, v in
+                              text._fields.items() if v is not None))
+
+        text.value = "b"
+        text.ordinality = 2
+        self.assertEqual({"value": "b", "ordinality": 2}, text.to_dict())
+        self.assertTrue(StructuredText.value in text._fields)
+
+        del text._fields[StructuredText.value]
+        self.assertEqual(None, text.value)
+        self.assertFalse(StructuredText.value in text._fields)
+
+    def test_subclasses(self):
+        set_compact_storage(classes=[VocabString])
+
+        vocab = testing.generate(n_indicators=1).indicators[0].indicator_types[0]
+        self.assertTrue(isinstance(vocab, VocabString))
+        self.assertNotEqual(VocabString, type(vocab))
+        self.assertFalse(isinstance(vocab._fields, dict))
+        self.assertEqual(vocab.value, vocab.to_dict()["value"])
+
+    def test_round_trip(self):
+        xml = self.package.to_xml()
+        expected = STIXPackage.from_xml(BytesIO(xml))
+
+        set_compact_storage()
+        package = STIXPackage.from_xml(BytesIO(xml))
+
+        self.assertEqual(expected.to_xml(), package.to_xml())
+        self.assertEqual(expected.to_dict(), package.to_dict())
+        self.assertEqual(
+            package.to_dict(),
+            STIXPackage.from_dict(package.to_dict()).to_dict()
+        )
+        self.assertEqual(len(list(expected.walk())),
+                         len(list(package.walk())))
+
+    def test_copy(self):
+        set_compact_storage()
+        package = testing.generate(n_indicators=10, n_ttps=3, seed=2)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        disk_cache = cache.DiskCache(directory)
+        disk_cache.put("package", package)
+
+        for other in (copy.deepcopy(package), disk_cache.get("package")):
+            self.assertEqual(package.to_dict(), other.to_dict())
+
+            vocab = other.indicators[0].indicator_types[0]
+            self.assertFalse(isinstance(vocab._fields, dict))
+
+    @unittest.skipIf(tracemalloc is None, "requires tracemalloc")
+    def test_memory(self):
+        def size():
+            texts = [None] * 1000
+            tracemalloc.start()
+
+            for i in range(len(texts)):
+                texts[i] = StructuredText("text")
+
+            allocated = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return allocated
+
+        default = size()
+        set_compact_storage(classes=COMPACT_CLASSES[:1])
+        self.assertTrue(size() < default / 2.0)
+
+        # The slot storage is accounted to the entity.
+        report = profile.memory_report(StructuredText("text"))
+        self.assertEqual(["stix.common.structured_text.StructuredText"],
+                         list(report.classes))
+
+
+class NamespaceCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        base.clear_namespace_cache()
+        self.package = testing.generate(n_indicators=5, n_ttps=2, seed=3)
+
+    def tearDown(self):
+        base.clear_namespace_cache()
+
+    def test_collector(self):
+        expected = NamespaceCollector()
+        self.package.to_obj(ns_info=expected)
+        expected.finalize()
+
+        collector = base._NamespaceCollector()
+        self.package.to_obj(ns_info=collector)
+        collector.finalize()
+
+        self.assertEqual(expected.binding_namespaces,
+                         collector.binding_namespaces)
+        self.assertEqual(expected.finalized_schemalocs,
+                         collector.finalized_schemalocs)
+
+    def test_cached(self):
+        xml = self.package.to_xml()
+        self.assertEqual(1, len(base._XML_NAMESPACES))
+
+        self.assertEqual(xml, self.package.to_xml())
+        self.assertEqual(1, len(base._XML_NAMESPACES))
+
+        # Other arguments are finalized separately.
+        self.package.to_xml(include_schemalocs=True)
+        self.package.to_xml(ns_dict={"urn:example": "ex"})
+        self.assertEqual(3, len(base._XML_NAMESPACES))
+
+    def test_input_namespaces(self):
+        xml = self.package.to_xml().replace(
+            b"<stix:STIX_Package",
+            b'<stix:STIX_Package xmlns:foo="urn:foo"',
+            1
+        )
+
+        parsed = STIXPackage.from_xml(BytesIO(xml))
+        self.assertTrue(b'xmlns:foo="urn:foo"' in parsed.to_xml())
+        self.assertFalse(b'xmlns:foo' in self.package.to_xml())
+
+    def test_reuse(self):
+        namespaces = self.package.xml_namespaces()
+        self.assertEqual(self.package.to_xml(),
+                         self.package.to_xml(namespaces=namespaces))
+
+        other = testing.generate(n_indicators=5, n_ttps=2, seed=3)
+        self.assertEqual(other.to_xml(),
+                         other.to_xml(namespaces=namespaces))
+
+
+if __name__ == "__main__":
+    unittest.main()
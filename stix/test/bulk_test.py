@@ -0,0 +1,99 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from stix import bulk, testing
+from stix.core import STIXPackage
+
+
+class ToXmlManyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.packages = [
+            testing.generate(n_indicators=2, n_ttps=1, seed=i)
+            for i in range(10)
+        ]
+
+    def test_out_dir(self):
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+
+        result = bulk.to_xml_many(iter(self.packages), out_dir=out_dir,
+                                  workers=3)
+        self.assertTrue(result)
+        self.assertEqual(10, result.written)
+
+        for index, package in enumerate(self.packages):
+            name = bulk.default_filename(index, package)
+            self.assertFalse(":" in name)
+
+            with open(os.path.join(out_dir, name), "rb") as f:
+                self.assertEqual(package.to_xml(), f.read())
+
+            parsed = STIXPackage.from_xml(os.path.join(out_dir, name))
+            self.assertEqual(package.id_, parsed.id_)
+
+    def test_writer(self):
+        written = {}
+        lock = threading.Lock()
+
+        def writer(index, package, data):
+            with lock:
+                written[index] = data
+
+        result = bulk.to_xml_many(self.packages, writer=writer, workers=4,
+                                  encoding=None, pretty=False)
+        self.assertEqual(10, result.written)
+
+        for index, package in enumerate(self.packages):
+            self.assertEqual(package.to_xml(encoding=None, pretty=False),
+                             written[index])
+
+    def test_bounded_input(self):
+        taken = [0]
+        lock = threading.Lock()
+
+        def packages():
+            for i in range(100):
+                taken[0] += 1
+                yield self.packages[i % len(self.packages)]
+
+        def writer(index, package, data):
+            # Packages are only taken a chunk at a time.
+            with lock:
+                self.assertTrue(taken[0] - index <= 2 * 16)
+
+        result = bulk.to_xml_many(packages(), writer=writer, workers=2)
+        self.assertEqual(100, result.written)
+
+    def test_failures(self):
+        packages = list(self.packages)
+        packages.insert(3, object())
+
+        def writer(index, package, data):
+            if package is packages[7]:
+                raise IOError("disk full")
+
+        for workers in (1, 4):
+            result = bulk.to_xml_many(packages, writer=writer,
+                                      workers=workers)
+            self.assertFalse(result)
+            self.assertEqual(9, result.written)
+            self.assertEqual([3, 7], [x.index for x in result.failures])
+            self.assertTrue(isinstance(result.failures[0].error,
+                                       AttributeError))
+            self.assertTrue(isinstance(result.failures[1].error, IOError))
+
+    def test_arguments(self):
+        self.assertRaises(ValueError, bulk.to_xml_many, self.packages)
+        self.assertRaises(ValueError, bulk.to_xml_many, self.packages,
+                          out_dir=".", writer=lambda *args: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
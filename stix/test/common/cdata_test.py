@@ -35,6 +35,14 @@ class CDATATests(unittest.TestCase):
         stripped = utils.strip_cdata(multi)
         self.assertEqual(stripped, initial*2)
 
+    def test_strip_cdata_markup(self):
+        initial = "<b>&amp;</b>"
+        wrapped = "<![CDATA[%s]]>" % initial
+        self.assertEqual(utils.strip_cdata(wrapped), initial)
+
+        surrounded = "foo &amp; <![CDATA[%s]]>" % initial
+        self.assertEqual(utils.strip_cdata(surrounded), "foo & " + initial)
+
 
 class EncodedCDATATests(EntityTestCase, unittest.TestCase):
     klass = EncodedCDATA
@@ -174,6 +174,96 @@ class StructuredTextListTests(unittest.TestCase, TypedListTestCase):
 
         self.assertEqual(len(slist), 1)
 
+    def test_ordinality_changed(self):
+        st1 = common.StructuredText("foo", ordinality=1)
+        st2 = common.StructuredText("bar", ordinality=2)
+        slist = common.StructuredTextList(st1, st2)
+
+        st1.ordinality = 5
+
+        self.assertEqual(slist[5], st1)
+        self.assertRaises(KeyError, slist.__getitem__, 1)
+        self.assertEqual([st2, st1], list(slist))
+        self.assertEqual(6, slist.next_ordinality)
+
+    def test_indexed_item_changed(self):
+        # Long lists keep their index between lookups.
+        slist = common.StructuredTextList(["Text %s" % x for x in range(20)])
+        first, last = slist[1], slist[20]
+        self.assertTrue(slist._index is not None)
+
+        first.ordinality = 21
+        last.id_ = "example:text-20"
+
+        self.assertTrue(slist[21] is first)
+        self.assertRaises(KeyError, slist.__getitem__, 1)
+        self.assertTrue(slist.with_id("example:text-20") is last)
+        self.assertEqual(22, slist.next_ordinality)
+
+    def test_string_ordinality(self):
+        # Ordinalities parsed from XML are strings.
+        st1 = common.StructuredText("foo", ordinality="2")
+        st2 = common.StructuredText("bar", ordinality="10")
+        slist = common.StructuredTextList(st2, st1)
+
+        self.assertEqual(slist[2], st1)
+        self.assertEqual([st1, st2], list(slist))
+        self.assertEqual(11, slist.next_ordinality)
+
+    def test_insert_shift_many(self):
+        slist = common.StructuredTextList()
+
+        for idx in range(1000):
+            slist.add("Text %s" % idx)
+
+        slist.insert(common.StructuredText("first", ordinality=1))
+
+        self.assertEqual(str(slist[1]), "first")
+        self.assertEqual(str(slist[1001]), "Text 999")
+        self.assertEqual(tuple(range(1, 1002)), slist.ordinalities)
+
+    def test_with_id(self):
+        st1 = common.StructuredText("foo", ordinality=1)
+        st1.id_ = "example:text-1"
+        st2 = common.StructuredText("bar", ordinality=2)
+        st3 = common.StructuredText("baz", ordinality=3)
+        slist = common.StructuredTextList(st1, st2, st3)
+
+        self.assertTrue(slist.with_id("example:text-1") is st1)
+        self.assertEqual(None, slist.with_id("example:text-2"))
+
+        st2.id_ = "example:text-2"
+        self.assertTrue(slist.with_id("example:text-2") is st2)
+
+        slist.remove(st1)
+        self.assertEqual(None, slist.with_id("example:text-1"))
+        self.assertEqual([st2, st3], list(slist))
+
+        del slist[2]
+        self.assertEqual(None, slist.with_id("example:text-2"))
+        self.assertEqual([st3], list(slist))
+        self.assertEqual("baz", slist.to_list()["value"])
+
+    def test_pickle(self):
+        import copy
+
+        slist = common.StructuredTextList("foo", "bar")
+        slist[1].id_ = "example:text-1"
+        clone = copy.deepcopy(slist)
+
+        clone.remove(clone[1])
+        self.assertEqual(None, clone.with_id("example:text-1"))
+        self.assertEqual(["bar"], [str(x) for x in clone])
+        self.assertEqual(2, len(slist))
+
+    def test_walk(self):
+        from stix.utils import walk
+
+        st1 = common.StructuredText("foo", ordinality=1)
+        slist = common.StructuredTextList(st1)
+
+        self.assertEqual([st1], list(walk.iterwalk(slist)))
+
 
 if __name__ == "__main__":
     unittest.main()
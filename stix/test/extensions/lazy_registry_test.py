@@ -0,0 +1,79 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from mixbox.vendor.six import iteritems
+
+import stix
+import stix.bindings as bindings
+
+
+class ExtensionModulesTests(unittest.TestCase):
+    """Verify that the lazily-loaded extension modules register the xsi:types
+    they are listed under.
+
+    """
+
+    def test_api_extension_modules(self):
+        for xsi_type, modname in iteritems(stix._EXTENSION_MODULES):
+            klass = stix.lookup_extension(xsi_type)
+            self.assertEqual(klass._XSI_TYPE, xsi_type)
+            self.assertEqual(klass.__module__, modname)
+
+    def test_binding_extension_modules(self):
+        for typeinfo, modname in iteritems(bindings._BINDING_EXTENSION_MODULES):
+            klass = bindings.lookup_extension(typeinfo)
+            self.assertEqual(klass.xmlns, typeinfo.ns)
+            self.assertEqual(klass.xml_type, typeinfo.typename)
+            self.assertEqual(klass.__module__, modname)
+
+    def test_component_types(self):
+        # Components nested in other components (e.g., an ExploitTarget in
+        # a TTP) must be found through the lazy registry in a process which
+        # has only imported stix.core.
+        from stix.core import STIXPackage
+        from stix.exploit_target import ExploitTarget
+        from stix.ttp import TTP
+
+        ttp = TTP()
+        ttp.exploit_targets.append(ExploitTarget(title="ET"))
+        package = STIXPackage()
+        package.add_ttp(ttp)
+        xml = package.to_xml()
+
+        fd, path = tempfile.mkstemp(suffix=".xml")
+        self.addCleanup(os.remove, path)
+
+        with os.fdopen(fd, "wb") as f:
+            f.write(xml)
+
+        script = (
+            "import sys\n"
+            "from stix.core import STIXPackage\n"
+            "package = STIXPackage.from_xml(sys.argv[1])\n"
+            "assert package.ttps[0].exploit_targets[0].item.title == 'ET'\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        subprocess.check_call([sys.executable, "-c", script, path], env=env)
+
+    def test_lookup_unprefixed(self):
+        klass = stix._lookup_unprefixed("TLPMarkingStructureType")
+        module = importlib.import_module("stix.extensions.marking.tlp")
+        self.assertTrue(klass is module.TLPMarkingStructure)
+
+    def test_unknown_xsi_type(self):
+        self.assertRaises(ValueError, stix.lookup_extension, "foo:BarType")
+
+    def test_unknown_binding_type(self):
+        typeinfo = bindings.TypeInfo(ns="http://example.com", typename="Foo")
+        self.assertRaises(NotImplementedError, bindings.lookup_extension, typeinfo)
+
+
+if __name__ == "__main__":
+    unittest.main()
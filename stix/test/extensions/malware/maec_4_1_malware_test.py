@@ -6,6 +6,8 @@ from lxml import etree
 import mixbox.xml
 
 from stix.test import EntityTestCase
+from stix.bindings.extensions.malware import maec_4_1 as maec_binding
+from stix.extensions.malware import maec_4_1_malware
 from stix.extensions.malware.maec_4_1_malware import MAECInstance
 
 
@@ -208,6 +210,92 @@ class PythonMAECInPackageTests(unittest.TestCase):
         mw = stix_pkg.ttps[0].behavior.malware_instances[0].to_dict()
         self.assertTrue('names' in mw)
 
+    def test_parse_malware_maec_passthrough(self):
+        """Test that MAEC content is left as an lxml element in passthrough
+        mode and written back out unchanged.
+        """
+        xml = StringIO(self.XML_MAEC.getvalue())
+        stix_pkg = STIXPackage.from_xml(xml, passthrough=True)
+        mw = stix_pkg.ttps[0].behavior.malware_instances[0]
+        self.assertTrue(mixbox.xml.is_element(mw.maec))
+
+        root = etree.fromstring(stix_pkg.to_xml())
+        ns = {'maecPackage': 'http://maec.mitre.org/XMLSchema/maec-package-2'}
+        subjects = root.xpath("//maecPackage:Malware_Subject", namespaces=ns)
+        self.assertEqual(len(subjects), 1)
+        self.assertEqual(
+            subjects[0].attrib['id'],
+            "example:Subject-57cd4839-436e-1b11-af4a-15588ac3198b"
+        )
+
+
+class PassthroughWithoutMAECTests(unittest.TestCase):
+    XML = (
+        """
+        <stix:STIX_Package
+            xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+            xmlns:stix="http://stix.mitre.org/stix-1"
+            xmlns:ttp="http://stix.mitre.org/TTP-1"
+            xmlns:stix-maec="http://stix.mitre.org/extensions/Malware#MAEC4.1-1"
+            xmlns:maecPackage="http://maec.mitre.org/XMLSchema/maec-package-2"
+            xmlns:cybox="http://cybox.mitre.org/cybox-2"
+            xmlns:cyboxCommon="http://cybox.mitre.org/common-2"
+            xmlns:cyboxVocabs="http://cybox.mitre.org/default_vocabularies-2"
+            xmlns:FileObj="http://cybox.mitre.org/objects#FileObject-2"
+            xmlns:example="http://example.com"
+            id="example:Package-2b8fb66f-b6b3-4d40-865a-33e4a5ee1246"
+            version="1.2">
+          <stix:TTPs>
+            <stix:TTP xsi:type="ttp:TTPType" id="example:ttp-1">
+              <ttp:Behavior>
+                <ttp:Malware>
+                  <ttp:Malware_Instance xsi:type="stix-maec:MAEC4.1InstanceType">
+                    <stix-maec:MAEC id="example:package-1" schema_version="2.1">
+                      <maecPackage:Malware_Subjects>
+                        <maecPackage:Malware_Subject id="example:subject-1">
+                          <maecPackage:Malware_Instance_Object_Attributes id="example:object-1">
+                            <cybox:Properties xsi:type="FileObj:FileObjectType">
+                              <FileObj:Hashes>
+                                <cyboxCommon:Hash>
+                                  <cyboxCommon:Type xsi:type="cyboxVocabs:HashNameVocab-1.0">MD5</cyboxCommon:Type>
+                                  <cyboxCommon:Simple_Hash_Value>9d7006e30fdf15e9c8e03e62534b3a3e</cyboxCommon:Simple_Hash_Value>
+                                </cyboxCommon:Hash>
+                              </FileObj:Hashes>
+                            </cybox:Properties>
+                          </maecPackage:Malware_Instance_Object_Attributes>
+                        </maecPackage:Malware_Subject>
+                      </maecPackage:Malware_Subjects>
+                    </stix-maec:MAEC>
+                  </ttp:Malware_Instance>
+                </ttp:Malware>
+              </ttp:Behavior>
+            </stix:TTP>
+          </stix:TTPs>
+        </stix:STIX_Package>
+        """
+    )
+
+    def setUp(self):
+        # Parse as if python-maec was not installed.
+        for module, name in ((maec_4_1_malware, "_MAEC_INSTALLED"),
+                             (maec_binding, "maec_installed")):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+            setattr(module, name, False)
+
+    def _maec(self, xml):
+        root = etree.fromstring(xml, parser=mixbox.xml.get_xml_parser())
+        ns = {'stix-maec': 'http://stix.mitre.org/extensions/Malware#MAEC4.1-1'}
+        node, = root.xpath("//stix-maec:MAEC", namespaces=ns)
+        return etree.tostring(node, method="c14n", exclusive=True)
+
+    def test_round_trip(self):
+        stix_pkg = STIXPackage.from_xml(StringIO(self.XML), passthrough=True)
+        mw = stix_pkg.ttps[0].behavior.malware_instances[0]
+        self.assertTrue(mixbox.xml.is_element(mw.maec))
+
+        self.assertEqual(self._maec(self.XML.encode("utf-8")),
+                         self._maec(stix_pkg.to_xml()))
+
 
 if __name__ == "__main__":
     unittest.main()
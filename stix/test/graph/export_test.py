@@ -0,0 +1,177 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import csv
+import json
+import unittest
+
+from lxml import etree
+from mixbox.vendor.six import BytesIO, StringIO
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+from stix import graph
+from stix.campaign import Campaign
+from stix.coa import CourseOfAction
+from stix.common.related import (
+    RelatedCOA, RelatedIndicator, RelatedObservable, RelatedTTP
+)
+from stix.core import STIXPackage
+from stix.graph import export
+from stix.incident import Incident
+from stix.indicator import Indicator
+from stix.threat_actor import ThreatActor
+from stix.ttp import TTP
+
+GRAPHML = "{http://graphml.graphdrawing.org/xmlns}"
+
+
+class ExportTests(unittest.TestCase):
+
+    def setUp(self):
+        package = STIXPackage(id_="example:package-1")
+
+        actor = ThreatActor(id_="example:actor-1", title="Actor & Co")
+        actor.observed_ttps.append(
+            RelatedTTP(
+                TTP(idref="example:ttp-1"),
+                relationship="Uses",
+                confidence="High"
+            )
+        )
+
+        indicator = Indicator(id_="example:indicator-1", title="Indicator")
+        indicator.add_indicated_ttp(TTP(idref="example:ttp-1"))
+        indicator.suggested_coas.append(
+            RelatedCOA(CourseOfAction(id_="example:coa-1"))
+        )
+
+        incident = Incident(id_="example:incident-1")
+        incident.related_indicators.append(RelatedIndicator(indicator))
+        incident.related_observables.append(
+            RelatedObservable(
+                Observable(Address("10.0.0.1"), id_="example:observable-1")
+            )
+        )
+
+        campaign = Campaign(id_="example:campaign-1")
+        campaign.related_incidents.append(incident)
+
+        ttp = TTP(id_="example:ttp-1")
+        ttp.related_ttps.append(RelatedTTP(TTP(idref="example:ttp-2")))
+
+        for entity in (ttp, actor, indicator, campaign):
+            package.add(entity)
+
+        self.package = package
+        self.xml = package.to_xml()
+
+    def stream(self):
+        return BytesIO(self.xml)
+
+    def test_iterparse(self):
+        items = list(export.iterparse(self.stream()))
+        nodes = dict(
+            (item.id, item) for item in items
+            if isinstance(item, export.Node)
+        )
+        edges = [item for item in items if isinstance(item, export.Edge)]
+
+        self.assertEqual(9, len(nodes))
+        self.assertEqual("Threat_Actor", nodes["example:actor-1"].type)
+        self.assertEqual("Actor & Co", nodes["example:actor-1"].title)
+        self.assertEqual("Observable", nodes["example:observable-1"].type)
+
+        # Only known through a reference.
+        self.assertEqual(
+            export.Node("example:ttp-2", "TTP", None, None),
+            nodes["example:ttp-2"]
+        )
+
+        self.assertTrue(
+            export.Edge("example:actor-1", "example:ttp-1", "observed_ttps",
+                        "Uses", "High") in edges
+        )
+
+    def test_matches_graph(self):
+        """The streamed graph should match a graph built from the parsed
+        package, including the inline copy of the Indicator being skipped.
+
+        """
+        parsed = graph.build(STIXPackage.from_xml(self.stream()))
+        items = list(export.iterparse(self.stream()))
+
+        edges = sorted(
+            tuple(item) for item in items if isinstance(item, export.Edge)
+        )
+        expected = sorted(parsed.edge(i) for i in range(parsed.edge_count))
+        self.assertEqual(expected, edges)
+
+        nodes = sorted(
+            item.id for item in items if isinstance(item, export.Node)
+        )
+        self.assertEqual(sorted(parsed.nodes), nodes)
+
+    def test_write_csv(self):
+        edges, nodes = StringIO(), StringIO()
+        counts = export.write_csv(self.stream(), edges, nodes=nodes)
+        self.assertEqual((9, 7), counts)
+
+        edges.seek(0)
+        rows = list(csv.reader(edges))
+        self.assertEqual(list(export.EDGE_COLUMNS), rows[0])
+        self.assertEqual(8, len(rows))
+        self.assertTrue(
+            ["example:indicator-1", "example:ttp-1", "indicated_ttps", "", ""]
+            in rows
+        )
+
+        nodes.seek(0)
+        rows = list(csv.reader(nodes))
+        self.assertEqual(list(export.NODE_COLUMNS), rows[0])
+        self.assertEqual(10, len(rows))
+
+    def test_write_graphml(self):
+        f = StringIO()
+        self.assertEqual((9, 7), export.write_graphml(self.stream(), f))
+
+        root = etree.fromstring(f.getvalue().encode("utf-8"))
+        nodes = root.findall(".//%snode" % GRAPHML)
+        edges = root.findall(".//%sedge" % GRAPHML)
+        self.assertEqual(9, len(nodes))
+        self.assertEqual(7, len(edges))
+
+        titles = root.xpath(
+            "//g:data[@key='node_title']/text()",
+            namespaces={"g": GRAPHML[1:-1]}
+        )
+        self.assertTrue("Actor & Co" in titles)
+
+    def test_write_json(self):
+        f = StringIO()
+        self.assertEqual((9, 7), export.write_json(self.stream(), f))
+
+        graph_ = json.loads(f.getvalue())["graph"]
+        self.assertTrue(graph_["directed"])
+        self.assertEqual(9, len(graph_["nodes"]))
+        self.assertEqual(7, len(graph_["edges"]))
+
+        observed = [
+            edge for edge in graph_["edges"]
+            if edge["relation"] == "observed_ttps"
+        ]
+        self.assertEqual(
+            {"relationship": "Uses", "confidence": "High"},
+            observed[0]["metadata"]
+        )
+
+    def test_empty(self):
+        f = StringIO()
+        xml = STIXPackage(id_="example:package-1").to_xml()
+        self.assertEqual((1, 0), export.write_json(BytesIO(xml), f))
+        self.assertEqual([], json.loads(f.getvalue())["graph"]["edges"])
+
+
+if __name__ == "__main__":
+    unittest.main()
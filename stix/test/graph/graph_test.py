@@ -0,0 +1,206 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from mixbox.vendor.six import StringIO
+
+from stix import graph
+from stix.campaign import Campaign
+from stix.common import CampaignRef
+from stix.common.related import (
+    RelatedCampaignRef, RelatedIndicator, RelatedTTP, RelatedThreatActor
+)
+from stix.core import STIXPackage
+from stix.incident import AttributedThreatActors, Incident
+from stix.indicator import Indicator
+from stix.threat_actor import ThreatActor
+from stix.ttp import TTP
+
+
+class GraphTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = STIXPackage(id_="example:package-1")
+
+        ttp = TTP(id_="example:ttp-1")
+        actor = ThreatActor(id_="example:actor-1")
+        actor.observed_ttps.append(
+            RelatedTTP(
+                TTP(idref="example:ttp-1"),
+                relationship="Uses",
+                confidence="High"
+            )
+        )
+
+        indicator = Indicator(id_="example:indicator-1")
+        indicator.add_indicated_ttp(TTP(idref="example:ttp-1"))
+        indicator.related_campaigns.append(
+            RelatedCampaignRef(CampaignRef(idref="example:campaign-1"))
+        )
+
+        incident = Incident(id_="example:incident-1")
+        incident.related_indicators.append(RelatedIndicator(indicator))
+        incident.attributed_threat_actors = AttributedThreatActors()
+        incident.attributed_threat_actors.append(
+            RelatedThreatActor(ThreatActor(idref="example:actor-1"))
+        )
+
+        # Inline content is a node as well.
+        campaign = Campaign(id_="example:campaign-2")
+        campaign.related_incidents.append(incident)
+
+        for entity in (ttp, actor, indicator, campaign):
+            self.package.add(entity)
+
+        self.graph = graph.build(self.package)
+
+    def neighbors(self, id_, **kwargs):
+        return sorted(self.graph.ids(self.graph.neighbors(id_, **kwargs)))
+
+    def test_edges(self):
+        edges = set(
+            self.graph.edge(i) for i in range(self.graph.edge_count)
+        )
+
+        expected = set([
+            ("example:actor-1", "example:ttp-1",
+             "observed_ttps", "Uses", "High"),
+            ("example:indicator-1", "example:ttp-1",
+             "indicated_ttps", None, None),
+            ("example:indicator-1", "example:campaign-1",
+             "related_campaigns", None, None),
+            ("example:incident-1", "example:indicator-1",
+             "related_indicators", None, None),
+            ("example:incident-1", "example:actor-1",
+             "attributed_threat_actors", None, None),
+            ("example:campaign-2", "example:incident-1",
+             "related_incidents", None, None),
+        ])
+
+        self.assertEqual(expected, edges)
+
+    def test_nodes(self):
+        self.assertEqual(7, len(self.graph))
+        self.assertTrue("example:package-1" in self.graph)
+        self.assertTrue("example:campaign-1" in self.graph)
+        self.assertFalse("example:missing" in self.graph)
+        self.assertRaises(KeyError, self.graph.node, "example:missing")
+
+        node = self.graph.node("example:ttp-1")
+        self.assertEqual(["example:ttp-1"], self.graph.ids([node]))
+
+    def test_neighbors(self):
+        self.assertEqual(
+            ["example:campaign-1", "example:ttp-1"],
+            self.neighbors("example:indicator-1")
+        )
+        self.assertEqual(
+            ["example:actor-1", "example:indicator-1"],
+            self.neighbors("example:ttp-1", direction="in")
+        )
+        self.assertEqual(
+            ["example:campaign-1", "example:incident-1", "example:ttp-1"],
+            self.neighbors("example:indicator-1", direction="both")
+        )
+        self.assertEqual(
+            ["example:ttp-1"],
+            self.neighbors("example:indicator-1", edge_type="indicated_ttps")
+        )
+        self.assertEqual(
+            [], self.neighbors("example:indicator-1", edge_type="unknown")
+        )
+        self.assertRaises(
+            ValueError, self.graph.neighbors, "example:ttp-1", direction="up"
+        )
+
+    def test_degree(self):
+        self.assertEqual(2, self.graph.in_degree("example:ttp-1"))
+        self.assertEqual(0, self.graph.out_degree("example:ttp-1"))
+        self.assertEqual(2, self.graph.out_degree("example:incident-1"))
+
+    def test_k_hop(self):
+        node = self.graph.node("example:campaign-2")
+        hops = self.graph.k_hop(node, 2)
+
+        self.assertEqual(
+            {"example:incident-1": 1,
+             "example:indicator-1": 2,
+             "example:actor-1": 2},
+            dict((self.graph.nodes[n], d) for n, d in hops.items())
+        )
+
+        hops = self.graph.k_hop(node, 10)
+        self.assertEqual(5, len(hops))
+        self.assertEqual({}, self.graph.k_hop(node, 0))
+
+    def test_shortest_path(self):
+        path = self.graph.shortest_path(
+            "example:campaign-2", "example:campaign-1"
+        )
+        self.assertEqual(
+            ["example:campaign-2", "example:incident-1",
+             "example:indicator-1", "example:campaign-1"],
+            self.graph.ids(path)
+        )
+
+        # Edges are directed unless asked otherwise.
+        self.assertEqual(
+            None,
+            self.graph.shortest_path("example:ttp-1", "example:actor-1")
+        )
+
+        path = self.graph.shortest_path(
+            "example:ttp-1", "example:actor-1", direction="both"
+        )
+        self.assertEqual(["example:ttp-1", "example:actor-1"],
+                         self.graph.ids(path))
+
+        path = self.graph.shortest_path("example:ttp-1", "example:ttp-1")
+        self.assertEqual(["example:ttp-1"], self.graph.ids(path))
+
+    def test_corpus(self):
+        other = STIXPackage()
+        other.add(TTP(id_="example:ttp-2", title="Other"))
+        indicator = Indicator(id_="example:indicator-2")
+        indicator.add_indicated_ttp(TTP(idref="example:ttp-2"))
+        indicator.add_indicated_ttp(TTP(idref="example:ttp-1"))
+        other.add(indicator)
+
+        corpus = graph.build([self.package, other])
+
+        self.assertEqual(
+            ["example:indicator-1", "example:indicator-2"],
+            sorted(corpus.ids(corpus.neighbors("example:ttp-1",
+                                               direction="in",
+                                               edge_type="indicated_ttps")))
+        )
+
+    def test_parsed(self):
+        xml = StringIO(self.package.to_xml(encoding=None))
+        parsed = graph.build(STIXPackage.from_xml(xml))
+
+        self.assertEqual(self.graph.edge_count, parsed.edge_count)
+        self.assertEqual(
+            set(self.graph.edge(i) for i in range(self.graph.edge_count)),
+            set(parsed.edge(i) for i in range(parsed.edge_count))
+        )
+
+    def test_many_edges(self):
+        package = STIXPackage()
+        package.add(TTP(id_="example:ttp-1"))
+
+        for i in range(1000):
+            indicator = Indicator(id_="example:indicator-%d" % i)
+            indicator.add_indicated_ttp(TTP(idref="example:ttp-1"))
+            package.add(indicator)
+
+        g = graph.build(package)
+        self.assertEqual(1000, g.edge_count)
+        self.assertEqual(1000, g.in_degree("example:ttp-1"))
+        self.assertEqual(1000, len(g.k_hop("example:indicator-0", 2,
+                                           direction="both")))
+
+
+if __name__ == "__main__":
+    unittest.main()
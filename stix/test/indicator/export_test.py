@@ -0,0 +1,98 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+from cybox.objects.domain_name_object import DomainName
+from mixbox.vendor.six import StringIO
+
+from stix.core import STIXPackage, STIXHeader
+from stix.data_marking import Marking, MarkingSpecification
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.indicator import Indicator, ValidTime
+from stix.indicator import export
+
+
+def _marking(color):
+    spec = MarkingSpecification()
+    spec.controlled_structure = "//node() | //@*"
+    spec.marking_structures.append(TLPMarkingStructure(color))
+
+    marking = Marking()
+    marking.add_marking(spec)
+    return marking
+
+
+def _package():
+    package = STIXPackage()
+    package.stix_header = STIXHeader()
+    package.stix_header.handling = _marking("GREEN")
+
+    addr = Address("10.0.0.1", Address.CAT_IPV4)
+    addr.address_value.condition = "Equals"
+    domain = DomainName()
+    domain.value = "example.com"
+    domain.value.condition = "Equals"
+
+    indicator = Indicator(id_="example:indicator-1")
+    indicator.confidence = "High"
+    indicator.handling = _marking("RED")
+    indicator.add_observable(addr)
+    indicator.add_observable(domain)
+    indicator.add_valid_time_position(
+        ValidTime("2017-01-01T00:00:00+00:00", "2017-02-01T00:00:00+00:00")
+    )
+    package.add_indicator(indicator)
+
+    other = DomainName()
+    other.value = "example.org"
+    package.add_observable(Observable(other, id_="example:observable-1"))
+
+    indicator = Indicator(id_="example:indicator-2")
+    indicator.observable = Observable(idref="example:observable-1")
+    package.add_indicator(indicator)
+
+    return package
+
+
+class FlattenTests(unittest.TestCase):
+
+    def test_flatten(self):
+        batches = list(export.flatten(_package()))
+        self.assertEqual(len(batches), 1)
+
+        batch = batches[0]
+        self.assertEqual(set(batch), set(export.COLUMNS))
+        self.assertEqual(
+            batch['indicator_id'],
+            ["example:indicator-1", "example:indicator-1", "example:indicator-2"]
+        )
+        self.assertEqual(
+            batch['type'],
+            ["AddressObjectType:address_value", "DomainNameObjectType:value",
+             "DomainNameObjectType:value"]
+        )
+        self.assertEqual(batch['value'], ["10.0.0.1", "example.com", "example.org"])
+        self.assertEqual(batch['confidence'], ["High", "High", None])
+        self.assertEqual(batch['tlp'], ["RED", "RED", "GREEN"])
+        self.assertEqual(batch['valid_from'][0], "2017-01-01T00:00:00+00:00")
+        self.assertEqual(batch['valid_until'][2], None)
+
+    def test_batch_size(self):
+        batches = list(export.flatten(_package(), batch_size=2))
+        self.assertEqual([len(x['value']) for x in batches], [2, 1])
+
+    def test_write_csv(self):
+        f = StringIO()
+        count = export.write_csv(_package(), f)
+        lines = f.getvalue().splitlines()
+
+        self.assertEqual(count, 3)
+        self.assertEqual(lines[0], ",".join(export.COLUMNS))
+        self.assertEqual(len(lines), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
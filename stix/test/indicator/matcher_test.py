@@ -0,0 +1,260 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.core import Observable, ObservableComposition
+from cybox.objects.address_object import Address
+from cybox.objects.domain_name_object import DomainName
+from cybox.objects.file_object import File
+from cybox.objects.uri_object import URI
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator, CompositeIndicatorExpression, ValidTime
+from stix.indicator import matcher
+
+ADDRESS = "AddressObjectType:address_value"
+DOMAIN = "DomainNameObjectType:value"
+URL = "URIObjectType:value"
+HASH = "FileObjectType:hashes.simple_hash_value"
+
+
+def _address(value, condition="Equals"):
+    addr = Address(value, Address.CAT_IPV4)
+    addr.address_value.condition = condition
+    return addr
+
+
+def _domain(value, condition="Equals"):
+    domain = DomainName()
+    domain.value = value
+    domain.value.condition = condition
+    return domain
+
+
+def _url(value, condition):
+    url = URI(value)
+    url.value.condition = condition
+    return url
+
+
+def _indicator(id_, *objects):
+    indicator = Indicator(id_=id_)
+
+    for obj in objects:
+        indicator.add_observable(obj)
+
+    return indicator
+
+
+class MatcherTests(unittest.TestCase):
+
+    def test_equals(self):
+        indicators = [
+            _indicator("example:indicator-1", _address("10.0.0.1")),
+            _indicator("example:indicator-2", _domain("example.com")),
+        ]
+        m = matcher.compile(indicators)
+
+        self.assertEqual(len(m), 2)
+        self.assertEqual(m.match({ADDRESS: "10.0.0.1"}), ["example:indicator-1"])
+        self.assertEqual(m.match({ADDRESS: "10.0.0.2"}), [])
+        self.assertEqual(
+            m.match({ADDRESS: ["10.0.0.2", "10.0.0.1"], DOMAIN: "example.com"}),
+            ["example:indicator-1", "example:indicator-2"]
+        )
+
+    def test_fields(self):
+        indicators = [_indicator("example:indicator-1", _address("10.0.0.1"))]
+        m = matcher.compile(indicators, fields={
+            'src_ip': ADDRESS,
+            'dst_ip': [ADDRESS],
+        })
+
+        self.assertEqual(m.match({'src_ip': "10.0.0.1"}), ["example:indicator-1"])
+        self.assertEqual(m.match({'dst_ip': "10.0.0.1"}), ["example:indicator-1"])
+        self.assertEqual(m.match({'other': "10.0.0.1"}), [])
+
+    def test_string_conditions(self):
+        indicators = [
+            _indicator("example:contains", _url("evil", "Contains")),
+            _indicator("example:starts", _url("http://bad.", "StartsWith")),
+            _indicator("example:ends", _url(".exe", "EndsWith")),
+            _indicator("example:pattern", _url(r"/[0-9]{4}/", "FitsPattern")),
+        ]
+        m = matcher.compile(indicators)
+
+        self.assertEqual(
+            m.match({URL: "http://bad.example.com/evil/2017/a.exe"}),
+            ["example:contains", "example:starts", "example:ends",
+             "example:pattern"]
+        )
+        self.assertEqual(m.match({URL: "http://good.example.com/"}), [])
+
+    def test_case_insensitive(self):
+        domain = _domain("Example.COM")
+        domain.value.is_case_sensitive = False
+        m = matcher.compile([_indicator("example:indicator-1", domain)])
+
+        self.assertEqual(m.match({DOMAIN: "example.com"}), ["example:indicator-1"])
+
+    def test_apply_condition(self):
+        domain = _domain(["a.com", "b.com"])
+        domain.value.apply_condition = "ALL"
+        m = matcher.compile([_indicator("example:indicator-1", domain)])
+
+        self.assertEqual(m.match({DOMAIN: "a.com"}), [])
+        self.assertEqual(m.match({DOMAIN: ["a.com", "b.com"]}), ["example:indicator-1"])
+
+    def test_object_properties(self):
+        f = File()
+        f.file_name = "foo.exe"
+        f.file_name.condition = "Equals"
+        f.add_hash("d41d8cd98f00b204e9800998ecf8427e")
+        f.hashes[0].simple_hash_value.condition = "Equals"
+        m = matcher.compile([_indicator("example:indicator-1", f)])
+
+        hash_ = "d41d8cd98f00b204e9800998ecf8427e"
+        self.assertEqual(m.match({HASH: hash_}), [])
+        self.assertEqual(
+            m.match({HASH: hash_, "FileObjectType:file_name": "foo.exe"}),
+            ["example:indicator-1"]
+        )
+
+    def test_composition(self):
+        and_indicator = _indicator(
+            "example:and", _address("10.0.0.1"), _domain("example.com")
+        )
+        and_indicator.observable_composition_operator = "AND"
+        or_indicator = _indicator(
+            "example:or", _address("10.0.0.1"), _domain("example.com")
+        )
+        m = matcher.compile([and_indicator, or_indicator])
+
+        self.assertEqual(m.match({ADDRESS: "10.0.0.1"}), ["example:or"])
+        self.assertEqual(
+            m.match({ADDRESS: "10.0.0.1", DOMAIN: "example.com"}),
+            ["example:and", "example:or"]
+        )
+
+    def test_negate(self):
+        observable = Observable(_address("10.0.0.1"))
+        observable.negate = True
+        indicator = Indicator(id_="example:indicator-1")
+        indicator.observable = observable
+        m = matcher.compile([indicator])
+
+        self.assertEqual(m.match({ADDRESS: "10.0.0.1"}), [])
+        self.assertEqual(m.match({ADDRESS: "10.0.0.2"}), ["example:indicator-1"])
+
+    def test_composite_indicator_expression(self):
+        child1 = _indicator("example:child-1", _address("10.0.0.1"))
+        child2 = _indicator("example:child-2", _domain("example.com"))
+        parent = Indicator(id_="example:parent")
+        parent.composite_indicator_expression = CompositeIndicatorExpression(
+            "AND", child1, Indicator(idref="example:child-2")
+        )
+        m = matcher.compile([parent, child2])
+
+        self.assertEqual(m.match({ADDRESS: "10.0.0.1"}), [])
+        self.assertEqual(
+            m.match({ADDRESS: "10.0.0.1", DOMAIN: "example.com"}),
+            ["example:parent", "example:child-2"]
+        )
+
+    def test_package_idrefs(self):
+        observable = Observable(_address("10.0.0.1"), id_="example:observable-1")
+        indicator = Indicator(id_="example:indicator-1")
+        indicator.observable = Observable(idref="example:observable-1")
+
+        package = STIXPackage()
+        package.add_observable(observable)
+        package.add_indicator(indicator)
+        m = matcher.compile(package)
+
+        self.assertEqual(m.match({ADDRESS: "10.0.0.1"}), ["example:indicator-1"])
+
+    def test_match_batch(self):
+        indicators = [
+            _indicator("example:indicator-1", _address("10.0.0.1")),
+            _indicator("example:indicator-2", _domain("Example.com")),
+        ]
+        m = matcher.compile(indicators, fields={
+            'src_ip': ADDRESS,
+            'domain': DOMAIN,
+        })
+        columns = {
+            'src_ip': ["10.0.0.2", "10.0.0.1", None, "10.0.0.1"],
+            'domain': ["a.com", "b.com", "Example.com", "Example.com"],
+        }
+
+        self.assertEqual(
+            m.match_batch(columns),
+            [[], ["example:indicator-1"], ["example:indicator-2"],
+             ["example:indicator-1", "example:indicator-2"]]
+        )
+
+    def test_match_batch_scan(self):
+        indicators = [
+            _indicator("example:indicator-1", _address("10.0.0.1")),
+            _indicator("example:indicator-2", _url("evil", "Contains")),
+        ]
+        m = matcher.compile(indicators)
+        columns = {
+            ADDRESS: ["10.0.0.1", "10.0.0.2"],
+            URL: ["http://a.com/", "http://evil.com/"],
+        }
+
+        self.assertEqual(
+            m.match_batch(columns),
+            [["example:indicator-1"], ["example:indicator-2"]]
+        )
+
+    def test_match_batch_lengths(self):
+        m = matcher.compile([])
+        self.assertEqual(m.match_batch({}), [])
+        self.assertRaises(ValueError, m.match_batch, {'a': [1], 'b': [1, 2]})
+
+    def test_valid_time(self):
+        indicator = _indicator("example:indicator-1", _address("10.0.0.1"))
+        indicator.add_valid_time_position(
+            ValidTime("2017-01-01T00:00:00Z", "2017-01-31T00:00:00Z")
+        )
+        m = matcher.compile([indicator])
+        event = {ADDRESS: "10.0.0.1"}
+
+        self.assertEqual(m.match(event), ["example:indicator-1"])
+        self.assertEqual(m.match(event, at="2017-01-15T00:00:00Z"), ["example:indicator-1"])
+        self.assertEqual(m.match(event, at="2017-02-15T00:00:00Z"), [])
+        self.assertEqual(
+            m.match_batch({ADDRESS: ["10.0.0.1", "10.0.0.1"]},
+                          at=["2017-01-15", "2017-02-15"]),
+            [["example:indicator-1"], []]
+        )
+
+    def test_invalid_pattern(self):
+        indicators = [
+            _indicator("example:indicator-1", _url("(", "FitsPattern")),
+            _indicator("example:indicator-2", _domain("example.com")),
+        ]
+        m = matcher.compile(indicators)
+
+        self.assertEqual(1, len(m))
+        self.assertEqual(["example:indicator-1"], [x.id for x in m.unsupported])
+        self.assertTrue(isinstance(m.unsupported[0].error, ValueError))
+        self.assertEqual(m.match({DOMAIN: "example.com"}), ["example:indicator-2"])
+
+    def test_unsupported_condition(self):
+        indicators = [
+            _indicator("example:indicator-1", _url("x", "IsInRange")),
+            _indicator("example:indicator-2", _domain("example.com")),
+        ]
+        m = matcher.compile(indicators)
+
+        self.assertEqual(["example:indicator-1"], [x.id for x in m.unsupported])
+        self.assertEqual(m.match({URL: "x", DOMAIN: "example.com"}),
+                         ["example:indicator-2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import base64
+import os
+import shutil
+import tempfile
+import unittest
+
+from lxml import etree
+from mixbox.vendor.six import BytesIO, StringIO
+
+from stix.common import EncodedCDATA
+from stix.core import STIXPackage
+from stix.extensions.test_mechanism.open_ioc_2010_test_mechanism import (
+    OpenIOCTestMechanism
+)
+from stix.extensions.test_mechanism.snort_test_mechanism import (
+    SnortTestMechanism
+)
+from stix.extensions.test_mechanism.yara_test_mechanism import (
+    YaraTestMechanism
+)
+from stix.indicator import Indicator, test_mechanism
+
+RULE_1 = (
+    'alert tcp any any -> any any (msg:"Test  one"; content:"|16 03|"; '
+    'sid:1000001; rev:1;)'
+)
+RULE_2 = 'alert udp any any -> any 53 (msg:"Test two"; sid:1000002; rev:3;)'
+RULE_3 = 'alert icmp any any -> any any (msg:"No sid";)'
+
+YARA = """
+        rule Example
+        {
+            strings:
+                $a = "example"   
+            condition:
+                $a
+        }
+"""
+
+IOC = """
+<ioc xmlns="http://schemas.mandiant.com/2010/ioc"
+    id="6d2a1b03-b216-4cd8-9a9e-8827af6ebf93">
+  <short_description>Example</short_description>
+  <definition>
+    <Indicator operator="OR" id="9c8df971-32a8-4ede-8a3a-c5cb2c1439c6">
+      <IndicatorItem id="50455b63-35bf-4efa-9f06-aeba2980f80a"
+          condition="contains">
+        <Context document="ProcessItem" search="ProcessItem/name"/>
+        <Content type="string">example.exe</Content>
+      </IndicatorItem>
+    </Indicator>
+  </definition>
+</ioc>
+"""
+
+
+def _snort(*rules):
+    tm = SnortTestMechanism()
+
+    for rule in rules:
+        tm.rules.append(rule)
+
+    return tm
+
+
+def _indicator(*test_mechanisms):
+    indicator = Indicator()
+
+    for tm in test_mechanisms:
+        indicator.test_mechanisms.append(tm)
+
+    return indicator
+
+
+class ExtractRulesTests(unittest.TestCase):
+
+    def setUp(self):
+        # The first rule again, with different whitespace and a newer
+        # revision.
+        spaced = RULE_1.replace("; ", ";\t  ")
+        newer = RULE_1.replace("rev:1", "rev:2")
+        encoded = EncodedCDATA(
+            base64.b64encode(RULE_3.encode("utf-8")).decode("ascii"),
+            encoded=True
+        )
+
+        yara = YaraTestMechanism()
+        yara.rule = YARA
+
+        ioc = OpenIOCTestMechanism()
+        ioc.ioc = etree.fromstring(IOC)
+
+        self.package = STIXPackage()
+        self.package.add(_indicator(
+            _snort(RULE_1 + "\n# A comment\n" + RULE_2, RULE_3),
+            yara,
+            ioc
+        ))
+        self.package.add(_indicator(
+            _snort(spaced, newer, encoded),
+            yara
+        ))
+
+        self.xml = self.package.to_xml()
+
+    def rules(self, kind):
+        return [rule.text for rule in
+                test_mechanism.extract_rules(self.package, kind=kind)]
+
+    def stream_rules(self, kind):
+        return [rule.text for rule in
+                test_mechanism.extract_rules(BytesIO(self.xml), kind=kind)]
+
+    def test_snort(self):
+        rules = self.rules("snort")
+        self.assertEqual(
+            [RULE_1, RULE_2, RULE_3, RULE_1.replace("rev:1", "rev:2")],
+            rules
+        )
+        self.assertEqual(rules, self.stream_rules("snort"))
+
+        keys = [x.key for x in test_mechanism.extract_rules(self.package)]
+        self.assertEqual(["1:1000001:1", "1:1000002:3"], keys[:2])
+
+    def test_snort_normalize(self):
+        spaced = 'alert  tcp any  any -> any any \\\n  (msg:"a  b";\tsid:1;)'
+        rules = list(test_mechanism._snort_rules(spaced))
+        self.assertEqual(
+            ['alert tcp any any -> any any (msg:"a  b"; sid:1;)'], rules
+        )
+
+    def test_yara(self):
+        rules = self.rules("yara")
+        self.assertEqual(1, len(rules))
+        self.assertTrue(rules[0].startswith("rule Example\n{\n    strings:"))
+        self.assertTrue('$a = "example"\n' in rules[0])
+        self.assertEqual(rules, self.stream_rules("yara"))
+
+    def test_openioc(self):
+        rules = self.rules("openioc")
+        self.assertEqual(1, len(rules))
+        self.assertEqual(rules, self.stream_rules("openioc"))
+
+        root = etree.fromstring(rules[0])
+        self.assertEqual("{http://schemas.mandiant.com/2010/ioc}ioc", root.tag)
+        self.assertEqual("6d2a1b03-b216-4cd8-9a9e-8827af6ebf93", root.get("id"))
+
+    def test_write_rules(self):
+        f = StringIO()
+        self.assertEqual(4, test_mechanism.write_rules(BytesIO(self.xml), f))
+        self.assertEqual(4, len(f.getvalue().splitlines()))
+
+        f = StringIO()
+        self.assertEqual(
+            1, test_mechanism.write_rules(self.package, f, kind="yara")
+        )
+        self.assertTrue(f.getvalue().endswith("}\n\n"))
+
+        self.assertRaises(
+            ValueError, test_mechanism.write_rules, self.package, f, "openioc"
+        )
+        self.assertRaises(
+            ValueError, list,
+            test_mechanism.extract_rules(self.package, kind="suricata")
+        )
+
+    def test_write_iocs(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            paths = test_mechanism.write_iocs(BytesIO(self.xml), directory)
+            self.assertEqual(
+                [os.path.join(directory,
+                              "6d2a1b03-b216-4cd8-9a9e-8827af6ebf93.ioc")],
+                paths
+            )
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import datetime
+import random
+import unittest
+
+import dateutil.tz
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator, ValidTime
+from stix.indicator.valid_time import ValidTimeIndex
+
+
+def _indicator(id_, *windows):
+    indicator = Indicator(id_=id_)
+
+    for start, end in windows:
+        indicator.add_valid_time_position(ValidTime(start, end))
+
+    return indicator
+
+
+class ValidTimeIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.always = _indicator("example:always")
+        self.jan = _indicator(
+            "example:jan", ("2017-01-01T00:00:00Z", "2017-01-31T23:59:59Z")
+        )
+        self.feb = _indicator(
+            "example:feb", ("2017-02-01T00:00:00Z", "2017-02-28T23:59:59Z")
+        )
+        self.since_march = _indicator(
+            "example:since-march", ("2017-03-01T00:00:00Z", None)
+        )
+        self.split = _indicator(
+            "example:split",
+            ("2016-12-01T00:00:00Z", "2016-12-31T00:00:00Z"),
+            ("2017-02-10T00:00:00Z", "2017-02-11T00:00:00Z"),
+        )
+        self.indicators = [
+            self.always, self.jan, self.feb, self.since_march, self.split
+        ]
+        self.index = ValidTimeIndex(self.indicators)
+
+    def test_valid_at(self):
+        self.assertEqual(
+            self.index.valid_at("2017-01-15T00:00:00Z"),
+            [self.always, self.jan]
+        )
+        self.assertEqual(
+            self.index.valid_at("2017-02-10T12:00:00Z"),
+            [self.always, self.feb, self.split]
+        )
+        self.assertEqual(
+            self.index.valid_at("2020-01-01T00:00:00Z"),
+            [self.always, self.since_march]
+        )
+
+    def test_valid_at_timezone(self):
+        # 2017-01-31T23:30:00-05:00 is in February in UTC.
+        tz = dateutil.tz.tzoffset(None, -5 * 3600)
+        t = datetime.datetime(2017, 1, 31, 23, 30, tzinfo=tz)
+        self.assertEqual(self.index.valid_at(t), [self.always, self.feb])
+
+    def test_overlapping(self):
+        self.assertEqual(
+            self.index.overlapping("2017-01-20T00:00:00Z", "2017-02-05T00:00:00Z"),
+            [self.always, self.jan, self.feb]
+        )
+        self.assertEqual(
+            self.index.overlapping("2016-12-15T00:00:00Z", None),
+            self.indicators
+        )
+        self.assertEqual(
+            self.index.overlapping("2017-02-01T00:00:00Z", "2017-01-01T00:00:00Z"),
+            []
+        )
+
+    def test_against_scan(self):
+        base = datetime.datetime(2017, 1, 1)
+        indicators = []
+
+        for i in range(200):
+            start = base + datetime.timedelta(hours=random.randrange(1000))
+            end = start + datetime.timedelta(hours=random.randrange(100))
+            indicators.append(_indicator("example:i-%d" % i, (start, end)))
+
+        index = ValidTimeIndex(indicators)
+
+        for _ in range(50):
+            t = base + datetime.timedelta(hours=random.randrange(1100))
+            expected = [
+                x for x in indicators
+                if x.valid_time_positions[0].start_time.value <= t <=
+                x.valid_time_positions[0].end_time.value
+            ]
+            self.assertEqual(index.valid_at(t), expected)
+
+
+class IndicatorsValidAtTests(unittest.TestCase):
+
+    def test_valid_at(self):
+        package = STIXPackage()
+        jan = _indicator(
+            "example:jan", ("2017-01-01T00:00:00Z", "2017-01-31T23:59:59Z")
+        )
+        package.add_indicator(jan)
+
+        self.assertEqual(package.indicators.valid_at("2017-01-02"), [jan])
+        self.assertEqual(package.indicators.valid_at("2017-02-02"), [])
+
+        # Adding an Indicator invalidates the cached index.
+        feb = _indicator(
+            "example:feb", ("2017-02-01T00:00:00Z", "2017-02-28T23:59:59Z")
+        )
+        package.add_indicator(feb)
+
+        self.assertEqual(package.indicators.valid_at("2017-02-02"), [feb])
+        self.assertEqual(
+            package.indicators.valid_during("2017-01-30", "2017-02-02"),
+            [jan, feb]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
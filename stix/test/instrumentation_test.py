@@ -0,0 +1,104 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from stix import instrumentation, testing
+from stix.base import Entity
+from stix.core import STIXPackage
+
+
+class InstrumentationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = testing.generate(n_indicators=5, n_ttps=2, seed=1)
+        self.events = []
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def names(self):
+        return [e.name for e in self.events]
+
+    def test_disabled(self):
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertFalse("to_obj" in vars(Entity))
+        self.assertFalse("from_dict" in vars(Entity))
+
+        self.package.to_xml()
+        self.assertEqual([], self.events)
+
+    def test_enable_disable(self):
+        instrumentation.enable(self.events.append)
+        self.assertTrue(instrumentation.is_enabled())
+        self.assertTrue("to_obj" in vars(Entity))
+
+        instrumentation.disable(self.events.append)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertFalse("to_obj" in vars(Entity))
+
+        self.package.to_xml()
+        self.assertEqual([], self.events)
+
+    def test_to_xml(self):
+        instrumentation.enable(self.events.append)
+        xml = self.package.to_xml()
+
+        self.assertEqual(
+            ["to_xml.to_obj", "to_xml.namespaces", "to_xml.export", "to_xml"],
+            self.names()
+        )
+
+        for event in self.events:
+            self.assertEqual(instrumentation.TIMING, event.kind)
+            self.assertTrue(event.value >= 0)
+
+        instrumentation.disable()
+        self.assertEqual(self.package.to_xml(), xml)
+
+    def test_parse_xml(self):
+        xml = self.package.to_xml()
+
+        with instrumentation.collect() as collector:
+            package = STIXPackage.from_xml(BytesIO(xml))
+
+        timings = dict((k[0], v) for k, v in collector.timings.items())
+
+        for name in ("parse_xml", "parse_xml.lxml", "parse_xml.build",
+                     "parse_xml.from_obj"):
+            self.assertEqual(1, timings[name][0])
+
+        counts = collector.counts
+        self.assertTrue(counts[("parse_xml.elements", ())] > 0)
+
+        key = ("entities", (("class", "Indicator"),
+                            ("operation", "parse_xml")))
+        self.assertEqual(5, counts[key])
+
+        expected = STIXPackage.from_xml(BytesIO(xml))
+        self.assertEqual(expected.to_xml(), package.to_xml())
+        self.assertEqual(expected.__input_namespaces__,
+                         package.__input_namespaces__)
+        self.assertTrue("to_xml" not in collector.report())
+
+    def test_from_dict(self):
+        d = self.package.to_dict()
+
+        with instrumentation.collect() as collector:
+            package = STIXPackage.from_dict(d)
+
+        key = ("from_dict", (("class", "STIXPackage"),))
+        self.assertEqual(1, collector.timings[key][0])
+        self.assertEqual(1, len(collector.timings))
+
+        key = ("entities", (("class", "Indicator"),
+                            ("operation", "from_dict")))
+        self.assertEqual(5, collector.counts[key])
+        expected = STIXPackage.from_dict(d)
+        self.assertEqual(expected.to_dict(), package.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from stix import profile, testing
+from stix.common import StructuredText
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.utils.parser import EntityParser
+
+INDICATOR = "stix.indicator.indicator.Indicator"
+STRUCTURED_TEXT = "stix.common.structured_text.StructuredText"
+
+
+class MemoryReportTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = testing.generate(n_indicators=10, n_ttps=2, seed=3)
+
+    def test_counts(self):
+        report = profile.memory_report(self.package)
+        indicators = [x for x in self.package.walk()
+                      if isinstance(x, Indicator)]
+
+        # Includes idref-only Indicators in relationships.
+        self.assertTrue(len(indicators) > 10)
+        self.assertEqual(len(indicators), report.classes[INDICATOR].count)
+        self.assertEqual(1, report.classes[
+            "stix.core.stix_package.STIXPackage"].count)
+        self.assertEqual(0, report.lxml_trees)
+        self.assertFalse(report.LXML_TREES in report.classes)
+
+        # Classes and field descriptors are shared, not part of the model.
+        self.assertFalse("builtins.type" in report.classes)
+        self.assertFalse("mixbox.fields.TypedField" in report.classes)
+
+    def test_size(self):
+        text = StructuredText("x" * 10000)
+        report = profile.memory_report(text)
+
+        self.assertEqual(1, report.classes[STRUCTURED_TEXT].count)
+        self.assertTrue(report.classes[STRUCTURED_TEXT].size > 10000)
+        self.assertEqual(report.size, sum(x.size for x in report.top()))
+
+    def test_shared_values_counted_once(self):
+        report = profile.memory_report([self.package, self.package])
+        single = profile.memory_report(self.package)
+
+        self.assertEqual(single.classes[INDICATOR],
+                         report.classes[INDICATOR])
+
+    def test_lxml(self):
+        xml = self.package.to_xml()
+        binding = EntityParser().parse_xml_to_obj(BytesIO(xml))
+        report = profile.memory_report(binding)
+
+        self.assertEqual(1, report.lxml_trees)
+        self.assertTrue(report.lxml_elements > 10)
+        self.assertTrue(report.classes[report.LXML_TREES].size > len(xml))
+        self.assertTrue("lxml.etree._Element" in report.classes)
+
+        package = STIXPackage.from_xml(BytesIO(xml))
+        self.assertEqual(0, profile.memory_report(package).lxml_trees)
+
+    def test_report(self):
+        report = profile.memory_report(self.package)
+        text = str(report)
+
+        self.assertTrue(INDICATOR in text)
+        self.assertEqual(report.size, report.to_dict()["size"])
+        self.assertEqual(report.top()[:3], report.top(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cybox.core import Observable
+from cybox.objects.address_object import Address
+
+from stix.core import STIXHeader, STIXPackage
+from stix.data_marking import Marking, MarkingSpecification
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.indicator import Indicator
+from stix.store import SQLiteStore
+from stix.ttp import TTP
+
+
+def _handling(color):
+    specification = MarkingSpecification()
+    specification.controlled_structure = "//node()"
+    specification.marking_structures.append(TLPMarkingStructure(color=color))
+
+    handling = Marking()
+    handling.add_marking(specification)
+    return handling
+
+
+def _indicator(id_, timestamp, type_, address):
+    indicator = Indicator(id_=id_, timestamp=timestamp, title=id_)
+    indicator.add_indicator_type(type_)
+    indicator.add_observable(Address(address, category=Address.CAT_IPV4))
+    return indicator
+
+
+def _package(*components):
+    package = STIXPackage()
+
+    for component in components:
+        package.add(component)
+
+    return package
+
+
+class SQLiteStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = STIXPackage(id_="example:package-1")
+        self.package.stix_header = STIXHeader(handling=_handling("GREEN"))
+
+        self.package.add(_indicator(
+            "example:indicator-1", "2017-01-01T00:00:00Z",
+            "IP Watchlist", "10.0.0.1"
+        ))
+        self.package.add(_indicator(
+            "example:indicator-2", "2017-02-01T00:00:00Z",
+            "IP Watchlist", "10.0.0.2"
+        ))
+
+        red = _indicator(
+            "example:indicator-3", "2017-03-01T00:00:00Z",
+            "Malware Artifacts", "10.0.0.1"
+        )
+        red.handling = _handling("RED")
+        self.package.add(red)
+
+        self.package.add(TTP(id_="example:ttp-1", title="TTP",
+                             timestamp="2017-01-15T00:00:00Z"))
+        self.package.add(
+            Observable(Address("192.168.0.1"), id_="example:observable-1")
+        )
+        self.package.add(TTP(idref="example:ttp-2"))
+
+        self.store = SQLiteStore()
+        self.added = self.store.add(self.package)
+
+    def tearDown(self):
+        self.store.close()
+
+    def ids(self, **criteria):
+        return sorted(self.store.ids(**criteria))
+
+    def test_add(self):
+        # The TTP idref is not a component.
+        self.assertEqual(5, self.added)
+        self.assertEqual(5, len(self.store))
+
+        # Components are only stored once per id and timestamp.
+        self.assertEqual(0, self.store.add(self.package))
+        self.assertEqual(5, len(self.store))
+
+        newer = _indicator(
+            "example:indicator-1", "2017-04-01T00:00:00Z",
+            "IP Watchlist", "10.0.0.9"
+        )
+        self.assertEqual(1, self.store.add(_package(newer)))
+        self.assertEqual(6, len(self.store))
+
+    def test_add_without_id(self):
+        # Components without an id are identified by their content.
+        observable = Observable(Address("172.16.0.1"))
+        observable.id_ = None
+        package = _package(observable)
+
+        self.assertEqual(1, self.store.add([package, package]))
+        self.assertEqual(0, self.store.add(package))
+
+        other = Observable(Address("172.16.0.2"))
+        other.id_ = None
+        self.assertEqual(1, self.store.add(_package(other)))
+        self.assertEqual(7, len(self.store))
+        self.assertEqual(2, self.store.count(observable="172.16.0.1") +
+                         self.store.count(observable="172.16.0.2"))
+
+        # Only components with an id are listed by ids().
+        self.assertEqual(5, len(self.store.ids()))
+
+    def test_get(self):
+        indicator = self.store.get("example:indicator-2")
+        self.assertTrue(isinstance(indicator, Indicator))
+        self.assertEqual("example:indicator-2", indicator.title)
+        self.assertEqual(
+            "10.0.0.2", indicator.observable.object_.properties.address_value
+        )
+
+        observable = self.store.get("example:observable-1")
+        self.assertTrue(isinstance(observable, Observable))
+
+        self.assertEqual(None, self.store.get("example:missing"))
+
+    def test_get_version(self):
+        newer = _indicator(
+            "example:indicator-1", "2017-04-01T00:00:00Z",
+            "IP Watchlist", "10.0.0.9"
+        )
+        self.store.add(_package(newer))
+
+        latest = self.store.get("example:indicator-1")
+        self.assertEqual(
+            "10.0.0.9", latest.observable.object_.properties.address_value
+        )
+
+        original = self.store.get(
+            "example:indicator-1", timestamp="2017-01-01T00:00:00Z"
+        )
+        self.assertEqual(
+            "10.0.0.1", original.observable.object_.properties.address_value
+        )
+
+    def test_query(self):
+        results = self.store.query(
+            type="indicator",
+            vocab={"indicator_types": "IP Watchlist"},
+            tlp="GREEN",
+            since="2017-01-15"
+        )
+        self.assertEqual(
+            ["example:indicator-2"], [x.id_ for x in results]
+        )
+
+        # Ordered by timestamp.
+        results = self.store.query(type="indicator")
+        self.assertEqual(
+            ["example:indicator-1", "example:indicator-2",
+             "example:indicator-3"],
+            [x.id_ for x in results]
+        )
+
+    def test_query_criteria(self):
+        self.assertEqual(["example:ttp-1"], self.ids(type="ttp"))
+        self.assertEqual(["example:ttp-1"], self.ids(title="TTP"))
+        self.assertEqual(
+            ["example:indicator-1", "example:ttp-1"],
+            self.ids(until="2017-01-31")
+        )
+        self.assertEqual(["example:indicator-3"], self.ids(tlp="RED"))
+        self.assertEqual(
+            ["example:indicator-3"],
+            self.ids(vocab={"indicator_types": "Malware Artifacts"})
+        )
+        self.assertEqual(
+            ["example:indicator-1", "example:indicator-3"],
+            self.ids(observable="10.0.0.1")
+        )
+        self.assertEqual(
+            ["example:observable-1"],
+            self.ids(observable="192.168.0.1",
+                     observable_type="AddressObjectType:address_value")
+        )
+        self.assertEqual([], self.ids(observable="192.168.0.1",
+                                      observable_type="URIObjectType:value"))
+        self.assertEqual(3, self.store.count(type="indicator"))
+
+    def test_file(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            path = os.path.join(directory, "stix.db")
+
+            with SQLiteStore(path, batch_size=2) as store:
+                self.assertEqual(5, store.add([self.package]))
+
+            with SQLiteStore(path) as store:
+                self.assertEqual(5, len(store))
+                self.assertEqual(["example:indicator-3"], store.ids(tlp="RED"))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import json
+import unittest
+
+from mixbox.vendor.six import BytesIO, StringIO
+
+from stix import testing
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+
+
+class GenerateTests(unittest.TestCase):
+    KWARGS = dict(n_indicators=20, n_ttps=4, relationship_density=1.5,
+                  seed=7)
+
+    def setUp(self):
+        self.package = testing.generate(**self.KWARGS)
+
+    def test_counts(self):
+        self.assertEqual(20, len(self.package.indicators))
+        self.assertEqual(4, len(self.package.ttps))
+        self.assertEqual(2, len(self.package.exploit_targets))
+        self.assertEqual(2, len(self.package.incidents))
+
+        indicator = self.package.indicators[0]
+        self.assertTrue(isinstance(indicator, Indicator))
+        self.assertEqual("example:indicator-00000000", indicator.id_)
+        self.assertEqual(1, len(indicator.observables))
+
+    def test_deterministic(self):
+        same = testing.generate(**self.KWARGS)
+        self.assertEqual(self.package.to_xml(), same.to_xml())
+
+        kwargs = dict(self.KWARGS, seed=8)
+        other = testing.generate(**kwargs)
+        self.assertNotEqual(self.package.to_xml(), other.to_xml())
+
+    def test_relationships(self):
+        ttps = set(ttp.id_ for ttp in self.package.ttps)
+        indicated = [
+            related.item.idref
+            for indicator in self.package.indicators
+            for related in indicator.indicated_ttps
+        ]
+
+        self.assertTrue(indicated)
+        self.assertTrue(set(indicated) <= ttps)
+
+        package = testing.generate(n_indicators=5, relationship_density=0)
+        self.assertEqual(
+            0, sum(len(x.indicated_ttps) for x in package.indicators)
+        )
+
+    def test_marking_mix(self):
+        package = testing.generate(n_indicators=20, marking_mix={})
+        self.assertTrue(all(x.handling is None for x in package.indicators))
+        self.assertEqual(None, package.stix_header)
+
+        package = testing.generate(n_indicators=20,
+                                   marking_mix={"terms_of_use": 1.0})
+        self.assertTrue(all(x.handling for x in package.indicators))
+
+        self.assertRaises(ValueError, testing.generate,
+                          marking_mix={"unknown": 0.5})
+        self.assertRaises(ValueError, testing.generate,
+                          marking_mix={"tlp": 0.8, "statement": 0.8})
+
+    def test_write_xml(self):
+        f = StringIO()
+        self.assertEqual(28, testing.write_xml(f, **self.KWARGS))
+
+        parsed = STIXPackage.from_xml(BytesIO(f.getvalue().encode("utf-8")))
+        expected = STIXPackage.from_xml(BytesIO(self.package.to_xml()))
+        self.assertEqual(expected.to_dict(), parsed.to_dict())
+
+    def test_write_json(self):
+        f = StringIO()
+        self.assertEqual(28, testing.write_json(f, **self.KWARGS))
+        self.assertEqual(self.package.to_dict(), json.loads(f.getvalue()))
+
+    def test_write_empty(self):
+        f = StringIO()
+        self.assertEqual(0, testing.write_xml(f, n_indicators=0, n_ttps=0))
+
+        parsed = STIXPackage.from_xml(BytesIO(f.getvalue().encode("utf-8")))
+        self.assertEqual("example:package-0", parsed.id_)
+
+        f = StringIO()
+        self.assertEqual(0, testing.write_json(f, n_indicators=0, n_ttps=0))
+        self.assertEqual("example:package-0", json.loads(f.getvalue())["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
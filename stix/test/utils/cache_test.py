@@ -0,0 +1,158 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from cybox.objects.address_object import Address
+
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.utils import cache
+
+
+def _package(count):
+    package = STIXPackage(id_="example:package-%d" % count)
+
+    for i in range(count):
+        indicator = Indicator(id_="example:indicator-%d" % i, title="I")
+        indicator.add_observable(Address("10.0.0.%d" % i))
+        package.add(indicator)
+
+    return package
+
+
+class DiskCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = cache.DiskCache(self.directory)
+        self.xml = _package(3).to_xml()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def from_xml(self, xml, **kwargs):
+        return STIXPackage.from_xml(BytesIO(xml), cache=self.cache, **kwargs)
+
+    def test_hit(self):
+        parsed = self.from_xml(self.xml)
+        self.assertEqual((0, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual(1, len(self.cache))
+
+        cached = self.from_xml(self.xml)
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.assertTrue(cached is not parsed)
+        self.assertEqual(parsed.to_xml(), cached.to_xml())
+
+        # The fields of cached entities are the class fields.
+        indicator = cached.indicators[0]
+        self.assertEqual("I", indicator.title)
+        indicator.title = "Changed"
+        self.assertEqual("Changed", indicator.to_obj().Title)
+        self.assertEqual(
+            "10.0.0.0", indicator.observable.object_.properties.address_value
+        )
+
+    def test_path(self):
+        path = os.path.join(self.directory, "package.xml")
+
+        with open(path, "wb") as f:
+            f.write(self.xml)
+
+        STIXPackage.from_xml(path, cache=self.cache)
+        package = STIXPackage.from_xml(path, cache=self.cache)
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(3, len(package.indicators))
+
+    def test_options(self):
+        self.from_xml(self.xml)
+        self.from_xml(self.xml, passthrough=True)
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+        self.assertEqual(2, len(self.cache))
+
+    def test_version_stamp(self):
+        self.from_xml(self.xml)
+        original = cache._stamp
+
+        try:
+            cache._stamp = lambda: b"stix-cache 0.0\n"
+            self.from_xml(self.xml)
+            self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+        finally:
+            cache._stamp = original
+
+        # The entry written by the other "version" is replaced.
+        self.from_xml(self.xml)
+        self.assertEqual((0, 3), (self.cache.hits, self.cache.misses))
+        self.assertEqual(1, len(self.cache))
+
+    def test_corrupt_entry(self):
+        self.from_xml(self.xml)
+        path, = list(self.cache._entries())
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        # Truncated entries are removed and the document is parsed again.
+        with open(path, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        self.assertEqual("example:package-3", self.from_xml(self.xml).id_)
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+        self.assertEqual(1, len(self.cache))
+
+        with open(path, "wb") as f:
+            f.write(cache._stamp() + b"not a pickle")
+
+        key = os.path.splitext(os.path.basename(path))[0]
+        self.assertEqual(None, self.cache.get(key))
+        self.assertFalse(os.path.exists(path))
+
+    def test_put_error(self):
+        for error in (pickle.PicklingError("unpicklable"),
+                      TypeError("unpicklable"), IOError("disk full")):
+            def put(key, obj):
+                raise error
+
+            self.cache.put = put
+            self.assertEqual("example:package-3", self.from_xml(self.xml).id_)
+
+        self.assertEqual(3, self.cache.misses)
+        self.assertEqual(0, len(self.cache))
+
+    def test_eviction(self):
+        documents = [_package(i).to_xml() for i in range(1, 4)]
+
+        for i, xml in enumerate(documents):
+            self.from_xml(xml)
+            path = self.cache._path(self.cache.key(
+                xml, encoding=None, passthrough=False, retain_source=True
+            ))
+            os.utime(path, (i, i))
+
+        # Using the oldest entry makes it the most recently used.
+        self.from_xml(documents[0])
+        self.assertEqual(1, self.cache.hits)
+
+        self.cache.max_size = self.cache.size - 1
+        self.cache.evict()
+        self.assertEqual(2, len(self.cache))
+
+        self.from_xml(documents[1])
+        self.assertEqual(1, self.cache.hits)
+        self.from_xml(documents[0])
+        self.assertEqual(2, self.cache.hits)
+
+        self.cache.max_size = 0
+        self.cache.evict()
+        self.assertEqual(0, len(self.cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
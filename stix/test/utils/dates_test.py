@@ -0,0 +1,157 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import datetime
+import unittest
+
+import dateutil.parser
+import dateutil.tz
+
+from stix.utils import dates
+
+
+class ParseValueTests(unittest.TestCase):
+
+    # The fast path must agree with dateutil for these.
+    XS_VALUES = (
+        "2015-04-14T15:24:19",
+        "2015-04-14T15:24:19Z",
+        "2015-04-14T15:24:19+00:00",
+        "2015-04-14T15:24:19-05:00",
+        "2015-04-14T15:24:19.5+05:30",
+        "2015-04-14T15:24:19.123456Z",
+        "2015-04-14",
+    )
+
+    def test_matches_dateutil(self):
+        for value in self.XS_VALUES:
+            expected = dateutil.parser.parse(value)
+            parsed = dates.parse_value(value)
+            self.assertEqual(expected, parsed)
+            self.assertEqual(expected.isoformat(), parsed.isoformat())
+            self.assertEqual(expected.utcoffset(), parsed.utcoffset())
+
+    def test_fraction_truncated(self):
+        parsed = dates.parse_value("2015-04-14T15:24:19.1234567Z")
+        self.assertEqual(123456, parsed.microsecond)
+
+    def test_utc(self):
+        parsed = dates.parse_value("2015-04-14T15:24:19Z")
+        self.assertEqual(dateutil.tz.tzutc(), parsed.tzinfo)
+
+    def test_fallback(self):
+        # Not xs:dateTime, but dateutil can parse it.
+        parsed = dates.parse_value("April 14, 2015 15:24")
+        self.assertEqual(datetime.datetime(2015, 4, 14, 15, 24), parsed)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, dates.parse_value, "2015-02-30T00:00:00")
+
+    def test_passthrough(self):
+        now = dates.now()
+        self.assertTrue(dates.parse_value(now) is now)
+        self.assertEqual(None, dates.parse_value(None))
+        self.assertEqual(None, dates.parse_value(""))
+
+
+class ParseDateTests(unittest.TestCase):
+
+    def test_xs_date(self):
+        self.assertEqual(datetime.date(2015, 4, 14), dates.parse_date("2015-04-14"))
+
+    def test_xs_datetime(self):
+        parsed = dates.parse_date("2015-04-14T15:24:19Z")
+        self.assertEqual(datetime.date(2015, 4, 14), parsed)
+
+
+class DateTimeFieldTests(unittest.TestCase):
+
+    def test_field(self):
+        from stix.indicator.sightings import Sighting
+
+        sighting = Sighting(timestamp="2015-04-14T15:24:19Z")
+        expected = datetime.datetime(2015, 4, 14, 15, 24, 19, tzinfo=dateutil.tz.tzutc())
+
+        self.assertEqual(expected, sighting.timestamp)
+        self.assertEqual("2015-04-14T15:24:19+00:00", sighting.to_dict()['timestamp'])
+
+
+class NormalizeAllTests(unittest.TestCase):
+
+    def _package(self):
+        from stix.core import STIXPackage
+        from stix.common import DateTimeWithPrecision
+        from stix.incident import Incident, Time
+        from stix.indicator import Indicator
+        from stix.indicator.sightings import Sighting
+        from stix.indicator.valid_time import ValidTime
+
+        incident = Incident(timestamp="2015-04-14T10:00:00-05:00")
+        incident.time = Time(
+            initial_compromise=DateTimeWithPrecision("2015-04-14T10:30:45.5-05:00"),
+            incident_closed=DateTimeWithPrecision("2015-04-20T01:00:00+02:00", precision="day"),
+        )
+
+        indicator = Indicator(timestamp="2015-04-14T10:00:00-05:00")
+        indicator.add_valid_time_position(
+            ValidTime(start_time="2015-04-14T22:15:00-05:00", end_time="2015-05-01T00:00:00")
+        )
+        indicator.sightings.append(Sighting(timestamp="2015-04-14T10:00:00-05:00"))
+
+        package = STIXPackage()
+        package.add_incident(incident)
+        package.add_indicator(indicator)
+        return package, incident, indicator
+
+    def test_timezone(self):
+        package, incident, indicator = self._package()
+        count = dates.normalize_all(package)
+
+        utc = dateutil.tz.tzutc()
+        self.assertEqual(7, count)
+        self.assertEqual(datetime.datetime(2015, 4, 14, 15, tzinfo=utc), incident.timestamp)
+        self.assertEqual(utc, incident.timestamp.tzinfo)
+
+        compromise = incident.time.initial_compromise
+        self.assertEqual(datetime.datetime(2015, 4, 14, 15, 30, 45, 500000, tzinfo=utc), compromise.value)
+        self.assertEqual("second", compromise.precision)
+
+        # Naive values are assumed to be in the target timezone.
+        end = indicator.valid_time_positions[0].end_time.value
+        self.assertEqual(datetime.datetime(2015, 5, 1, tzinfo=utc), end)
+
+        # Equal timestamps share one converted value.
+        self.assertTrue(incident.timestamp is indicator.timestamp)
+        self.assertTrue(incident.timestamp is indicator.sightings[0].timestamp)
+
+    def test_precision(self):
+        package, incident, indicator = self._package()
+        dates.normalize_all(package, precision="hour")
+
+        utc = dateutil.tz.tzutc()
+        compromise = incident.time.initial_compromise
+        self.assertEqual(datetime.datetime(2015, 4, 14, 15, tzinfo=utc), compromise.value)
+        self.assertEqual("hour", compromise.precision)
+
+        # Coarser precisions are kept.
+        closed = incident.time.incident_closed
+        self.assertEqual(datetime.datetime(2015, 4, 19, tzinfo=utc), closed.value)
+        self.assertEqual("day", closed.precision)
+
+        start = indicator.valid_time_positions[0].start_time
+        self.assertEqual(datetime.datetime(2015, 4, 15, 3, tzinfo=utc), start.value)
+        self.assertEqual("hour", indicator.sightings[0].timestamp_precision)
+
+    def test_named_timezone(self):
+        package, incident, _ = self._package()
+        dates.normalize_all(package, tz="Europe/Berlin")
+        self.assertEqual(17, incident.timestamp.hour)
+
+    def test_invalid(self):
+        package, _, _ = self._package()
+        self.assertRaises(ValueError, dates.normalize_all, package, precision="week")
+        self.assertRaises(ValueError, dates.normalize_all, package, tz="Not/AZone")
+
+
+if __name__ == "__main__":
+    unittest.main()
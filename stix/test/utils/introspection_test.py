@@ -0,0 +1,79 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from cybox.objects.address_object import Address
+
+import stix
+from stix.common.related import RelatedExploitTarget, RelatedTTP
+from stix.common.vocabs import VocabString
+from stix.data_marking import Marking, MarkingSpecification
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.indicator import Indicator
+from stix.ttp import TTP
+from stix.utils import introspection
+
+
+def _classify(cls):
+    if issubclass(cls, (VocabString, RelatedExploitTarget, RelatedTTP)):
+        return True
+    elif not issubclass(cls, stix.Entity):
+        return False
+
+    return None
+
+
+class FieldSelectorTests(unittest.TestCase):
+
+    def test_fields(self):
+        selector = introspection.FieldSelector(_classify)
+        attrs = [attr for _, attr in selector.fields(Indicator)]
+
+        self.assertTrue("indicator_types" in attrs)
+        self.assertFalse("id_" in attrs)
+        self.assertTrue(selector.may_hold(TTP))
+        self.assertTrue(selector.may_hold(RelatedTTP))
+
+    def test_list_field(self):
+        selector = introspection.FieldSelector(_classify)
+        field = selector.list_field(TTP.exploit_targets.type_)
+        self.assertTrue(field.multiple)
+        self.assertTrue(field.type_ is RelatedExploitTarget)
+        self.assertEqual(None, selector.list_field(Indicator))
+
+    def test_nothing_selected(self):
+        selector = introspection.FieldSelector(lambda cls: False)
+        self.assertEqual((), selector.fields(Indicator))
+        self.assertFalse(selector.may_hold(Indicator))
+
+
+class HelperTests(unittest.TestCase):
+
+    def test_is_true(self):
+        for value in (True, "true", "TRUE", "1", 1):
+            self.assertTrue(introspection.is_true(value))
+
+        for value in (None, False, "false", "0", 0, ""):
+            self.assertFalse(introspection.is_true(value))
+
+    def test_object_atoms(self):
+        address = Address("10.0.0.1", Address.CAT_IPV4)
+        address.address_value.condition = "Equals"
+
+        self.assertEqual(
+            [("AddressObjectType:address_value", "10.0.0.1", "Equals")],
+            list(introspection.object_atoms(address.parent))
+        )
+
+    def test_tlp_color(self):
+        spec = MarkingSpecification()
+        spec.marking_structures.append(TLPMarkingStructure(color="AMBER"))
+        handling = Marking(spec)
+
+        self.assertEqual("AMBER", introspection.tlp_color(handling))
+        self.assertEqual(None, introspection.tlp_color(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,24 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
-from mixbox.vendor.six import StringIO
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
 import unittest
 
+from lxml import etree
+from mixbox.vendor.six import BytesIO, StringIO
+
+from stix.utils import parser
 from stix.utils import (EntityParser, UnknownVersionError,
-                        UnsupportedRootElementError, UnsupportedVersionError)
+                        UnsupportedRootElementError, UnsupportedVersionError,
+                        map_file)
+
+PACKAGE = b"""<stix:STIX_Package xmlns:stix="http://stix.mitre.org/stix-1"
+    version="1.2" id="example:Package-%d"></stix:STIX_Package>
+"""
 
 
 class ParserTests(unittest.TestCase):
@@ -73,5 +86,183 @@ class ParserTests(unittest.TestCase):
         self.assertEqual("example:Package-1", package.id_)
 
 
+class MappedInputTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "packages.xml")
+
+        with open(self.path, "wb") as f:
+            f.write(PACKAGE % 1)
+            self.offset = f.tell()
+            f.write(PACKAGE % 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_use_mmap(self):
+        path = os.path.join(self.directory, "package.xml")
+
+        with open(path, "wb") as f:
+            f.write(PACKAGE % 1)
+
+        package = EntityParser().parse_xml(path, use_mmap=True)
+        self.assertEqual("example:Package-1", package.id_)
+
+    def test_mmap(self):
+        with contextlib.closing(map_file(self.path)) as buf:
+            view = memoryview(buf)
+
+            try:
+                first = EntityParser().parse_xml(view[:self.offset])
+                second = EntityParser().parse_xml(view[self.offset:])
+            finally:
+                view.release()
+
+        self.assertEqual("example:Package-1", first.id_)
+        self.assertEqual("example:Package-2", second.id_)
+
+    def test_mmap_checks(self):
+        with contextlib.closing(map_file(self.path)) as buf:
+            view = memoryview(buf)
+
+            try:
+                obj = EntityParser().parse_xml_to_obj(view[self.offset:])
+            finally:
+                view.release()
+
+        self.assertEqual("example:Package-2", obj.id)
+
+    def test_feed_buffer(self):
+        # Older lxml versions are fed buffers in chunks. No memoryview of a
+        # map may outlive parsing, or the map could not be closed.
+        path = os.path.join(self.directory, "package.xml")
+
+        with open(path, "wb") as f:
+            f.write(PACKAGE % 1)
+
+        with contextlib.closing(map_file(path)) as buf:
+            tree = parser._feed_buffer(buf, chunk_size=7)
+
+        self.assertEqual("example:Package-1", tree.getroot().get("id"))
+
+        with contextlib.closing(map_file(self.path)) as buf:
+            view = memoryview(buf)
+
+            try:
+                tree = parser._feed_buffer(view[self.offset:], chunk_size=7)
+            finally:
+                view.release()
+
+        self.assertEqual("example:Package-2", tree.getroot().get("id"))
+
+
+OPENIOC_PACKAGE = b"""<stix:STIX_Package
+    xmlns:stix="http://stix.mitre.org/stix-1"
+    xmlns:indicator="http://stix.mitre.org/Indicator-2"
+    xmlns:stix-openioc="http://stix.mitre.org/extensions/TestMechanism#OpenIOC2010-1"
+    xmlns:ioc="http://schemas.mandiant.com/2010/ioc"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    version="1.2" id="example:Package-1">
+  <stix:Indicators>
+    <stix:Indicator xsi:type="indicator:IndicatorType" id="example:indicator-1">
+      <indicator:Title>IOC</indicator:Title>
+      <indicator:Test_Mechanisms>
+        <indicator:Test_Mechanism xsi:type="stix-openioc:OpenIOC2010TestMechanismType" id="example:tm-1">
+          <stix-openioc:ioc id="ioc-1">
+            <ioc:definition><ioc:Indicator operator="OR"/></ioc:definition>
+          </stix-openioc:ioc>
+        </indicator:Test_Mechanism>
+      </indicator:Test_Mechanisms>
+    </stix:Indicator>
+    <stix:Indicator xsi:type="indicator:IndicatorType" id="example:indicator-2">
+      <indicator:Title>Other</indicator:Title>
+    </stix:Indicator>
+  </stix:Indicators>
+</stix:STIX_Package>
+"""
+
+
+def _in_thread(func):
+    """Returns the result of calling `func` in a new thread."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class RetainSourceTests(unittest.TestCase):
+
+    def parse(self, **kwargs):
+        return EntityParser().parse_xml(BytesIO(OPENIOC_PACKAGE), **kwargs)
+
+    def ioc(self, package):
+        return package.indicators[0].test_mechanisms[0].ioc
+
+    def test_retain_source(self):
+        package = self.parse()
+        root = self.ioc(package).getroottree().getroot()
+
+        # The whole input document is kept alive by the IOC.
+        self.assertEqual("{http://stix.mitre.org/stix-1}STIX_Package",
+                         root.tag)
+        self.assertFalse(hasattr(package, "__source_lines__"))
+
+    def test_release_source(self):
+        package = self.parse(retain_source=False)
+        ioc = self.ioc(package)
+
+        self.assertEqual(ioc, ioc.getroottree().getroot())
+        self.assertEqual("ioc-1", ioc.get("id"))
+
+        # Only the namespaces of the source document which are used by the
+        # IOC are copied.
+        self.assertEqual(
+            etree.tostring(self.ioc(self.parse()), method="c14n",
+                           exclusive=True),
+            etree.tostring(ioc, method="c14n", exclusive=True)
+        )
+
+    def test_source_lines(self):
+        package = self.parse(retain_source=False)
+        lines = package.__source_lines__
+
+        # libxml2 reports the line on which the start tag ends.
+        self.assertEqual(7, lines["example:Package-1"])
+        self.assertEqual(9, lines["example:indicator-1"])
+        self.assertEqual(12, lines["example:tm-1"])
+        self.assertEqual(19, lines["example:indicator-2"])
+
+        # The line numbers are not part of the model.
+        self.assertEqual(len(list(self.parse().walk())),
+                         len(list(package.walk())))
+
+    def test_retention_restored(self):
+        from stix.utils import parser
+
+        self.parse(retain_source=False)
+        self.assertTrue(parser.is_retaining_source())
+
+    def test_thread_local(self):
+        from stix.utils import parser
+
+        with parser.source_retention(False):
+            self.assertFalse(parser.is_retaining_source())
+            self.assertTrue(_in_thread(parser.is_retaining_source))
+
+
+class PassthroughTests(unittest.TestCase):
+
+    def test_thread_local(self):
+        from stix import bindings
+
+        with bindings.passthrough():
+            self.assertTrue(bindings.is_passthrough())
+            self.assertFalse(_in_thread(bindings.is_passthrough))
+
+        self.assertFalse(bindings.is_passthrough())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,120 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mixbox.vendor.six import BytesIO
+
+from stix import instrumentation
+from stix.utils import EntityParser, schema
+
+# Cut-down schemas. The core schema imports the common one by its URL, which
+# must be resolved to the local copy.
+STIX_CORE = b"""<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+    xmlns:stix="http://stix.mitre.org/stix-1"
+    xmlns:stixCommon="http://stix.mitre.org/common-1"
+    targetNamespace="http://stix.mitre.org/stix-1"
+    elementFormDefault="qualified">
+  <xs:import namespace="http://stix.mitre.org/common-1"
+      schemaLocation="http://stix.mitre.org/XMLSchema/common/1.2/stix_common.xsd"/>
+  <xs:element name="STIX_Package">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:any processContents="skip" minOccurs="0" maxOccurs="unbounded"/>
+      </xs:sequence>
+      <xs:attribute name="id" type="stixCommon:IDType" use="required"/>
+      <xs:anyAttribute processContents="skip"/>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+STIX_COMMON = b"""<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+    targetNamespace="http://stix.mitre.org/common-1">
+  <xs:simpleType name="IDType">
+    <xs:restriction base="xs:string">
+      <xs:pattern value="[^:]+:.+"/>
+    </xs:restriction>
+  </xs:simpleType>
+</xs:schema>
+"""
+
+PACKAGE = b"""<stix:STIX_Package xmlns:stix="http://stix.mitre.org/stix-1"
+    version="1.2" id="%s"></stix:STIX_Package>
+"""
+
+
+class SchemaTests(unittest.TestCase):
+
+    def setUp(self):
+        self.schema_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        schema._schemas.pop(self.schema_dir, None)
+        shutil.rmtree(self.schema_dir)
+
+    def write(self, path, data):
+        path = os.path.join(self.schema_dir, path)
+
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def write_published(self):
+        self.write("core/1.2/stix_core.xsd", STIX_CORE)
+        self.write("common/1.2/stix_common.xsd", STIX_COMMON)
+
+    def parse(self, id_, **kwargs):
+        return EntityParser().parse_xml(BytesIO(PACKAGE % id_),
+                                        schema_dir=self.schema_dir,
+                                        **kwargs)
+
+    def test_valid(self):
+        self.write_published()
+        package = self.parse(b"example:Package-1", validate=True)
+        self.assertEqual("example:Package-1", package.id_)
+
+    def test_invalid(self):
+        self.write_published()
+
+        with self.assertRaises(schema.ValidationError) as cm:
+            self.parse(b"Package-1", validate=True)
+
+        self.assertEqual(1, len(cm.exception.errors))
+        self.assertEqual(2, cm.exception.errors[0].line)
+
+        # Validation is opt-in.
+        package = self.parse(b"Package-1")
+        self.assertEqual("Package-1", package.id_)
+
+    def test_flat_layout(self):
+        self.write("stix_core.xsd", STIX_CORE)
+        self.write("schemas/stix_common.xsd", STIX_COMMON)
+
+        with self.assertRaises(schema.ValidationError):
+            self.parse(b"Package-1", validate=True)
+
+    def test_cached(self):
+        self.write_published()
+        compiled = schema.get_schema(self.schema_dir)
+        self.assertTrue(compiled is schema.get_schema(self.schema_dir + "/"))
+
+        with instrumentation.collect() as collector:
+            self.parse(b"example:Package-1", validate=True)
+
+        self.assertEqual(1, collector.timings[("parse_xml.validate", ())][0])
+
+    def test_no_schemas(self):
+        self.assertRaises(ValueError, schema.get_schema, self.schema_dir)
+        self.assertRaises(ValueError, EntityParser().parse_xml,
+                          BytesIO(PACKAGE % b"example:Package-1"),
+                          validate=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
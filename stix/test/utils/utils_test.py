@@ -2,6 +2,8 @@
 # See LICENSE.txt for complete terms.
 
 # stdlib
+import sys
+import types
 import unittest
 
 # internal
@@ -17,3 +19,16 @@ class UtilsTests(unittest.TestCase):
 
         # Make sure that strings are not sequences.
         self.assertEqual(False, utils.is_sequence("abc"))
+
+    def test_lazy_attributes(self):
+        name = "stix.test.utils._lazy_module"
+        sys.modules[name] = types.ModuleType(name)
+        self.addCleanup(sys.modules.pop, name)
+
+        utils.lazy_attributes(name, {"dumps": "json.dumps"})
+        module = sys.modules[name]
+
+        import json
+        self.assertTrue(module.dumps is json.dumps)
+        self.assertRaises(AttributeError, getattr, module, "loads")
+
@@ -0,0 +1,95 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+
+import unittest
+
+from stix import testing, validate
+from stix.common import vocabs
+from stix.common.kill_chains import KillChainPhaseReference
+from stix.core import STIXPackage
+from stix.indicator import Indicator
+from stix.indicator.sightings import Sighting
+from stix.ttp import TTP
+
+
+class CheckTests(unittest.TestCase):
+
+    def setUp(self):
+        self.package = STIXPackage()
+        self.indicator = Indicator(title="Test")
+        self.package.add_indicator(self.indicator)
+
+    def findings(self):
+        return [(f.level, f.rule, f.id) for f in validate.check(self.package)]
+
+    def test_valid(self):
+        package = testing.generate(n_indicators=10, n_ttps=3, seed=1)
+        self.assertEqual([], validate.check(package))
+        self.assertEqual([], self.findings())
+
+    def test_vocab(self):
+        vocab = vocabs.VocabString("Not A Term")
+        vocab.xsi_type = vocabs.IndicatorType._XSI_TYPE
+        self.indicator.indicator_types.append(vocab)
+
+        # Vocabularies without an xsi:type are open.
+        self.indicator.indicator_types.append(vocabs.VocabString("Open"))
+
+        findings = validate.check(self.package)
+        self.assertEqual(1, len(findings))
+        self.assertEqual("vocab", findings[0].rule)
+        self.assertEqual(self.indicator.id_, findings[0].id)
+        self.assertTrue(findings[0].entity is vocab)
+
+    def test_required(self):
+        ttp = TTP()
+        ttp.kill_chain_phases.append(KillChainPhaseReference(name="Recon"))
+        self.package.add_ttp(ttp)
+        self.assertEqual([(validate.ERROR, "required", ttp.id_)],
+                         self.findings())
+
+    def test_version(self):
+        self.indicator._fields[Indicator.version] = "9.9"
+        self.assertEqual([(validate.ERROR, "version", self.indicator.id_)],
+                         self.findings())
+
+    def test_timestamps(self):
+        self.indicator.timestamp = None
+        sighting = Sighting(timestamp="2017-01-01T00:00:00Z")
+        sighting._fields[Sighting.timestamp_precision] = "fortnight"
+        self.indicator.sightings.append(sighting)
+
+        expected = [
+            (validate.WARNING, "timestamp", self.indicator.id_),
+            (validate.ERROR, "precision", self.indicator.id_),
+        ]
+        self.assertEqual(expected, self.findings())
+
+    def test_idrefs(self):
+        ttp = TTP()
+        self.package.add_ttp(ttp)
+        self.indicator.add_indicated_ttp(TTP(idref=ttp.id_))
+        self.assertEqual([], self.findings())
+
+        self.indicator.add_indicated_ttp(TTP(idref="example:ttp-missing"))
+        self.assertEqual([(validate.WARNING, "idref", self.indicator.id_)],
+                         self.findings())
+
+    def test_duplicate_ids(self):
+        copy = Indicator(id_=self.indicator.id_,
+                         timestamp=self.indicator.timestamp)
+        self.package.add_indicator(copy)
+
+        # Versions of the same object have different timestamps.
+        version = Indicator(id_=self.indicator.id_,
+                            timestamp="2001-01-01T00:00:00Z")
+        self.package.add_indicator(version)
+
+        findings = validate.check(self.package)
+        self.assertEqual(1, len(findings))
+        self.assertEqual("duplicate-id", findings[0].rule)
+        self.assertTrue(findings[0].entity is copy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,497 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Synthetic STIX content for load and soak testing.
+
+:func:`generate` builds a deterministic STIX package of any size with the
+python-stix API. :func:`write_xml` and :func:`write_json` write the same
+package to a file one component at a time, so outputs much larger than
+memory can be produced.
+
+Example:
+    >>> package = generate(n_indicators=1000, n_ttps=50, seed=1)
+
+    >>> with io.open("corpus.xml", "w", encoding="utf-8") as f:
+    ...     write_xml(f, n_indicators=10 ** 7, n_ttps=10 ** 5)
+
+Packages contain Indicators, TTPs, Exploit Targets and Incidents:
+
+* Indicators have an indicator type, a confidence and one Observable (an
+  IPv4 address, domain name, URL or file hash), and indicate TTPs.
+* TTPs have an intended effect and target Exploit Targets.
+* Exploit Targets have a Vulnerability with a CVE id.
+* Incidents have a category and status, and relate to Indicators and
+  leverage TTPs.
+
+All relationships are by reference. Components and the STIX Header may
+have a handling marking, chosen according to `marking_mix`.
+
+"""
+
+# stdlib
+import datetime
+import json
+import random
+import sys
+
+# external
+import dateutil.tz
+from cybox.common import Hash
+from cybox.core import Object, Observable
+from cybox.objects.address_object import Address
+from cybox.objects.domain_name_object import DomainName
+from cybox.objects.file_object import File
+from cybox.objects.uri_object import URI
+from mixbox import binding_utils
+from mixbox.entities import NamespaceCollector
+from mixbox.vendor.six import text_type
+
+# internal
+from stix.common import Confidence, Statement, vocabs
+from stix.common.related import RelatedIndicator
+from stix.core import STIXHeader, STIXPackage
+from stix.data_marking import Marking, MarkingSpecification
+from stix.exploit_target import ExploitTarget
+from stix.exploit_target.vulnerability import Vulnerability
+from stix.extensions.marking.simple_marking import SimpleMarkingStructure
+from stix.extensions.marking.terms_of_use_marking import (
+    TermsOfUseMarkingStructure
+)
+from stix.extensions.marking.tlp import TLPMarkingStructure
+from stix.incident import Incident
+from stix.indicator import Indicator
+from stix.ttp import TTP
+
+#: The marking kinds which may be used in a `marking_mix`.
+MARKING_KINDS = ("tlp", "statement", "terms_of_use")
+
+#: The default `marking_mix`: half of the components have a TLP marking,
+#: and a tenth each have a simple statement or terms of use marking.
+DEFAULT_MARKING_MIX = {"tlp": 0.5, "statement": 0.1, "terms_of_use": 0.1}
+
+# Every component timestamp is an offset from this.
+_EPOCH = datetime.datetime(2017, 1, 1, tzinfo=dateutil.tz.tzutc())
+_TLP_COLORS = ("WHITE", "GREEN", "AMBER", "RED")
+_OBSERVABLE_KINDS = ("address", "domain", "url", "file")
+_TLDS = ("com", "net", "org", "info")
+
+# The package properties holding each kind of component, in document order.
+_SECTIONS = ("indicators", "ttps", "exploit_targets", "incidents")
+
+
+def _terms(vocab):
+    return sorted(vocab._ALLOWED_VALUES)
+
+
+class _Generator(object):
+    """Creates the components of a synthetic package in document order."""
+
+    def __init__(self, n_indicators=100, n_ttps=10, n_exploit_targets=None,
+                 n_incidents=None, relationship_density=1.0,
+                 marking_mix=None, seed=0):
+        if n_exploit_targets is None:
+            n_exploit_targets = n_ttps // 2
+
+        if n_incidents is None:
+            n_incidents = n_indicators // 10
+
+        if marking_mix is None:
+            marking_mix = DEFAULT_MARKING_MIX
+
+        for kind in marking_mix:
+            if kind not in MARKING_KINDS:
+                error = "Unknown marking kind '{0}'. Expected one of {1}."
+                raise ValueError(error.format(kind, MARKING_KINDS))
+
+        if sum(marking_mix.values()) > 1:
+            raise ValueError("The marking_mix weights add up to more than 1")
+
+        self.counts = {
+            "indicators": n_indicators,
+            "ttps": n_ttps,
+            "exploit_targets": n_exploit_targets,
+            "incidents": n_incidents,
+        }
+        self.relationship_density = relationship_density
+        self.marking_mix = sorted(marking_mix.items())
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def id_(self, section, index):
+        return "example:%s-%08d" % (section.rstrip("s"), index)
+
+    def timestamp(self, index):
+        return _EPOCH + datetime.timedelta(seconds=index)
+
+    def _relationships(self, section):
+        """Returns the ids of a random number of components in `section`,
+        averaging :attr:`relationship_density`.
+
+        """
+        count = self.counts[section]
+
+        if not count:
+            return []
+
+        number = int(self.relationship_density)
+
+        if self.rng.random() < self.relationship_density - number:
+            number += 1
+
+        return [
+            self.id_(section, self.rng.randrange(count))
+            for _ in range(number)
+        ]
+
+    def marking(self, kind=None):
+        """Returns a Marking of `kind`, or of a kind chosen according to the
+        marking mix (possibly ``None``).
+
+        """
+        if kind is None:
+            choice = self.rng.random()
+
+            for kind, weight in self.marking_mix:
+                if choice < weight:
+                    break
+
+                choice -= weight
+            else:
+                return None
+
+        if kind == "tlp":
+            color = self.rng.choice(_TLP_COLORS)
+            structure = TLPMarkingStructure(color=color)
+        elif kind == "statement":
+            structure = SimpleMarkingStructure(
+                statement="Synthetic test content %d" % self.rng.randrange(10)
+            )
+        else:
+            structure = TermsOfUseMarkingStructure(
+                terms_of_use="For testing only."
+            )
+
+        specification = MarkingSpecification()
+        specification.controlled_structure = \
+            "../../../descendant-or-self::node()"
+        specification.marking_structures.append(structure)
+
+        marking = Marking()
+        marking.add_marking(specification)
+        return marking
+
+    def observable(self, index, kind=None):
+        rng = self.rng
+        kind = kind or rng.choice(_OBSERVABLE_KINDS)
+        domain = "host%d.example.%s" % (rng.randrange(10 ** 6),
+                                         rng.choice(_TLDS))
+
+        if kind == "address":
+            properties = Address(
+                "%d.%d.%d.%d" % tuple(rng.randint(1, 254) for _ in range(4)),
+                category=Address.CAT_IPV4
+            )
+        elif kind == "domain":
+            properties = DomainName()
+            properties.value = domain
+            properties.type_ = "FQDN"
+        elif kind == "url":
+            properties = URI("http://%s/%d" % (domain, rng.randrange(1000)),
+                             type_=URI.TYPE_URL)
+        else:
+            properties = File()
+            properties.add_hash(Hash("%032x" % rng.getrandbits(128),
+                                     type_=Hash.TYPE_MD5))
+
+        obj = Object(properties, id_=self.id_("objects", index))
+        return Observable(obj, id_=self.id_("observables", index))
+
+    def indicator(self, index, marking=None, observable=None):
+        indicator = Indicator(id_=self.id_("indicators", index),
+                              timestamp=self.timestamp(index),
+                              title="Synthetic indicator %d" % index)
+        indicator.add_indicator_type(
+            self.rng.choice(_terms(vocabs.IndicatorType))
+        )
+        indicator.confidence = Confidence(
+            self.rng.choice(_terms(vocabs.HighMediumLow)),
+            timestamp=indicator.timestamp
+        )
+        indicator.add_observable(self.observable(index, observable))
+        indicator.handling = self.marking(marking)
+
+        for idref in self._relationships("ttps"):
+            indicator.add_indicated_ttp(TTP(idref=idref))
+
+        return indicator
+
+    def ttp(self, index):
+        ttp = TTP(id_=self.id_("ttps", index),
+                  timestamp=self.timestamp(index),
+                  title="Synthetic TTP %d" % index)
+        ttp.add_intended_effect(Statement(
+            self.rng.choice(_terms(vocabs.IntendedEffect)),
+            timestamp=ttp.timestamp
+        ))
+        ttp.handling = self.marking()
+
+        for idref in self._relationships("exploit_targets"):
+            ttp.add_exploit_target(ExploitTarget(idref=idref))
+
+        return ttp
+
+    def exploit_target(self, index):
+        et = ExploitTarget(id_=self.id_("exploit_targets", index),
+                           timestamp=self.timestamp(index),
+                           title="Synthetic exploit target %d" % index)
+
+        vulnerability = Vulnerability()
+        vulnerability.cve_id = "CVE-%d-%04d" % (
+            2000 + self.rng.randrange(18), self.rng.randrange(10000)
+        )
+        et.add_vulnerability(vulnerability)
+        et.handling = self.marking()
+        return et
+
+    def incident(self, index):
+        incident = Incident(id_=self.id_("incidents", index),
+                            timestamp=self.timestamp(index),
+                            title="Synthetic incident %d" % index)
+        incident.add_category(self.rng.choice(_terms(vocabs.IncidentCategory)))
+        incident.status = self.rng.choice(_terms(vocabs.IncidentStatus))
+        incident.handling = self.marking()
+
+        for idref in self._relationships("indicators"):
+            incident.related_indicators.append(
+                RelatedIndicator(Indicator(idref=idref))
+            )
+
+        for idref in self._relationships("ttps"):
+            incident.add_leveraged_ttps(TTP(idref=idref))
+
+        return incident
+
+    def header(self):
+        handling = self.marking()
+
+        if handling is None:
+            return None
+
+        return STIXHeader(handling=handling)
+
+    def components(self, section):
+        """Yields the components of `section`."""
+        create = {
+            "indicators": self.indicator,
+            "ttps": self.ttp,
+            "exploit_targets": self.exploit_target,
+            "incidents": self.incident,
+        }[section]
+
+        for index in range(self.counts[section]):
+            yield create(index)
+
+    def package(self):
+        return STIXPackage(id_="example:package-%d" % self.seed)
+
+    def prototype(self):
+        """Returns a small package using every class and extension the
+        generated components may use, for collecting XML namespaces.
+
+        """
+        package = self.package()
+        package.stix_header = self.header()
+
+        for i, kind in enumerate(_OBSERVABLE_KINDS):
+            marking = MARKING_KINDS[i % len(MARKING_KINDS)]
+            package.add(self.indicator(i, marking=marking, observable=kind))
+
+        package.add(self.ttp(0))
+        package.add(self.exploit_target(0))
+        package.add(self.incident(0))
+        return package
+
+
+def generate(n_indicators=100, n_ttps=10, n_exploit_targets=None,
+             n_incidents=None, relationship_density=1.0, marking_mix=None,
+             seed=0):
+    """Returns a synthetic :class:`.STIXPackage`.
+
+    The same arguments always produce the same package.
+
+    Args:
+        n_indicators: The number of Indicators.
+        n_ttps: The number of TTPs.
+        n_exploit_targets: The number of Exploit Targets. Defaults to half
+            of `n_ttps`.
+        n_incidents: The number of Incidents. Defaults to a tenth of
+            `n_indicators`.
+        relationship_density: The average number of relationships each
+            component has to each kind of component it may relate to (e.g.,
+            an Indicator to TTPs).
+        marking_mix: A dictionary which maps the kinds in
+            :data:`MARKING_KINDS` to the fraction of components (and
+            headers) with a marking of that kind. The rest are not marked.
+            Defaults to :data:`DEFAULT_MARKING_MIX`.
+        seed: The random seed.
+
+    Raises:
+        ValueError: If `marking_mix` is not valid.
+
+    """
+    generator = _Generator(
+        n_indicators, n_ttps, n_exploit_targets, n_incidents,
+        relationship_density, marking_mix, seed
+    )
+
+    package = generator.package()
+    package.stix_header = generator.header()
+
+    for section in _SECTIONS:
+        for component in generator.components(section):
+            package.add(component)
+
+    return package
+
+
+def write_xml(f, **kwargs):
+    """Writes the package :func:`generate` would return for `kwargs` to the
+    file-like object `f` as XML, one component at a time.
+
+    Args:
+        f: A file-like object which accepts text. Use
+            ``io.open(path, "w", encoding="utf-8")`` for files.
+        **kwargs: The arguments of :func:`generate`.
+
+    Returns:
+        The number of components written.
+
+    """
+    generator = _Generator(**kwargs)
+    package = generator.package()
+
+    # The namespaces of every generated component are declared on the root
+    # element, so they are collected up front.
+    ns_info = NamespaceCollector()
+    generator.prototype().to_obj(ns_info=ns_info)
+    ns_info.finalize()
+    nsmap = ns_info.binding_namespaces
+    prefix = nsmap[STIXPackage._namespace]
+
+    # The prototype used the random generator.
+    generator.rng.seed(generator.seed)
+
+    count = 0
+
+    with binding_utils.save_encoding("utf-8"):
+        f.write(u'<%s:STIX_Package\n\t%s\n\tid="%s" version="%s">\n' % (
+            prefix, ns_info.get_xmlns_string("\n\t").strip(), package.id_,
+            package.version
+        ))
+        header = generator.header()
+
+        if header is not None:
+            header.to_obj().export(
+                f.write, 1, nsmap, STIXPackage._namespace, name_="STIX_Header"
+            )
+
+        for section in _SECTIONS:
+            if not generator.counts[section]:
+                continue
+
+            field = getattr(STIXPackage, section)
+            f.write(u"    <%s:%s>\n" % (prefix, field.name))
+
+            for component in generator.components(section):
+                # Serialize each component the way its package container
+                # would.
+                container = field.type_()
+                container.append(component)
+                obj = container.to_obj()
+                obj.exportChildren(
+                    f.write, 2, nsmap, _container_namespace(obj)
+                )
+                count += 1
+
+            f.write(u"    </%s:%s>\n" % (prefix, field.name))
+
+        f.write(u"</%s:STIX_Package>\n" % prefix)
+
+    return count
+
+
+def _container_namespace(obj):
+    """Returns the namespace the children of the container binding `obj`
+    are exported in.
+
+    """
+    return sys.modules[type(obj).__module__].XML_NS
+
+
+def write_json(f, **kwargs):
+    """Writes the package :func:`generate` would return for `kwargs` to the
+    file-like object `f` as JSON (see :meth:`.STIXPackage.to_dict`), one
+    component at a time.
+
+    Args:
+        f: A file-like object which accepts text.
+        **kwargs: The arguments of :func:`generate`.
+
+    Returns:
+        The number of components written.
+
+    """
+    generator = _Generator(**kwargs)
+    package = generator.package()
+    package.stix_header = generator.header()
+
+    # Write the package properties, with the component sections left open.
+    head = package.to_dict()
+    f.write(json.dumps(head, sort_keys=True)[:-1])
+    count = 0
+
+    for section in _SECTIONS:
+        components = generator.components(section)
+        first = next(components, None)
+
+        if first is None:
+            continue
+
+        field = getattr(STIXPackage, section)
+        container = field.type_()
+        container.append(first)
+        section_dict = container.to_dict()
+        f.write(u', "%s": ' % field.key_name)
+
+        # Some sections (e.g., TTPs) are dictionaries with a list of
+        # components, and some are just the list.
+        if isinstance(section_dict, dict):
+            key = container._multiple_field().key_name
+            items = section_dict.pop(key)
+            f.write(u"{")
+
+            for name, value in sorted(section_dict.items()):
+                f.write(u'"%s": %s, ' % (name, json.dumps(value)))
+
+            f.write(u'"%s": [' % key)
+        else:
+            items = section_dict
+            f.write(u"[")
+
+        f.write(text_type(json.dumps(items[0], sort_keys=True)))
+        count += 1
+
+        for component in components:
+            f.write(u", ")
+            f.write(text_type(json.dumps(component.to_dict(), sort_keys=True)))
+            count += 1
+
+        f.write(u"]}" if isinstance(section_dict, dict) else u"]")
+
+    f.write(u"}")
+    return count
+
+
+__all__ = [
+    "DEFAULT_MARKING_MIX", "MARKING_KINDS", "generate", "write_json",
+    "write_xml",
+]
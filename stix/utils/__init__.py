@@ -3,11 +3,15 @@
 
 import contextlib
 import functools
+import importlib
 import keyword
+import sys
+import types
 import warnings
 
 import lxml.etree
 
+from mixbox import fields
 from mixbox.entities import Entity, EntityList
 import mixbox.xml
 from mixbox.vendor.six import iteritems, string_types
@@ -104,6 +108,12 @@ def strip_cdata(text):
     if not is_cdata(text):
         return text
 
+    # A single CDATA block holds its content verbatim, so it can be sliced
+    # out without a round trip through the XML parser.
+    if (text.startswith(CDATA_START) and
+            text.find(CDATA_END) == len(text) - len(CDATA_END)):
+        return text[len(CDATA_START):-len(CDATA_END)]
+
     xml = "<e>{0}</e>".format(text)
     node = lxml.etree.fromstring(xml)
     return node.text
@@ -132,6 +142,18 @@ def cdata(text):
     return escaped
 
 
+class CDATAField(fields.CDATAField):
+    """A :class:`mixbox.fields.CDATAField` which uses the :func:`strip_cdata`
+    and :func:`cdata` functions found in this module.
+
+    """
+    def _clean(self, value):
+        return strip_cdata(value)
+
+    def binding_value(self, value):
+        return cdata(value)
+
+
 def is_stix(entity):
     """Returns true if `entity` is an instance of :class:`.Entity`."""
     return isinstance(entity, stix.Entity)
@@ -376,6 +398,56 @@ def remove_entries(d, keys):
         d.pop(key, None)
 
 
+def lazy_attributes(module_name, attributes):
+    """Makes the objects named in `attributes` attributes of the module
+    `module_name`, which are only imported when they are first accessed.
+
+    This keeps names importable from a module (e.g.,
+    ``from stix.core import Campaign``) without importing them, and their
+    dependencies, when the module itself is imported.
+
+    Args:
+        module_name: The name of the module, usually ``__name__``.
+        attributes: A dictionary which maps attribute names to the dotted
+            path of the object, such as ``"stix.campaign.Campaign"``.
+
+    """
+    module = sys.modules[module_name]
+
+    def load(name):
+        try:
+            path = attributes[name]
+        except KeyError:
+            error = "module '%s' has no attribute '%s'" % (module_name, name)
+            raise AttributeError(error)
+
+        modname, attr = path.rsplit(".", 1)
+        value = getattr(importlib.import_module(modname), attr)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    if sys.version_info >= (3, 7):
+        module.__getattr__ = load
+        return
+
+    class LazyModule(types.ModuleType):
+        def __getattr__(self, name):
+            return load(name)
+
+    try:
+        module.__class__ = LazyModule
+        return
+    except TypeError:
+        pass  # Python < 3.5
+
+    # Replace the module with a copy of it. The original is kept alive, as
+    # its functions use its dictionary as their globals.
+    lazy = LazyModule(module_name)
+    lazy.__dict__.update(module.__dict__)
+    lazy._lazy_original_module = module
+    sys.modules[module_name] = lazy
+
+
 # Namespace flattening
 from .nsparser import *  # noqa
 from .dates import *  # noqa
@@ -0,0 +1,375 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""A content-addressed, on-disk cache of parsed STIX documents.
+
+Parsing a large STIX document is expensive. :class:`DiskCache` stores the
+result of parsing a document under a hash of the document bytes, so parsing
+the same document again (e.g., in a later stage of a pipeline or after a
+restart) loads the stored objects instead of parsing the XML.
+
+Example:
+    >>> cache = DiskCache("/var/cache/stix", max_size=2 ** 30)
+    >>> package = STIXPackage.from_xml("feed.xml", cache=cache)
+
+Entries are stamped with the python-stix, python-cybox, mixbox and Python
+versions which created them, and are discarded when read by any other
+versions.
+
+"""
+
+# stdlib
+import contextlib
+import errno
+import gc
+import hashlib
+import importlib
+import os
+import pickle
+import sys
+import tempfile
+
+# external
+from lxml import etree
+import mixbox
+from mixbox import entities, fields
+from mixbox.vendor import six
+
+import cybox
+
+# internal
+import stix
+
+#: The default maximum size of a :class:`DiskCache`, in bytes.
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+_SUFFIX = ".pickle"
+
+# Errors raised when loading a truncated or corrupt entry, or one which
+# refers to classes which no longer exist.
+_LOAD_ERRORS = (pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, ValueError, etree.XMLSyntaxError)
+
+# Errors raised when storing an object which cannot be pickled, or when the
+# cache directory cannot be written to.
+_STORE_ERRORS = (pickle.PicklingError, TypeError, EnvironmentError)
+
+# os.rename() does not replace existing files on Windows.
+_replace = getattr(os, "replace", os.rename)
+
+
+def _stamp():
+    """Returns the version stamp written at the start of each entry."""
+    versions = (
+        stix.__version__,
+        cybox.__version__,
+        getattr(mixbox, "__version__", ""),
+        "%d.%d" % sys.version_info[:2],
+        str(_PROTOCOL),
+    )
+    return six.b("stix-cache %s\n" % " ".join(versions))
+
+
+class _Pickler(pickle.Pickler):
+    """Pickles entities along with references to their TypedFields.
+
+    Entities store their values in a dictionary keyed by the TypedField
+    class attributes, which must be the same objects when unpickled. They
+    are written as ``(module, class, attribute)`` references instead.
+
+    Passthrough lxml elements are written as serialized XML.
+
+    """
+    def __init__(self, f):
+        pickle.Pickler.__init__(self, f, _PROTOCOL)
+        self._field_refs = {}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, entities.Entity):
+            cls = type(obj)
+
+            for attr, field in cls.typed_fields_with_attrnames():
+                if id(field) not in self._field_refs:
+                    ref = ("field", cls.__module__, cls.__name__, attr)
+                    self._field_refs[id(field)] = ref
+
+            return None
+
+        if isinstance(obj, fields.TypedField):
+            return self._field_refs[id(obj)]
+
+        if isinstance(obj, etree._Element):
+            return ("xml", etree.tostring(obj))
+
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, f):
+        pickle.Unpickler.__init__(self, f)
+        self._fields = {}
+
+    def persistent_load(self, pid):
+        if pid[0] == "xml":
+            return etree.fromstring(pid[1])
+
+        try:
+            return self._fields[pid]
+        except KeyError:
+            _, module, name, attr = pid
+            cls = getattr(importlib.import_module(module), name)
+            field = self._fields[pid] = getattr(cls, attr)
+            return field
+
+
+@contextlib.contextmanager
+def _gc_disabled():
+    """Loading creates a great many objects and no garbage, so collecting
+    while loading is wasted effort.
+
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read(xml_file):
+    """Returns the bytes of `xml_file`, which is a filename, a file-like
+    object, or a buffer such as an ``mmap``.
+
+    """
+    if isinstance(xml_file, six.string_types):
+        with open(xml_file, "rb") as f:
+            return f.read()
+
+    # memoryview was added in Python 2.7.
+    if isinstance(xml_file, getattr(six.moves.builtins, "memoryview", ())):
+        return xml_file.tobytes()
+
+    data = xml_file.read()
+
+    if isinstance(data, six.text_type):
+        data = data.encode("utf-8")
+
+    return data
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as ex:
+        if ex.errno != errno.ENOENT:
+            raise
+
+
+class DiskCache(object):
+    """A size-bounded cache of parsed STIX documents, stored as files in
+    `directory`.
+
+    Entries are keyed by a SHA-256 hash of the document bytes and the
+    parsing options. When the cache grows larger than `max_size` bytes, the
+    least recently used entries are removed.
+
+    The cache may be shared by several processes. Entries are written to a
+    temporary file which is then renamed into place, so readers never see a
+    partially written entry. Entries which cannot be loaded (e.g., because
+    they are corrupt) are removed and treated as missing.
+
+    Warning:
+        Entries are pickles, and loading a pickle can execute arbitrary
+        code. `directory` must not be writable by untrusted users.
+
+    Args:
+        directory: The directory to store entries in. It is created if it
+            does not exist.
+        max_size: The maximum total size of the entries, in bytes.
+
+    Attributes:
+        hits: The number of documents loaded from the cache.
+        misses: The number of documents which were parsed.
+
+    """
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            os.makedirs(directory)
+        except OSError as ex:
+            if ex.errno != errno.EEXIST:
+                raise
+
+    def key(self, data, **options):
+        """Returns the cache key of the document bytes `data` parsed with
+        the keyword arguments `options`.
+
+        """
+        digest = hashlib.sha256(data)
+
+        for name in sorted(options):
+            digest.update(six.b("\0%s=%r" % (name, options[name])))
+
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(_SUFFIX):
+                yield os.path.join(self.directory, name)
+
+    def __len__(self):
+        return sum(1 for _ in self._entries())
+
+    @property
+    def size(self):
+        """The total size of the entries, in bytes."""
+        total = 0
+
+        for path in self._entries():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass  # Removed by another process.
+
+        return total
+
+    def get(self, key):
+        """Returns the object stored under `key`, or ``None`` if there is no
+        current entry for it.
+
+        Entries written by other versions of python-stix, python-cybox,
+        mixbox or Python, and entries which cannot be loaded, are removed.
+
+        """
+        path = self._path(key)
+
+        try:
+            f = open(path, "rb")
+        except IOError as ex:
+            if ex.errno == errno.ENOENT:
+                return None
+            raise
+
+        with f:
+            if f.readline() != _stamp():
+                stale = True
+            else:
+                stale = False
+
+                try:
+                    with _gc_disabled():
+                        obj = _Unpickler(f).load()
+                except _LOAD_ERRORS:
+                    stale = True
+
+        if stale:
+            _remove(path)
+            return None
+
+        # Entries are evicted by modification time.
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return obj
+
+    def put(self, key, obj):
+        """Stores `obj` under `key`, then evicts the least recently used
+        entries until the cache is no larger than :attr:`max_size`.
+
+        """
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_stamp())
+                _Pickler(f).dump(obj)
+
+            _replace(tmp, self._path(key))
+        except BaseException:
+            _remove(tmp)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache is no
+        larger than :attr:`max_size`.
+
+        """
+        entries = []
+        total = 0
+
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removed by another process.
+
+            entries.append((stat.st_mtime, path, stat.st_size))
+            total += stat.st_size
+
+        entries.sort()
+
+        for _, path, size in entries:
+            if total <= self.max_size:
+                break
+
+            _remove(path)
+            total -= size
+
+    def clear(self):
+        """Removes all entries."""
+        for path in self._entries():
+            _remove(path)
+
+    def parse(self, xml_file, parse, **options):
+        """Returns the object stored for the document `xml_file`, or the
+        result of ``parse(xml_file, **options)`` if there is none, in which
+        case it is stored.
+
+        If the parsed object cannot be stored (e.g., it holds objects which
+        cannot be pickled, or the cache directory is full), it is returned
+        without being cached.
+
+        Args:
+            xml_file: A filename or file-like object. etree elements are not
+                cached and are passed to `parse` directly.
+            parse: A function which parses `xml_file`.
+            **options: Keyword arguments to `parse`. They are part of the
+                cache key.
+
+        """
+        if isinstance(xml_file, (etree._Element, etree._ElementTree)):
+            return parse(xml_file, **options)
+
+        data = _read(xml_file)
+        key = self.key(data, **options)
+        obj = self.get(key)
+
+        if obj is not None:
+            self.hits += 1
+            return obj
+
+        self.misses += 1
+        obj = parse(six.BytesIO(data), **options)
+
+        try:
+            self.put(key, obj)
+        except _STORE_ERRORS:
+            pass
+
+        return obj
+
+
+__all__ = ["DEFAULT_MAX_SIZE", "DiskCache"]
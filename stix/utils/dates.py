@@ -3,17 +3,106 @@
 
 # stdlib
 import datetime
+import itertools
+import re
 
 # external
 import dateutil
 import dateutil.parser
 import dateutil.tz
+from mixbox import fields
+
+#: Number of parsed xs:dateTime/xs:date strings to keep in memory. STIX
+#: documents tend to repeat the same timestamps many times over.
+CACHE_SIZE = 1024
+
+# Regular expressions for the xs:dateTime and xs:date lexical spaces. Values
+# that do not match are handed off to dateutil.
+_DATETIME_RE = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?"
+    r"(Z|[+-]\d{2}:\d{2})?$"
+)
+_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+
+_UTC = dateutil.tz.tzutc()
+
+
+def _memoize(func):
+    """Wraps `func` in a ``functools.lru_cache`` of ``CACHE_SIZE`` entries,
+    if the running Python provides one.
+
+    """
+    try:
+        from functools import lru_cache
+    except ImportError:  # Python 2
+        return func
+
+    return lru_cache(maxsize=CACHE_SIZE)(func)
+
+
+def _parse_tzinfo(value):
+    """Returns a ``tzinfo`` for an xs:dateTime timezone suffix such as
+    ``Z`` or ``-05:00``. The same tzinfo types dateutil would use are
+    returned so results do not depend on which parser handled the value.
+
+    """
+    if value is None:
+        return None
+    elif value == "Z":
+        return _UTC
+
+    offset = int(value[1:3]) * 3600 + int(value[4:6]) * 60
+
+    if value[0] == "-":
+        offset = -offset
+
+    if offset == 0:
+        return _UTC
+
+    return dateutil.tz.tzoffset(None, offset)
+
+
+@_memoize
+def _parse_xs_datetime(value):
+    """Parses the xs:dateTime or xs:date string `value` into a
+    ``datetime.datetime``.
+
+    Returns:
+        ``None`` if `value` is not a strict xs:dateTime or xs:date value (or
+        does not describe a valid point in time), in which case it should be
+        parsed by dateutil instead.
+
+    """
+    match = _DATETIME_RE.match(value)
+
+    if match:
+        year, month, day, hour, minute, second, fraction, tz = match.groups()
+        microsecond = int(fraction[:6].ljust(6, "0")) if fraction else 0
+        args = (int(year), int(month), int(day), int(hour), int(minute),
+                int(second), microsecond)
+        tzinfo = _parse_tzinfo(tz)
+    else:
+        match = _DATE_RE.match(value)
+
+        if not match:
+            return None
+
+        args = tuple(int(x) for x in match.groups())
+        tzinfo = None
+
+    try:
+        return datetime.datetime(*args, tzinfo=tzinfo)
+    except ValueError:  # e.g., 24:00:00 or an out of range day
+        return None
 
 
 def parse_value(value):
     """Attempts to parse `value` into an instance of ``datetime.datetime``. If
     `value` is ``None``, this function will return ``None``.
 
+    Strict xs:dateTime and xs:date strings are parsed directly. Anything else
+    is passed to ``dateutil.parser.parse()``.
+
     Args:
         value: A timestamp. This can be a string or datetime.datetime value.
 
@@ -22,7 +111,13 @@ def parse_value(value):
         return None
     elif isinstance(value, datetime.datetime):
         return value
-    return dateutil.parser.parse(value)
+
+    parsed = _parse_xs_datetime(value)
+
+    if parsed is None:
+        parsed = dateutil.parser.parse(value)
+
+    return parsed
 
 
 def serialize_value(value):
@@ -57,7 +152,7 @@ def parse_date(value):
     elif isinstance(value, datetime.datetime):
         return value.date()
     else:
-        return dateutil.parser.parse(value).date()
+        return parse_value(value).date()
 
 
 def serialize_date(value):
@@ -85,3 +180,195 @@ def serialize_date(value):
 def now():
     """Returns the current UTC ``datetime.datetime`` timestamp."""
     return datetime.datetime.now(tz=dateutil.tz.tzutc())
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=_UTC)
+
+
+def timestamp(value):
+    """Returns the number of seconds between the Unix epoch and `value`.
+
+    Naive ``datetime.datetime`` values are assumed to be UTC, and
+    ``datetime.date`` values are treated as midnight UTC.
+
+    Args:
+        value: A timestamp. This can be a string, datetime.date, or
+            datetime.datetime value.
+
+    Returns:
+        A ``float``, or ``None`` if `value` is ``None``.
+
+    """
+    if value is None:
+        return None
+    elif not isinstance(value, datetime.date):
+        value = parse_value(value)
+    elif not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_UTC)
+
+    return (value - _EPOCH).total_seconds()
+
+
+class DateTimeField(fields.DateTimeField):
+    """A ``mixbox.fields.DateTimeField`` which parses input values with
+    :func:`parse_value`.
+
+    """
+    def _clean(self, value):
+        return parse_value(value)
+
+
+#: Cache of ``class => ((datetime field, precision field), ...)`` used by
+#: :func:`normalize_all`.
+_DATETIME_FIELDS = {}
+
+
+def _datetime_fields(klass):
+    """Returns a tuple of ``(datetime field, precision field)`` pairs for the
+    Entity class `klass`. The precision field is ``None`` if the timestamp
+    does not have one.
+
+    A timestamp's precision is held in a sibling ``precision`` field (e.g.,
+    DateTimeWithPrecision) or a ``<name>_precision`` field (e.g.,
+    ``Sighting.timestamp_precision``).
+
+    """
+    try:
+        return _DATETIME_FIELDS[klass]
+    except KeyError:
+        pass
+
+    typed = dict((f.name, f) for f in klass.typed_fields())
+    pairs = []
+
+    for name, field in typed.items():
+        if not isinstance(field, fields.DateTimeField):
+            continue
+
+        precision = typed.get(name + "_precision") or typed.get("precision")
+        pairs.append((field, precision))
+
+    _DATETIME_FIELDS[klass] = pairs = tuple(pairs)
+    return pairs
+
+
+def _coarsest(first, second):
+    """Returns the coarser of two DateTimeWithPrecision precision values."""
+    from stix.common.datetimewithprecision import DATETIME_PRECISION_VALUES
+
+    if not first:
+        return second
+    elif not second:
+        return first
+
+    return min(first, second, key=DATETIME_PRECISION_VALUES.index)
+
+
+def _truncate(value, precision):
+    """Zeroes out the components of `value` which are finer than
+    `precision`.
+
+    """
+    if precision == "year":
+        return value.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif precision == "month":
+        return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    elif precision == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif precision == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    elif precision == "minute":
+        return value.replace(second=0, microsecond=0)
+
+    return value.replace(microsecond=0)
+
+
+def normalize_all(entity, tz="UTC", precision=None):
+    """Converts every timestamp found under `entity` to the timezone `tz`
+    and, optionally, the precision `precision`. Values are rewritten in
+    place.
+
+    This covers ``DateTimeWithPrecision`` values (e.g., ``Incident.time``
+    fields and ``ValidTime`` windows) as well as plain timestamp fields such
+    as ``Sighting.timestamp`` and ``BaseCoreComponent.timestamp``. Equal
+    timestamps are only converted once and share the resulting
+    ``datetime`` object.
+
+    Note:
+        Values without timezone information are assumed to already be in
+        `tz`. A timestamp is never given a finer precision than it already
+        has: a ``day`` precision value normalized to ``second`` precision
+        stays at ``day`` precision.
+
+    Args:
+        entity: A STIXPackage or any other stix.Entity.
+        tz: A ``datetime.tzinfo`` or timezone name. Default is ``"UTC"``.
+        precision: One of ``year``, ``month``, ``day``, ``hour``, ``minute``
+            or ``second``. If ``None``, existing precisions are kept and only
+            the timezone is changed.
+
+    Returns:
+        The number of timestamp values that were normalized.
+
+    Raises:
+        ValueError: If `tz` or `precision` are not recognized.
+
+    """
+    from stix.common.datetimewithprecision import validate_precision
+    from .walk import iterwalk
+    from . import is_stix
+
+    validate_precision(None, precision)
+
+    if tz in ("UTC", "Z"):
+        tz = _UTC
+    elif not isinstance(tz, datetime.tzinfo):
+        name, tz = tz, dateutil.tz.gettz(tz)
+        if tz is None:
+            raise ValueError("Unknown timezone '{0}'".format(name))
+
+    converted = {}  # (original value, precision) => normalized value
+    count = 0
+
+    entities = itertools.chain((entity,), iterwalk(entity))
+
+    for item in entities:
+        if not is_stix(item):
+            continue
+
+        for field, precision_field in _datetime_fields(type(item)):
+            value = item._fields.get(field)
+
+            if value is None:
+                continue
+
+            current = item._fields.get(precision_field) if precision_field else None
+            effective = _coarsest(current, precision) if precision else current
+            key = (value, effective)
+
+            try:
+                normalized = converted[key]
+            except KeyError:
+                if value.tzinfo is None:
+                    normalized = value.replace(tzinfo=tz)
+                else:
+                    normalized = value.astimezone(tz)
+
+                if precision:
+                    normalized = _truncate(normalized, effective)
+
+                converted[key] = normalized
+
+            # Assign directly to avoid re-running field hooks, which would
+            # raise deprecation warnings for fields like STIXPackage.timestamp.
+            item._fields[field] = normalized
+
+            if precision and precision_field:
+                item._fields[precision_field] = effective
+
+            count += 1
+
+    return count
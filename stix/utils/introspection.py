@@ -0,0 +1,189 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Helpers for finding values in STIX and CybOX object models, shared by
+:mod:`stix.graph`, :mod:`stix.store`, :mod:`stix.indicator.matcher` and
+:mod:`stix.indicator.export`.
+
+"""
+
+# external
+from cybox.common.attribute_groups import PatternFieldGroup
+from cybox.common.properties import BaseProperty
+from mixbox import entities
+from mixbox.vendor.six import string_types, text_type
+
+#: The xsi:type of TLP marking structures.
+TLP_XSI_TYPE = "tlpMarking:TLPMarkingStructureType"
+
+
+class FieldSelector(object):
+    """Finds the TypedFields of entity classes which may hold values of
+    interest, either directly or through the entities they contain.
+
+    Results are cached per class for the lifetime of the selector, so
+    selectors are meant to be created once, at module level.
+
+    Args:
+        classify: A function which is given a class and returns ``True`` if
+            its instances are of interest, ``False`` if neither they nor
+            anything they contain can be, or ``None`` if that depends on the
+            types of its fields.
+
+    """
+    def __init__(self, classify):
+        self.classify = classify
+        self._may_hold = {}
+        self._fields = {}
+        self._list_fields = {}
+
+    def may_hold(self, cls):
+        """Returns ``True`` if instances of `cls` may be or may contain
+        values of interest.
+
+        """
+        try:
+            return self._may_hold[cls]
+        except KeyError:
+            pass
+
+        if not isinstance(cls, type):
+            return False
+
+        found = self.classify(cls)
+
+        if found is None:
+            # Assume that recursive types may hold values while they are
+            # inspected.
+            self._may_hold[cls] = True
+            found = bool(self.fields(cls))
+
+        self._may_hold[cls] = found
+        return found
+
+    def fields(self, cls):
+        """Returns a tuple of ``(TypedField, attribute name)`` pairs for the
+        TypedFields of `cls` which may hold values of interest.
+
+        """
+        try:
+            return self._fields[cls]
+        except KeyError:
+            pass
+
+        # Inspecting the field types below may end up back here.
+        self._fields[cls] = ()
+        fields = []
+
+        for attr, field in cls.typed_fields_with_attrnames():
+            # Factories build subclasses of the field type (e.g., TLP marking
+            # structures), which may add fields of their own.
+            if field._unresolved_factory is not None or \
+                    self.may_hold(field.type_):
+                fields.append((field, attr))
+
+        self._fields[cls] = fields = tuple(fields)
+        return fields
+
+    def list_field(self, cls):
+        """Returns the multiple TypedField of the EntityList class `cls` if
+        it is the only field of `cls` which may hold values of interest.
+        Otherwise, ``None`` is returned.
+
+        """
+        try:
+            return self._list_fields[cls]
+        except KeyError:
+            pass
+
+        inner = None
+
+        if issubclass(cls, entities.EntityList):
+            fields = self.fields(cls)
+
+            if len(fields) == 1 and fields[0][0].multiple:
+                inner = fields[0][0]
+
+        self._list_fields[cls] = inner
+        return inner
+
+
+def is_true(value):
+    """Returns ``True`` if `value` is a true boolean or boolean string."""
+    if isinstance(value, string_types):
+        return value.lower() in ("true", "1")
+
+    return bool(value)
+
+
+def iterproperties(entity, path=""):
+    """Yields ``(path, property)`` tuples for each patternable property found
+    under `entity`. Nested entities (e.g., the Hashes of a File) are
+    descended into.
+
+    """
+    if isinstance(entity, entities.EntityList):
+        for item in entity:
+            for found in iterproperties(item, path):
+                yield found
+        return
+
+    for attr, field in entity.typed_fields_with_attrnames():
+        value = field.__get__(entity)
+
+        if value is None:
+            continue
+
+        key = field.key_name
+        subpath = "%s.%s" % (path, key) if path else key
+        values = value if isinstance(value, list) else [value]
+
+        for item in values:
+            if isinstance(item, PatternFieldGroup):
+                yield (subpath, item)
+            elif isinstance(item, entities.Entity):
+                for found in iterproperties(item, subpath):
+                    yield found
+
+
+def object_atoms(obj):
+    """Yields ``(type, value, condition)`` tuples for the values of the
+    object properties of the CybOX Object `obj`. The type is the property
+    key of the value (see :mod:`stix.indicator.matcher`).
+
+    """
+    properties = obj.properties
+
+    if properties is None:
+        return
+
+    prefix = "%s:" % properties._XSI_TYPE
+
+    for path, prop in iterproperties(properties):
+        if isinstance(prop, BaseProperty):
+            values = prop.values
+        elif prop.value is not None:
+            values = [prop.value]
+        else:
+            values = []
+
+        for value in values:
+            yield (prefix + path, text_type(value), prop.condition)
+
+
+def tlp_color(handling):
+    """Returns the first TLP color found in the Marking `handling`."""
+    if not handling:
+        return None
+
+    for specification in handling:
+        for structure in specification.marking_structures or ():
+            if getattr(structure, "_XSI_TYPE", None) == TLP_XSI_TYPE:
+                return structure.color
+
+    return None
+
+
+__all__ = [
+    "TLP_XSI_TYPE", "FieldSelector", "is_true", "iterproperties",
+    "object_atoms", "tlp_color"
+]
@@ -1,10 +1,23 @@
 # Copyright (c) 2017, The MITRE Corporation. All rights reserved.
 # See LICENSE.txt for complete terms.
 
+# stdlib
+import contextlib
+import copy
+import sys
+import threading
+
+# external
+from lxml import etree
+import mixbox.parser
+import mixbox.xml
+from mixbox.vendor import six
+
+# internal
 import stix
+from stix.bindings import passthrough as _passthrough, is_passthrough
 from stix.xmlconst import TAG_STIX_PACKAGE
 
-import mixbox.parser
 # Import these from mixbox for backward compatibility
 from mixbox.parser import (UnknownVersionError, UnsupportedVersionError,
                            UnsupportedRootElementError)
@@ -12,6 +25,150 @@ from mixbox.parser import (UnknownVersionError, UnsupportedVersionError,
 # Alias for backwards compatibility
 UnsupportedRootElement = UnsupportedRootElementError
 
+# The size of the chunks fed to lxml versions which cannot parse from a
+# buffer directly.
+_CHUNK_SIZE = 1024 * 1024
+
+# Per-thread parsing settings. ``retain_source`` is ``False`` if API objects
+# built during parsing must not keep references to the lxml elements of the
+# input document (see detach()).
+_state = threading.local()
+
+
+@contextlib.contextmanager
+def source_retention(enabled=True):
+    """Sets whether API objects built in the ``with`` block, in the current
+    thread, may keep the lxml elements of the document they were parsed
+    from.
+
+    """
+    previous = is_retaining_source()
+    _state.retain_source = enabled
+
+    try:
+        yield
+    finally:
+        _state.retain_source = previous
+
+
+def is_retaining_source():
+    """Returns ``True`` if API objects built in the current thread may keep
+    the lxml elements of the document they were parsed from.
+
+    """
+    return getattr(_state, "retain_source", True)
+
+
+def detach(node):
+    """Returns the lxml element or tree `node`, which an API object is about
+    to keep, unless source retention is disabled. Then a copy of `node` in a
+    document of its own is returned instead, so that the (possibly much
+    larger) document `node` was parsed from can be freed.
+
+    Extension classes which keep lxml content from their binding objects
+    (e.g., OpenIOC test mechanisms) should pass it through this function in
+    ``from_obj()``.
+
+    """
+    if node is None or is_retaining_source():
+        return node
+
+    if mixbox.xml.is_etree(node):
+        return etree.ElementTree(copy.deepcopy(node.getroot()))
+
+    return copy.deepcopy(node)
+
+
+def _source_lines(root):
+    """Returns a dictionary which maps the ``id`` attributes of the elements
+    of the tree under `root` to their line numbers.
+
+    """
+    return dict(
+        (node.get("id"), node.sourceline)
+        for node in root.xpath("descendant-or-self::*[@id]")
+    )
+
+
+def map_file(path):
+    """Returns a read-only memory map of the file at `path`.
+
+    The map can be passed to :meth:`EntityParser.parse_xml` (or sliced with
+    ``memoryview(map)[start:end]`` to parse a document found at known byte
+    offsets), or used as a file-like object by incremental parsers such as
+    :func:`stix.graph.export.iterparse` after seeking to an offset.
+
+    Pages of a mapped file are read from the operating system page cache,
+    so processes which map the same file share one copy of it.
+
+    """
+    import mmap
+
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _is_buffer(obj):
+    # A memory map can only have been created if mmap was imported.
+    mmap = sys.modules.get("mmap")
+
+    if mmap is not None and isinstance(obj, mmap.mmap):
+        return True
+
+    # memoryview was added in Python 2.7.
+    return isinstance(obj, getattr(six.moves.builtins, "memoryview", ()))
+
+
+def _parse_buffer(buf, encoding=None):
+    """Parses the XML document in the `buf` mmap or memoryview into an
+    etree, without copying it into a Python string.
+
+    """
+    parser = mixbox.xml.get_xml_parser(encoding=encoding)
+
+    try:
+        return etree.ElementTree(etree.fromstring(buf, parser))
+    except (TypeError, ValueError):
+        # Older lxml versions only parse str and bytes.
+        return _feed_buffer(buf, encoding=encoding)
+
+
+def _feed_buffer(buf, encoding=None, chunk_size=_CHUNK_SIZE):
+    """Parses the XML document in the `buf` mmap or memoryview into an
+    etree by feeding it to the parser `chunk_size` bytes at a time.
+
+    """
+    parser = mixbox.xml.get_xml_parser(encoding=encoding)
+
+    # The chunks are sliced from `buf` itself rather than from a memoryview
+    # of it, as an mmap cannot be closed while a memoryview of it exists.
+    for start in six.moves.range(0, len(buf), chunk_size):
+        chunk = buf[start:start + chunk_size]
+
+        # Slices of an mmap are bytes, and slices of a memoryview are
+        # memoryviews.
+        if not isinstance(chunk, bytes):
+            chunk = chunk.tobytes()
+
+        parser.feed(chunk)
+
+    return etree.ElementTree(parser.close())
+
+
+@contextlib.contextmanager
+def _etree(xml_file, encoding=None, use_mmap=False):
+    """Yields `xml_file`, or an etree parsed from it if it is a buffer, or
+    a path to be memory-mapped.
+
+    """
+    if use_mmap and isinstance(xml_file, six.string_types):
+        with contextlib.closing(map_file(xml_file)) as buf:
+            yield _parse_buffer(buf, encoding=encoding)
+    elif _is_buffer(xml_file):
+        yield _parse_buffer(xml_file, encoding=encoding)
+    else:
+        yield xml_file
+
 
 class EntityParser(mixbox.parser.EntityParser):
 
@@ -26,3 +183,141 @@ class EntityParser(mixbox.parser.EntityParser):
 
     def get_entity_class(self, tag=TAG_STIX_PACKAGE):
         return stix.core.STIXPackage
+
+    def parse_xml_to_obj(self, xml_file, check_version=True, check_root=True,
+                         encoding=None, passthrough=None, use_mmap=False):
+        """Creates a STIX binding object from the supplied xml file.
+
+        See :meth:`parse_xml` for a description of `xml_file`, `passthrough`
+        and `use_mmap`. If `passthrough` is ``None``, the current passthrough
+        setting is kept. All other arguments are passed to
+        :meth:`mixbox.parser.EntityParser.parse_xml_to_obj`.
+
+        """
+        if passthrough is None:
+            passthrough = is_passthrough()
+
+        with _passthrough(passthrough):
+            with _etree(xml_file, encoding, use_mmap) as xml_file:
+                return super(EntityParser, self).parse_xml_to_obj(
+                    xml_file=xml_file,
+                    check_version=check_version,
+                    check_root=check_root,
+                    encoding=encoding
+                )
+
+    def parse_xml(self, xml_file, check_version=True, check_root=True,
+                  encoding=None, passthrough=False, use_mmap=False,
+                  retain_source=True, validate=False, schema_dir=None):
+        """Creates a python-stix STIXPackage object from the supplied xml_file.
+
+        Args:
+            xml_file: A filename/path or a file-like object representing a STIX
+                instance document. It may also be an ``mmap`` (see
+                :func:`map_file`) or a ``memoryview``, which lxml parses in
+                place.
+            check_version: Inspect the version before parsing.
+            check_root: Inspect the root element before parsing.
+            encoding: The character encoding of the input `xml_file`. If
+                ``None``, an attempt will be made to determine the input
+                character encoding.
+            passthrough: If ``True``, opaque extension payloads such as MAEC
+                Packages are kept as the lxml elements found in `xml_file`
+                rather than being parsed into python-maec objects. They are
+                written back out unchanged by ``to_xml()``.
+            use_mmap: If ``True`` and `xml_file` is a filename/path, the file
+                is memory-mapped and parsed from the map rather than read
+                through Python file buffers.
+            retain_source: If ``False``, lxml content kept by the returned
+                objects (e.g., OpenIOC documents and passthrough payloads) is
+                copied out of the parsed document, so that the document and
+                the binding objects built from it are freed once parsing
+                returns. The line number of each element with an ``id`` is
+                kept in the ``__source_lines__`` dictionary of the returned
+                object instead.
+            validate: If ``True``, the parsed document is validated against
+                the STIX and CybOX schemas in `schema_dir` before any objects
+                are built from it. The schemas are compiled once per process
+                (see :func:`stix.utils.schema.get_schema`).
+            schema_dir: The directory which holds a local copy of the
+                schemas. Required if `validate` is ``True``.
+
+        Raises:
+            stix.utils.schema.ValidationError: If `validate` is ``True`` and the document is
+                not schema-valid.
+
+        """
+        if validate and not schema_dir:
+            raise ValueError("A schema_dir is required to validate documents")
+
+        # Nested rather than combined, as Python 2.6 does not support
+        # multiple context managers in one with statement.
+        with _passthrough(passthrough):
+            with source_retention(retain_source):
+                with _etree(xml_file, encoding, use_mmap) as xml_file:
+                    return self._parse_xml(
+                        xml_file=xml_file,
+                        check_version=check_version,
+                        check_root=check_root,
+                        encoding=encoding,
+                        schema_dir=schema_dir if validate else None
+                    )
+
+    def _parse_xml(self, xml_file, check_version, check_root, encoding,
+                   schema_dir=None):
+        """:meth:`mixbox.parser.EntityParser.parse_xml`, reporting each of
+        its phases to :mod:`stix.instrumentation`, validating the parsed
+        tree against the schemas in `schema_dir` (if any) and recording
+        source line numbers if source retention is disabled.
+
+        Note:
+            mixbox has no hooks between the phases of ``parse_xml()``, so
+            its body (parsing, building, ``from_obj()`` and saving the input
+            namespaces and schemaLocations) is repeated here rather than
+            called. Changes to it in mixbox must be made here as well.
+
+        """
+        # Imported here so that importing this module (and so stix.core)
+        # does not load the instrumentation and schema modules.
+        from stix import instrumentation
+        from stix.utils import schema
+
+        with instrumentation.operation("parse_xml"):
+            with instrumentation.timer("parse_xml.lxml"):
+                xml_etree = mixbox.xml.get_etree(xml_file, encoding=encoding)
+
+            root = xml_etree.getroot()
+
+            if instrumentation.is_enabled():
+                instrumentation.count("parse_xml.elements",
+                                      sum(1 for _ in root.iter()))
+
+            if schema_dir:
+                with instrumentation.timer("parse_xml.validate"):
+                    schema.validate(xml_etree, schema_dir)
+
+            with instrumentation.timer("parse_xml.build"):
+                entity_obj = self.parse_xml_to_obj(
+                    xml_file=xml_etree,
+                    check_version=check_version,
+                    check_root=check_root
+                )
+
+            with instrumentation.timer("parse_xml.from_obj"):
+                entity_class = self.get_entity_class(root.tag)
+                entity = entity_class.from_obj(entity_obj)
+
+        # Save the parsed nsmap and schemalocations onto the parsed Entity
+        entity.__input_namespaces__ = dict(six.iteritems(root.nsmap))
+
+        try:
+            pairs = mixbox.xml.get_schemaloc_pairs(root)
+            entity.__input_schemalocations__ = dict(pairs)
+        except KeyError:
+            pass
+
+        if not is_retaining_source():
+            entity.__source_lines__ = _source_lines(root)
+
+        instrumentation.count_entities("parse_xml", entity)
+        return entity
@@ -0,0 +1,213 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""XML Schema validation against a local copy of the STIX and CybOX
+schemas.
+
+The schemas are located through the schemaLocation of each namespace in
+:mod:`stix.utils.nsparser` (and :mod:`cybox.utils.nsparser`), which are
+mapped onto a local directory such as a checkout of the STIX schemas
+repository. Each schema directory is compiled once per process, and the
+schemas are never fetched over the network.
+
+"""
+
+# stdlib
+import os
+import threading
+
+# external
+from lxml import etree
+from mixbox.namespaces import NS_XML_SCHEMA
+from mixbox.vendor import six
+from mixbox.vendor.six.moves.urllib.parse import urlparse
+from mixbox.vendor.six.moves.urllib.request import pathname2url
+from cybox.utils.nsparser import CYBOX_NAMESPACES
+
+# internal
+from stix.utils.nsparser import STIX_NAMESPACES
+
+# The directory under which the official schemas are published
+# (e.g., http://stix.mitre.org/XMLSchema/core/1.2/stix_core.xsd).
+_SCHEMA_ROOT = "XMLSchema"
+
+# Compiled schemas, by absolute schema directory.
+_schemas = {}
+_lock = threading.Lock()
+
+
+class ValidationError(Exception):
+    """Raised when a document is not valid according to the schemas.
+
+    Attributes:
+        errors: The :class:`lxml.etree._LogEntry` instances which describe
+            each error (e.g., ``error.line`` and ``error.message``).
+
+    """
+    def __init__(self, errors):
+        self.errors = list(errors)
+
+        if self.errors:
+            first = self.errors[0]
+            message = "line %s: %s" % (first.line, first.message)
+        else:
+            message = "The document is not schema-valid."
+
+        if len(self.errors) > 1:
+            message += " (and %d more errors)" % (len(self.errors) - 1)
+
+        super(ValidationError, self).__init__(message)
+
+
+def _schema_locations():
+    """Returns a dictionary which maps namespaces to the URL of their
+    schema.
+
+    """
+    locations = {}
+
+    for namespaces in (CYBOX_NAMESPACES, STIX_NAMESPACES):
+        for ns, location in six.iteritems(namespaces.get_uri_schemaloc_map()):
+            if location:
+                locations[ns] = location
+
+    return locations
+
+
+class _LocalResolver(etree.Resolver):
+    """Maps schema URLs onto the files of a schema directory.
+
+    A URL such as ``http://stix.mitre.org/XMLSchema/core/1.2/stix_core.xsd``
+    is looked up as (in order):
+
+    * ``stix.mitre.org/XMLSchema/core/1.2/stix_core.xsd`` (a mirror of the
+      schema site),
+    * ``core/1.2/stix_core.xsd`` (the published layout), and
+    * any file named ``stix_core.xsd`` (e.g., a schemas repository checkout,
+      where the versions are not part of the paths).
+
+    """
+    def __init__(self, schema_dir):
+        super(_LocalResolver, self).__init__()
+        self.schema_dir = schema_dir
+        self._files = None
+
+    def _files_by_name(self):
+        if self._files is None:
+            self._files = {}
+
+            for dirpath, dirnames, filenames in os.walk(self.schema_dir):
+                dirnames.sort()
+
+                for name in filenames:
+                    self._files.setdefault(name, os.path.join(dirpath, name))
+
+        return self._files
+
+    def find(self, url):
+        """Returns the path of the local copy of the schema at `url`, or
+        ``None``.
+
+        """
+        parsed = urlparse(url)
+
+        if parsed.scheme not in ("http", "https"):
+            return None
+
+        parts = [x for x in parsed.path.split("/") if x]
+
+        if not parts:
+            return None
+
+        candidates = [[parsed.netloc] + parts]
+
+        if _SCHEMA_ROOT in parts:
+            candidates.append(parts[parts.index(_SCHEMA_ROOT) + 1:])
+
+        for candidate in candidates:
+            path = os.path.join(self.schema_dir, *candidate)
+
+            if os.path.isfile(path):
+                return path
+
+        return self._files_by_name().get(parts[-1])
+
+    def resolve(self, url, pubid, context):
+        path = self.find(url)
+
+        if path is None:
+            return None
+
+        return self.resolve_filename(path, context)
+
+
+def _compile(schema_dir):
+    resolver = _LocalResolver(schema_dir)
+    imports = []
+
+    for ns, url in sorted(six.iteritems(_schema_locations())):
+        path = resolver.find(url)
+
+        if path is not None:
+            imports.append((ns, path))
+
+    if not imports:
+        raise ValueError("No STIX or CybOX schemas found in %r" % schema_dir)
+
+    xs = "{%s}" % NS_XML_SCHEMA.name
+    wrapper = etree.Element(xs + "schema", nsmap={"xs": NS_XML_SCHEMA.name})
+
+    for ns, path in imports:
+        etree.SubElement(wrapper, xs + "import", namespace=ns,
+                         schemaLocation="file:" + pathname2url(path))
+
+    parser = etree.XMLParser(no_network=True)
+    parser.resolvers.add(resolver)
+
+    base_url = "file:" + pathname2url(os.path.join(schema_dir, "wrapper.xsd"))
+    doc = etree.fromstring(etree.tostring(wrapper), parser, base_url=base_url)
+
+    return etree.XMLSchema(doc)
+
+
+def get_schema(schema_dir):
+    """Returns the :class:`lxml.etree.XMLSchema` of the STIX and CybOX
+    schemas found under `schema_dir`.
+
+    The schema is compiled on the first call for each directory, and cached
+    for the lifetime of the process. Namespaces whose schema is not found
+    under `schema_dir` are left out, so documents which use them do not
+    validate.
+
+    Raises:
+        ValueError: If `schema_dir` does not contain any of the schemas.
+        lxml.etree.XMLSchemaParseError: If the schemas cannot be compiled.
+
+    """
+    schema_dir = os.path.abspath(schema_dir)
+    schema = _schemas.get(schema_dir)
+
+    if schema is not None:
+        return schema
+
+    with _lock:
+        if schema_dir not in _schemas:
+            _schemas[schema_dir] = _compile(schema_dir)
+
+        return _schemas[schema_dir]
+
+
+def validate(doc, schema_dir):
+    """Validates the lxml tree or element `doc` against the schemas found
+    under `schema_dir` (see :func:`get_schema`).
+
+    Raises:
+        ValidationError: If `doc` is not schema-valid.
+
+    """
+    schema = get_schema(schema_dir)
+
+    if not schema.validate(doc):
+        raise ValidationError(schema.error_log)
+
+
+__all__ = ["ValidationError", "get_schema", "validate"]
@@ -2,6 +2,7 @@
 # See LICENSE.txt for complete terms.
 
 # stdlib
+import collections
 import itertools
 
 # external
@@ -13,13 +14,20 @@ from . import is_entity, is_entitylist, attr_name, is_sequence
 
 
 def _is_skippable(owner, varname, varobj):
-    if varname == "_fields" and isinstance(varobj, dict):
+    # Field values are a dict, or a mapping for compact storage.
+    if varname == "_fields" and isinstance(varobj, collections.Mapping):
         return True
 
     if varname == "_parent" and isinstance(owner, ObjectProperties):
         return True
 
-    if varname in ("__input_namespaces__", "__input_schemalocations__"):
+    if varname in ("__input_namespaces__", "__input_schemalocations__",
+                   "__source_lines__"):
+        return True
+
+    # Bookkeeping attributes (e.g., lookup indexes) which only point back
+    # at values that are already reachable elsewhere in the model.
+    if varname in getattr(owner, "_walk_skip", ()):
         return True
 
     return False
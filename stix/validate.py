@@ -0,0 +1,318 @@
+# Copyright (c) 2017, The MITRE Corporation. All rights reserved.
+# See LICENSE.txt for complete terms.
+"""Fast structural checks of python-stix object models.
+
+:func:`check` covers the rules which matter most for ingesting content and
+which do not need the STIX schemas (see :mod:`stix.utils.schema` for
+complete XML Schema validation):
+
+* ``required``: fields which the schemas require (e.g., the ``phase_id``
+  of a kill chain phase) and core components with neither an ``id`` nor
+  an ``idref``.
+* ``vocab``: controlled vocabulary values which are not part of their
+  vocabulary.
+* ``version``: component versions not found in the ``_ALL_VERSIONS`` of
+  their class.
+* ``timestamp``: timestamp values which are not dates or datetimes, and
+  core components with an ``id`` but no ``timestamp`` (a warning).
+* ``precision``: timestamp precisions which are not recognized.
+* ``duplicate-id``: distinct objects with the same ``id`` and
+  ``timestamp``.
+* ``idref``: ``idref`` values which do not refer to an ``id`` in the
+  checked content (a warning, as they may refer to external content).
+
+Most of these are enforced when fields are set, but can be bypassed by
+content built through the binding layer, by directly modified objects or
+by vocabularies which are not registered.
+
+The rules are looked up once per class, and all of them are checked in a
+single traversal of the object model.
+
+Example:
+    >>> for finding in check(package):
+    ...     print(finding.level, finding.rule, finding.id, finding.message)
+
+"""
+
+# stdlib
+import collections
+import datetime
+
+# external
+from cybox.common import ObjectProperties
+from mixbox import fields
+from mixbox.datautils import resolve_class
+from mixbox.entities import Entity
+from mixbox.vendor import six
+
+# internal
+import stix
+from stix.base import BaseCoreComponent
+from stix.common.datetimewithprecision import DATETIME_PRECISION_VALUES
+from stix.common.vocabs import VocabString
+from stix.utils import dates, is_sequence
+
+#: The :attr:`Finding.level` of content which is not valid.
+ERROR = "error"
+
+#: The :attr:`Finding.level` of content which is valid, but suspicious.
+WARNING = "warning"
+
+#: A rule violation found by :func:`check`.
+#:
+#: Attributes:
+#:     level: :data:`ERROR` or :data:`WARNING`.
+#:     rule: The name of the rule (e.g., ``"vocab"``).
+#:     message: A description of the violation.
+#:     id: The ``id`` of the offending object or, if it does not have one,
+#:         of its closest ancestor which does.
+#:     entity: The offending object.
+Finding = collections.namedtuple(
+    "Finding", ("level", "rule", "message", "id", "entity")
+)
+
+# Fields which the schemas require, by class (and its subclasses).
+_REQUIRED_FIELDS = (
+    ("stix.core.STIXPackage", ("version",)),
+    ("stix.common.kill_chains.KillChainPhase", ("phase_id",)),
+    ("stix.common.related._BaseRelated", ("item",)),
+    ("stix.common.statement.Statement", ("value",)),
+    ("stix.indicator.indicator.CompositeIndicatorExpression", ("operator",)),
+    ("stix.extensions.marking.simple_marking.SimpleMarkingStructure",
+     ("statement",)),
+)
+
+# Attributes which never hold child entities (see stix.utils.walk).
+_SKIPPED_ATTRS = frozenset([
+    "_fields", "__input_namespaces__", "__input_schemalocations__",
+    "__source_lines__",
+])
+
+# Field values which cannot hold entities.
+_SCALAR_TYPES = frozenset(
+    six.string_types + six.integer_types +
+    (six.text_type, bytes, float, bool, datetime.datetime, datetime.date)
+)
+
+# Cache of class => _ClassRules.
+_RULES = {}
+
+# Cache of vocabulary xsi:type => allowed values (or None).
+_VOCABS = {}
+
+
+class _ClassRules(object):
+    """The rules which apply to instances of one class."""
+
+    def __init__(self, klass):
+        named = dict(klass.typed_fields_with_attrnames())
+        typed = klass.typed_fields()
+
+        self.required = tuple(
+            (name, named[name])
+            for classname, names in _REQUIRED_FIELDS
+            if issubclass(klass, resolve_class(classname))
+            for name in names
+            if name in named
+        )
+
+        self.ids = tuple(f for f in typed if isinstance(f, fields.IdField))
+        self.idrefs = tuple(f for f in typed
+                            if isinstance(f, fields.IdrefField))
+        self.timestamp = named.get("timestamp")
+        self.timestamps = dates._datetime_fields(klass)
+        self.is_core = issubclass(klass, BaseCoreComponent)
+        self.is_vocab = issubclass(klass, VocabString)
+
+        versions = getattr(klass, "_ALL_VERSIONS", None)
+        version = named.get("version")
+        self.version = (version, versions) if versions and version else None
+
+        skipped = _SKIPPED_ATTRS.union(getattr(klass, "_walk_skip", ()))
+
+        if issubclass(klass, ObjectProperties):
+            skipped = skipped.union(["_parent"])
+
+        self.skipped = skipped
+
+
+def _rules(klass):
+    try:
+        return _RULES[klass]
+    except KeyError:
+        rules = _RULES[klass] = _ClassRules(klass)
+        return rules
+
+
+def _allowed_values(vocab):
+    """Returns the terms of the vocabulary of the VocabString `vocab`, or
+    ``None`` if they are unknown.
+
+    """
+    if vocab._ALLOWED_VALUES:
+        return vocab._ALLOWED_VALUES
+
+    xsi_type = vocab.xsi_type
+
+    if not xsi_type:
+        return None
+
+    try:
+        return _VOCABS[xsi_type]
+    except KeyError:
+        pass
+
+    try:
+        klass = stix.lookup_extension(xsi_type)
+    except ValueError:
+        klass = None
+
+    allowed = getattr(klass, "_ALLOWED_VALUES", None)
+    _VOCABS[xsi_type] = allowed
+    return allowed
+
+
+def _children(obj, rules):
+    """Returns the entities directly held by `obj`, as
+    :func:`stix.utils.walk.iterwalk` finds them.
+
+    """
+    children = []
+    values = list(obj._fields.values())
+    skipped = rules.skipped
+
+    for name, value in six.iteritems(vars(obj)):
+        if name not in skipped:
+            values.append(value)
+
+    for value in values:
+        if value is None or type(value) in _SCALAR_TYPES:
+            continue
+        elif isinstance(value, Entity):
+            children.append(value)
+        elif is_sequence(value):
+            children.extend(x for x in value if isinstance(x, Entity))
+
+    return children
+
+
+def check(entity):
+    """Checks the STIXPackage (or any other stix.Entity) `entity` and
+    everything it contains against the rules described in
+    :mod:`stix.validate`.
+
+    Returns:
+        A list of :class:`Finding` tuples, in document order. Unresolved
+        ``idref`` findings come last.
+
+    """
+    findings = []
+    ids = set()
+    keys = set()      # (id, timestamp) pairs
+    idrefs = []       # (idref, entity, context id) triples
+    seen = set()
+    stack = [(entity, None)]
+
+    def report(level, rule, message, context, obj):
+        findings.append(Finding(level, rule, message, context, obj))
+
+    while stack:
+        obj, context = stack.pop()
+
+        if id(obj) in seen:
+            continue
+
+        seen.add(id(obj))
+        rules = _rules(type(obj))
+        values = obj._fields
+        name = type(obj).__name__
+
+        for field in rules.ids:
+            value = values.get(field)
+
+            if value:
+                context = value
+                key = (value, rules.timestamp and
+                       values.get(rules.timestamp))
+
+                if key in keys:
+                    report(ERROR, "duplicate-id",
+                           "%s id '%s' is not unique" % (name, value),
+                           context, obj)
+
+                ids.add(value)
+                keys.add(key)
+
+        for field in rules.idrefs:
+            value = values.get(field)
+
+            if value:
+                idrefs.append((value, obj, context))
+
+        for attr, field in rules.required:
+            if not values.get(field):
+                report(ERROR, "required",
+                       "%s is missing required field '%s'" % (name, attr),
+                       context, obj)
+
+        if rules.is_core:
+            if not (obj.id_ or obj.idref):
+                report(ERROR, "required",
+                       "%s has neither an id nor an idref" % name,
+                       context, obj)
+            elif obj.id_ and not obj.timestamp:
+                report(WARNING, "timestamp",
+                       "%s '%s' has no timestamp" % (name, obj.id_),
+                       context, obj)
+
+        if rules.version:
+            field, versions = rules.version
+            value = values.get(field)
+
+            if value and value not in versions:
+                report(ERROR, "version",
+                       "%s version '%s' is not one of %s"
+                       % (name, value, ", ".join(versions)),
+                       context, obj)
+
+        for field, precision_field in rules.timestamps:
+            value = values.get(field)
+
+            if value is not None and not isinstance(value, datetime.date):
+                report(ERROR, "timestamp",
+                       "%s %s '%s' is not a timestamp"
+                       % (name, field.name, value),
+                       context, obj)
+
+            precision = precision_field and values.get(precision_field)
+
+            if precision and precision not in DATETIME_PRECISION_VALUES:
+                report(ERROR, "precision",
+                       "%s %s '%s' is not one of %s"
+                       % (name, precision_field.name, precision,
+                          ", ".join(DATETIME_PRECISION_VALUES)),
+                       context, obj)
+
+        if rules.is_vocab:
+            allowed = _allowed_values(obj)
+
+            if allowed and obj.value not in allowed:
+                report(ERROR, "vocab",
+                       "'%s' is not a term of %s"
+                       % (obj.value, obj.xsi_type or name),
+                       context, obj)
+
+        for child in reversed(_children(obj, rules)):
+            stack.append((child, context))
+
+    for idref, obj, context in idrefs:
+        if idref not in ids:
+            report(WARNING, "idref",
+                   "%s idref '%s' does not refer to any id"
+                   % (type(obj).__name__, idref),
+                   context, obj)
+
+    return findings
+
+
+__all__ = ["ERROR", "WARNING", "Finding", "check"]